@@ -8,42 +8,113 @@ An instantiation represents a Boolean function.
 
 This module allows to work alternatively on its truth table, Walsh spectrum or ANF,
 while keeping the two other representations updated.
+Each representation can be set, the others are updated from the cheapest up-to-date one.
+The truth table and the ANF are stored packed in integers (see toolbox.pack_bits) in TT_packed and ANF_packed,
+and read as arrays of Booleans through TT and ANF (or get_TT and get_ANF). The Walsh spectrum is stored as an array.
 
 This module also allows to check its resiliency and algebraic immunity,
 and to compute its annihilators.
 """
 
-from copy import deepcopy as copy
-from toolbox import sign, Walsh_transform, Moebius_transform, vector_complement, permute
-from annihilator import get_annihilators
+from toolbox import np, sign_Walsh_transform, Walsh_transform, Walsh_transform_inplace, Moebius_transform_inplace, Moebius_transform_packed, to_array, to_list, vector_complement, permute, pack_bits, unpack_bits, popcount
+from annihilator import get_annihilators, has_annihilator, algebraic_immunity
 
 """*********************************************************************
     Global variables
 *********************************************************************"""
 
+monomials_degree_tables = {}    #degree/weight of each monomial/element, by locality
+
+def get_monomials_degree(locality):
+    """
+    Returns the degree/weight of each monomial/element of the ANF and WS for a given locality.\n
+    The table is computed once per locality and shared (read-only) by every BF of this locality.
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables.
+
+    Returns
+    -------
+    numpy array of integers (tuple if numpy is not available)
+        the x-th element is the Hamming weight of x.
+
+    """
+    if locality not in monomials_degree_tables:
+        if np is not None:
+            x = np.arange(2**locality)
+            table = np.zeros(2**locality, dtype=np.int64)
+            for k in range(locality):
+                table += (x >> k) & 1
+            table.flags.writeable = False
+        else:
+            table = tuple(popcount(x) for x in range(2**locality))
+        monomials_degree_tables[locality] = table
+    return monomials_degree_tables[locality]
+
+
+degree_masks_tables = {} #packed masks of the monomials of each degree, by locality
+
+def get_degree_mask(locality, min_degree, max_degree):
+    """
+    Returns the packed mask of the monomials of degree between min_degree and max_degree,
+    bit u being set if the monomial u has a degree in this range.\n
+    The masks of each degree are computed once per locality.
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables.
+    min_degree : integer
+        minimal degree.
+    max_degree : integer
+        maximal degree.
+
+    Returns
+    -------
+    integer
+        packed mask.
+
+    """
+    if locality not in degree_masks_tables:
+        masks = [0]*(locality+1)
+        for u in range(2**locality):
+            masks[popcount(u)] |= 1 << u
+        degree_masks_tables[locality] = masks
+    mask = 0
+    for degree in range(max(min_degree, 0), min(max_degree, locality) + 1):
+        mask |= degree_masks_tables[locality][degree]
+    return mask
 
 
 """*********************************************************************
     Class BF
 *********************************************************************"""
 class BF:
-    l = 0   #locality
-    
-    WS = []
-    is_WS_uptodate = False
-    
-    TT = []
-    is_TT_uptodate = False
-    
-    ANF = ""
-    is_ANF_uptodate = False
-    
-    monomials_degree = []   #degree/weight of each monomial/element for the ANF and WS
-    
-    annihilators_basis_f = []   #annihilators of f
-    annihilators_basis_fp1 = []   #annihilators of f+1
-
-    
+    __slots__ = (
+        "l",    #locality
+        
+        "WS",   #Walsh spectrum as an array, None before its first computation
+        "is_WS_uptodate",
+        
+        "TT_packed",    #packed truth table, bit x is f(x)
+        "TT_unpacked",  #(TT_packed, TT as a tuple of Booleans) for the last unpacked truth table, see the TT property
+        "is_TT_uptodate",
+        
+        "ANF_packed",   #packed ANF, bit u is the coefficient of the monomial u
+        "ANF_unpacked", #(ANF_packed, ANF as a tuple of Booleans) for the last unpacked ANF, see the ANF property
+        "is_ANF_uptodate",
+        
+        "monomials_degree", #degree/weight of each monomial/element for the ANF and WS, shared by every BF of the same locality
+        
+        "annihilators_basis_f",     #annihilators of f, packed like the ANF
+        "annihilators_basis_fp1",   #annihilators of f+1, packed like the ANF
+        
+        "tracked_resiliency",       #resiliency tracked by flip_TT, -1 if none
+        "nb_nonzero_low_weight",    #number of nonzero Walsh coefficients of weight smaller or equal to tracked_resiliency
+        "low_weight_indexes",       #elements of weight smaller or equal to tracked_resiliency
+        )
     
     
     """*********************************************************************
@@ -66,29 +137,56 @@ class BF:
         
         self.l = locality
         
-        self.WS = [0]*(2**self.l)
-        self.TT = [0]*(2**self.l)
-        self.ANF= [0]*(2**self.l)
+        self.WS = None
+        self.TT_packed = 0
+        self.TT_unpacked = None
+        self.ANF_packed = 0
+        self.ANF_unpacked = None
         
         self.is_WS_uptodate = False
         self.is_ANF_uptodate = True
         self.is_TT_uptodate = True
         
         #degree of the monomials
-        self.monomials_degree = []
-        for x in range(2**self.l):
-            deg = 0
-            while x != 0:
-                if x%2 :
-                    deg += 1
-                x >>= 1
-            self.monomials_degree.append(deg)
+        self.monomials_degree = get_monomials_degree(locality)
             
         #basis of annihilators
         self.annihilators_basis_f = []
         self.annihilators_basis_fp1 = []
         
+        self.tracked_resiliency = -1
+        self.nb_nonzero_low_weight = 0
+        self.low_weight_indexes = []
+        
         return
+    
+    @property
+    def TT(self):
+        """
+        Truth table as a new array of Booleans (see get_TT), copied from a tuple unpacked from TT_packed when it has changed since the last read.\n
+        Modifying the array does not modify the function: use set_TT or flip_TT.
+        """
+        if self.TT_unpacked is None or self.TT_unpacked[0] != self.TT_packed:
+            self.TT_unpacked = (self.TT_packed, tuple(self.get_TT()))
+        return list(self.TT_unpacked[1])
+    
+    @TT.setter
+    def TT(self, new_TT):
+        self.set_TT(new_TT)
+    
+    @property
+    def ANF(self):
+        """
+        ANF as a new array of Booleans (see get_ANF), copied from a tuple unpacked from ANF_packed when it has changed since the last read.\n
+        Modifying the array does not modify the function: use set_ANF.
+        """
+        if self.ANF_unpacked is None or self.ANF_unpacked[0] != self.ANF_packed:
+            self.ANF_unpacked = (self.ANF_packed, tuple(self.get_ANF()))
+        return list(self.ANF_unpacked[1])
+    
+    @ANF.setter
+    def ANF(self, new_ANF):
+        self.set_ANF(new_ANF)
         
     def set_ANF(self, new_SANF):
         """
@@ -104,7 +202,7 @@ class BF:
         None.
 
         """
-        self.ANF = copy(new_SANF)
+        self.ANF_packed = pack_bits(new_SANF)
         self.is_WS_uptodate = False
         self.is_ANF_uptodate = True
         self.is_TT_uptodate = False
@@ -124,7 +222,76 @@ class BF:
         None.
 
         """
-        self.TT = copy(new_TT)
+        self.TT_packed = pack_bits(new_TT)
+        self.is_WS_uptodate = False
+        self.is_ANF_uptodate = False
+        self.is_TT_uptodate = True
+        return
+    
+    def set_WS(self, new_WS, copy = True):
+        """
+        Set a new Walsh spectrum.\n
+        The given spectrum must be the Walsh spectrum of a Boolean function, as computed by update_WS.
+
+        Parameters
+        ----------
+        new_WS : Array of integers
+            The new Walsh spectrum of the function.
+        copy : Boolean, optional
+            If False and new_WS is already an int64 numpy array, the object takes ownership
+            of the array instead of copying it. The default is True.
+
+        Returns
+        -------
+        None.
+
+        """
+        if copy or np is None:
+            self.WS = to_array(new_WS, "int64")
+        else:
+            self.WS = np.asarray(new_WS, dtype=np.int64)
+        self.is_WS_uptodate = True
+        self.is_ANF_uptodate = False
+        self.is_TT_uptodate = False
+        if self.tracked_resiliency >= 0:
+            self.count_nonzero_low_weight()
+        return
+    
+    def set_ANF_packed(self, new_ANF):
+        """
+        Set a new ANF given in packed form (see toolbox.pack_bits).
+
+        Parameters
+        ----------
+        new_ANF : integer
+            The new packed ANF of the function, bit u being the coefficient of the monomial u.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.ANF_packed = new_ANF
+        self.is_WS_uptodate = False
+        self.is_ANF_uptodate = True
+        self.is_TT_uptodate = False
+        return
+    
+    def set_TT_packed(self, new_TT):
+        """
+        Set a new truth table given in packed form (see toolbox.pack_bits).
+
+        Parameters
+        ----------
+        new_TT : integer
+            The new packed truth table of the function, bit x being f(x).
+
+        Returns
+        -------
+        None.
+
+        """
+        self.TT_packed = new_TT
         self.is_WS_uptodate = False
         self.is_ANF_uptodate = False
         self.is_TT_uptodate = True
@@ -143,7 +310,7 @@ class BF:
         None.
 
         """
-        self.TT = Moebius_transform(self.ANF, self.l)
+        self.TT_packed = Moebius_transform_packed(self.ANF_packed, self.l)
         return
     
     def update_WS_from_TT(self):
@@ -159,7 +326,31 @@ class BF:
         None.
 
         """
-        self.WS = Walsh_transform(sign(self.TT), self.l)
+        self.WS = sign_Walsh_transform(unpack_bits(self.TT_packed, 2**self.l), self.l)
+        if self.tracked_resiliency >= 0:
+            self.count_nonzero_low_weight()
+        return
+    
+    def update_TT_from_WS(self):
+        """
+        Update the truth table with the Walsh spectrum, using the inverse Walsh transform.
+        
+        Requirements
+        ------------
+        The Walsh spectrum must be up to date.
+
+        Returns
+        -------
+        None.
+
+        """
+        if np is not None:
+            F = np.array(self.WS, dtype=np.int64)
+            Walsh_transform_inplace(F, self.l)
+            self.TT_packed = pack_bits(F > 0) #F = 2^l * sign(TT)
+        else:
+            F = Walsh_transform(self.WS, self.l)
+            self.TT_packed = pack_bits([1 if F[x] > 0 else 0 for x in range(2**self.l)])
         return
     
     def update_ANF_from_TT(self):
@@ -175,17 +366,14 @@ class BF:
         None.
 
         """
-        self.ANF = Moebius_transform(self.TT, self.l)
+        self.ANF_packed = Moebius_transform_packed(self.TT_packed, self.l)
         return
     
 
     def update_TT(self):
         """
-        Update the truth table.
-        
-        Future developpements
-        ---------------------
-        So far, it can only be updated from the ANF. Update from WS will be added soon.
+        Update the truth table, with the cheapest up-to-date representation:
+        the ANF (l word operations) if possible, the Walsh spectrum (inverse Walsh transform) otherwise.
 
         Returns
         -------
@@ -198,16 +386,18 @@ class BF:
             self.update_TT_from_ANF()
             self.is_TT_uptodate = True
             return
+        if self.is_WS_uptodate:  #update with the WS
+            self.update_TT_from_WS()
+            self.is_TT_uptodate = True
+            return
         return
     
 
     def update_WS(self):
         """
-        Update the Walsh Spectrum.
-        
-        Future developpements
-        ---------------------
-        So far, it can only be updated from the truth table. Update from ANF will be added soon.
+        Update the Walsh Spectrum.\n
+        The Walsh spectrum is computed from the truth table, which is first updated if necessary
+        (from the ANF, see update_TT).
 
         Returns
         -------
@@ -225,11 +415,9 @@ class BF:
     
     def update_ANF(self):
         """
-        Update the ANF.
-        
-        Future developpements
-        ---------------------
-        So far, it can only be updated from the truth table. Update from WS will be added soon.
+        Update the ANF.\n
+        The ANF is computed from the truth table, which is first updated if necessary
+        (from the Walsh spectrum, see update_TT).
 
         Returns
         -------
@@ -238,12 +426,103 @@ class BF:
         """
         if self.is_ANF_uptodate: #if ANF is up to date, nothing to do
             return
-        if self.is_TT_uptodate:  #update with the TT
-            self.update_ANF_from_TT()
-            self.is_ANF_uptodate = True
-            return
+        
+        self.update_TT() #first, update TT
+        
+        self.update_ANF_from_TT() #then update with TT
+        self.is_ANF_uptodate = True
+        return
+
+    def flip_TT(self, x):
+        """
+        Flip the entry x of the truth table.\n
+        The ANF and the Walsh spectrum are incrementally updated if they were up to date:
+        the monomials containing x are flipped in the ANF, and each Walsh coefficient a
+        is changed by +-2*(-1)^(a.x). The cost is O(2^l) instead of O(l*2^l) for a full update.\n
+        If a resiliency is tracked (see track_resiliency), the number of nonzero low weight coefficients is updated
+        from the zero to nonzero (and nonzero to zero) transitions of the low weight coefficients only.
+
+        Parameters
+        ----------
+        x : integer
+            entry of the truth table to flip.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.update_TT()
+        self.TT_packed ^= 1 << x
+        
+        if self.is_ANF_uptodate: #flip every monomial u containing x
+            self.ANF_packed ^= Moebius_transform_packed(1 << x, self.l)
+        
+        if self.is_WS_uptodate:
+            delta = 2 if (self.TT_packed >> x) & 1 else -2 #sign(f(x)) goes from -1 to 1, or from 1 to -1
+            tracked = self.tracked_resiliency
+            if np is not None:
+                characters = self.monomials_degree[np.arange(2**self.l) & x] & 1 #a.x for every a
+                if tracked >= 0: #the low weight coefficients going from zero to nonzero, and from nonzero to zero
+                    low_weight = self.WS[self.low_weight_indexes]
+                    new_low_weight = low_weight + (delta - 2*delta*characters[self.low_weight_indexes])
+                    self.nb_nonzero_low_weight += int(np.count_nonzero(low_weight == 0)) - int(np.count_nonzero(new_low_weight == 0))
+                self.WS += delta - 2*delta*characters
+            else:
+                for a in range(2**self.l):
+                    before = self.WS[a]
+                    self.WS[a] += -delta if self.monomials_degree[a & x] & 1 else delta
+                    if self.monomials_degree[a] <= tracked:
+                        if before == 0: #zero to nonzero
+                            self.nb_nonzero_low_weight += 1
+                        elif self.WS[a] == 0: #nonzero to zero
+                            self.nb_nonzero_low_weight -= 1
         return
+    
+    def track_resiliency(self, r):
+        """
+        Track the number of nonzero Walsh coefficients of weight smaller or equal to r,
+        so that is_resilient(r) is answered in O(1) during a sequence of calls to flip_TT.\n
+        Use r = -1 to stop the tracking.
+
+        Parameters
+        ----------
+        r : integer
+            resilience to track.
 
+        Returns
+        -------
+        None.
+
+        """
+        self.tracked_resiliency = r
+        if np is not None:
+            self.low_weight_indexes = np.flatnonzero(self.monomials_degree <= r)
+        else:
+            self.low_weight_indexes = [a for a in range(2**self.l) if self.monomials_degree[a] <= r]
+        if r >= 0 and self.is_WS_uptodate:
+            self.count_nonzero_low_weight()
+        return
+    
+    def count_nonzero_low_weight(self):
+        """
+        Count the number of nonzero Walsh coefficients of weight smaller or equal to the tracked resiliency.
+        
+        Requirements
+        ------------
+        The Walsh spectrum must be up to date.
+
+        Returns
+        -------
+        None.
+
+        """
+        if np is not None:
+            self.nb_nonzero_low_weight = int(np.count_nonzero(self.WS[self.low_weight_indexes]))
+        else:
+            self.nb_nonzero_low_weight = sum(1 for a in self.low_weight_indexes if self.WS[a] != 0)
+        return
+    
     def string_ANF(self):
         """
         Returns the ANF as a printable string.
@@ -259,11 +538,11 @@ class BF:
 
         """
         string = ""
-        if self.ANF[0] == 1:
+        if self.ANF_packed & 1:
             string = "1"
             
         for monome in range(1,2**self.l):
-            if self.ANF[monome] == 1:
+            if (self.ANF_packed >> monome) & 1:
                 if string != "":
                     string += " + "
                 index = 0
@@ -275,11 +554,12 @@ class BF:
     
     def update_annihilators(self, max_degree):
         """
-        Update the basis of annihilators of f and f+1 for a given maximal degree.
+        Update the basis of annihilators of f and f+1 for a given maximal degree.\n
+        The annihilators are stored sparsely, packed into integers like the ANF (bit u is the coefficient of the monomial u).
         
         Requirements
         ------------
-        The Walsh spectrum must be up to date.
+        The truth table must be up to date.
 
         Parameters
         ----------
@@ -291,66 +571,64 @@ class BF:
         None.
 
         """
-        self.annihilators_basis_f = [] #delete the old basis of annihilators of f
-        basis = get_annihilators(self.TT, self.l, max_degree) #compute the new basis in the form [int,int,...]
-        
-        for annihilator in basis: #for each annihilator of this basis, in the form [int, int, ...]
-            annihilator_ANF = [0]*(2**self.l)
-            for index in annihilator: #convert it in ANF [0,0,1,...]
-                annihilator_ANF[index] = 1
-            self.annihilators_basis_f.append(annihilator_ANF)
-            
-        self.annihilators_basis_fp1 = [] #delete the old basis of annihilators of f1
-        basis = get_annihilators(vector_complement(self.TT), self.l, max_degree) #compute the new basis in the form [int,int,...]
-        
-        for annihilator in basis: #for each annihilator of this basis, in the form [int, int, ...]
-            annihilator_ANF = [0]*(2**self.l)
-            for index in annihilator: #convert it in ANF [0,0,1,...]
-                annihilator_ANF[index] = 1
-            self.annihilators_basis_fp1.append(annihilator_ANF)
+        TT = self.get_TT()
+        #compute the new bases in the form [int,int,...], and pack each annihilator
+        self.annihilators_basis_f = [sum(1 << index for index in annihilator) for annihilator in get_annihilators(TT, self.l, max_degree)]
+        self.annihilators_basis_fp1 = [sum(1 << index for index in annihilator) for annihilator in get_annihilators(vector_complement(TT), self.l, max_degree)]
         return
     
-    def get_annihilators(self, min_degree=0, max_degree=-1):
-        """
-            Returns the basis of annihilators of f and f+1 in their ANF form.\n
-            If min_degree is specified, only monomials of degree greater or equal to min_degree are returned.\n
-            If max_degree is specified, only monomials of degree smaller or equal to max_degree are returned.
+    def get_annihilators(self, min_degree=0, max_degree=-1, dense=True):
+        """
+            Returns the basis of annihilators of f and f+1.\n
+            If min_degree is specified, only monomials of degree greater or equal to min_degree are kept.\n
+            If max_degree is specified, only monomials of degree smaller or equal to max_degree are kept.\n
+            By default, each annihilator is returned in its ANF form, an array of Booleans
+            containing only the monomials of the specified degrees.
+            If dense is False, each annihilator is returned packed into an integer, bit u being the coefficient of the monomial u
+            (the monomials of the other degrees are cleared), as stored in annihilators_basis_f and annihilators_basis_fp1.
             
         Parameters
         ----------
         min_degree : integer, optional
             Minimal degree to truncate annihilators.
         max_degree : integer, optional
-            Maximal degree to truncate annihilators.
+            Maximal degree to truncate annihilators, -1 for no truncature.
+        dense : Boolean, optional
+            Expand the annihilators into arrays of Booleans. The default is True.
 
         Returns
         -------
         (Array, Array)
-            Two arrays of annihilators in their ANF representation.
+            Two arrays of annihilators, in their ANF representation (default) or packed.
 
         """
-        if min_degree==0 and max_degree==-1: #no degree truncature
-            return copy(self.annihilators_basis)
+        if max_degree == -1:
+            max_degree = self.l
+        mask = get_degree_mask(self.l, min_degree, max_degree)
         
-        #annihilators of f
-        annihilator_list_f = []
-        for annihilator in self.annihilators_basis_f: #for each annihilator
-            new_annihilator = []
-            for index in range(2**self.l): #keep only the correct degrees
-                if self.monomials_degree[index] >= min_degree and self.monomials_degree[index] <= max_degree:
-                    new_annihilator.append(annihilator[index])
-            annihilator_list_f.append(new_annihilator)
-            
-        #annihilators of f+1
-        annihilator_list_fp1 = []
-        for annihilator in self.annihilators_basis_fp1: #for each annihilator
-            new_annihilator = []
-            for index in range(2**self.l): #keep only the correct degrees
-                if self.monomials_degree[index] >= min_degree and self.monomials_degree[index] <= max_degree:
-                    new_annihilator.append(annihilator[index])
-            annihilator_list_fp1.append(new_annihilator)
-            
-        return (annihilator_list_f, annihilator_list_fp1)
+        bases = ([annihilator & mask for annihilator in self.annihilators_basis_f],
+                 [annihilator & mask for annihilator in self.annihilators_basis_fp1])
+        if not dense:
+            return bases
+        
+        #dense expansion, only the monomials of the specified degrees
+        if np is not None:
+            selection = (self.monomials_degree >= min_degree) & (self.monomials_degree <= max_degree)
+            return tuple([unpack_bits(annihilator, 2**self.l)[selection].tolist() for annihilator in basis] for basis in bases)
+        indexes = [index for index in range(2**self.l) if min_degree <= self.monomials_degree[index] <= max_degree]
+        return tuple([[(annihilator >> index) & 1 for index in indexes] for annihilator in basis] for basis in bases)
+    
+    def get_TT(self):
+        """
+        Returns the truth table of the function as an array of Booleans.
+
+        Returns
+        -------
+        Array
+            Truth table as an array of Booleans.
+
+        """
+        return to_list(unpack_bits(self.TT_packed, 2**self.l))
     
     def get_WalshSpectrum(self, min_weight=0, max_weight=-1):
         """
@@ -372,7 +650,11 @@ class BF:
             
         """
         if min_weight==0 and max_weight==-1: #no weight truncature
-            return copy(self.WS)
+            return to_list(self.WS)
+        
+        if np is not None:
+            selection = (self.monomials_degree >= min_weight) & (self.monomials_degree <= max_weight)
+            return self.WS[selection].tolist()
         
         new_WS = []
         for index in range(2**self.l): #keep only the asked weights
@@ -399,15 +681,46 @@ class BF:
             ANF as an array of Booleans.
             
         """
+        ANF = unpack_bits(self.ANF_packed, 2**self.l)
         if min_degree==0 and max_degree==-1: #ne degree truncature
-            return copy(self.ANF)
+            return to_list(ANF)
+        
+        if np is not None:
+            selection = (self.monomials_degree >= min_degree) & (self.monomials_degree <= max_degree)
+            return ANF[selection].tolist()
         
         new_ANF = []
         for index in range(2**self.l): #keep only the correct degrees
             if self.monomials_degree[index] >= min_degree and self.monomials_degree[index] <= max_degree:
-                new_ANF.append(self.ANF[index])
+                new_ANF.append(ANF[index])
         return new_ANF
     
+    def weight(self):
+        """
+        Returns the Hamming weight of the function.\n
+        Warning: the truth table must be up-to-date.
+
+        Returns
+        -------
+        integer
+            number of inputs x such that f(x) = 1.
+
+        """
+        return popcount(self.TT_packed)
+    
+    def is_balanced(self):
+        """
+        Returns True if the Boolean function is balanced, False otherwise.\n
+        Warning: the truth table must be up-to-date.
+
+        Returns
+        -------
+        bool
+            True if the function takes as many times the values 0 and 1.
+
+        """
+        return popcount(self.TT_packed) == 2**(self.l-1)
+    
     def is_resilient(self, r):
         """
         Returns True if the Boolean function is r-resilient, False otherwise.\n
@@ -424,6 +737,12 @@ class BF:
             True if the Boolean function is r-resilient.
 
         """
+        if r == self.tracked_resiliency: #maintained by flip_TT
+            return self.nb_nonzero_low_weight == 0
+        
+        if np is not None:
+            return not np.any(self.WS[self.monomials_degree <= r])
+        
         for i in range(len(self.WS)):
             if (self.monomials_degree[i] <= r) and (self.WS[i] != 0):
                 return False
@@ -445,15 +764,22 @@ class BF:
             True if the Boolean function is ai-algebraic-immune.
 
         """
-        #annulateurs de f+1
-        if get_annihilators(self.TT, self.l, ai-1) != []:
-            return False
-        
-        #annulateurs de f+1
-        if get_annihilators(vector_complement(self.TT), self.l, ai-1) != []:
-            return False
-        
-        return True
+        #annihilators of f and f+1, checked in a single pass with an early exit
+        return not has_annihilator(self.get_TT(), self.l, ai-1)
+    
+    def algebraic_immunity(self):
+        """
+        Returns the algebraic immunity of the Boolean function, and a minimal annihilator.\n
+        Warning: the truth table must be up-to-date.
+
+        Returns
+        -------
+        (integer, array of integers)
+            the algebraic immunity, and an annihilator of f (or of f+1) of this degree,
+            each integer representing a monomial.
+
+        """
+        return algebraic_immunity(self.get_TT(), self.l)
     
     def permute(self, permutation, new_object = False):
         """
@@ -476,19 +802,25 @@ class BF:
         a new object with the permuted function otherwise. 
 
         """
-        new_TT = [0]*(2**self.l)
-        for i in range(2**self.l):
-            new_TT[i] = self.TT[permute(i, permutation)]
+        TT = unpack_bits(self.TT_packed, 2**self.l)
+        if np is not None: #same as toolbox.permute, on every entry at once
+            x = np.arange(2**self.l)
+            index = np.zeros(2**self.l, dtype=np.int64)
+            for i in range(self.l):
+                index |= ((x >> (self.l-1-permutation[i])) & 1) << (self.l-1-i)
+            new_TT = pack_bits(TT[index])
+        else:
+            new_TT = pack_bits([TT[permute(i, permutation)] for i in range(2**self.l)])
             
         if new_object == False:
-            self.TT = new_TT
+            self.TT_packed = new_TT
             self.is_TT_uptodate = True
             self.is_ANF_uptodate = False
             self.is_WS_uptodate = False
             return
         else:
             new_bf = BF(self.l)
-            new_bf.set_TT(new_TT)
+            new_bf.set_TT_packed(new_TT)
             return new_bf
         
     def translate(self, translation, new_object = False):
@@ -508,19 +840,108 @@ class BF:
         Otherwise, a new instance of BF is returned.
 
         """
-        new_TT = [0]*(2**self.l)
         mask = 0
         for t in translation:
             mask = (mask << 1) ^ t
-        for i in range(2**self.l):
-            new_TT[i] = self.TT[mask ^ i]
+        TT = unpack_bits(self.TT_packed, 2**self.l)
+        if np is not None:
+            new_TT = pack_bits(TT[np.arange(2**self.l) ^ mask])
+        else:
+            new_TT = pack_bits([TT[mask ^ i] for i in range(2**self.l)])
         if new_object == False:
-            self.TT = new_TT
+            self.TT_packed = new_TT
             self.is_TT_uptodate = True
             self.is_ANF_uptodate = False
             self.is_WS_uptodate = False
             return
         else:
             new_bf = BF(self.l)
-            new_bf.set_TT(new_TT)
-            return new_bf
\ No newline at end of file
+            new_bf.set_TT_packed(new_TT)
+            return new_bf
+
+
+
+"""*********************************************************************
+    Class BF_block
+*********************************************************************"""
+class BF_block:
+    """
+    Block of Boolean functions of the same locality, stored as a 2D numpy array with one truth table per row.\n
+    The transforms are computed on the whole block at once, which allows to pay the Python overhead
+    once per block instead of once per function. This class requires numpy.
+    """
+    l = 0   #locality
+    
+    TT = None   #one truth table per row
+    WS = None   #one Walsh spectrum per row
+    ANF = None  #one ANF per row
+    
+    monomials_degree = None #degree/weight of each monomial/element for the ANF and WS
+    
+    def __init__(self, locality, TT_block):
+        """
+        Constructor of the class BF_block.
+
+        Parameters
+        ----------
+        locality : integer
+            Locality of the Boolean functions.
+        TT_block : 2D array of Booleans
+            One truth table of length 2**locality per row.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.l = locality
+        self.TT = np.asarray(TT_block, dtype=np.uint8)
+        self.WS = None
+        self.ANF = None
+        self.monomials_degree = get_monomials_degree(locality)
+        return
+    
+    def update_WS(self):
+        """
+        Update the Walsh spectra of the block with the truth tables.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.WS = self.TT.astype(np.int64)
+        self.WS *= 2
+        self.WS -= 1
+        Walsh_transform_inplace(self.WS, self.l)
+        return
+    
+    def update_ANF(self):
+        """
+        Update the ANFs of the block with the truth tables.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.ANF = Moebius_transform_inplace(self.TT.copy(), self.l)
+        return
+    
+    def is_resilient(self, r):
+        """
+        Returns a Boolean mask of the functions of the block that are r-resilient.\n
+        Warning: the Walsh spectra must be up-to-date.
+
+        Parameters
+        ----------
+        r : integer
+            resilience to verify.
+
+        Returns
+        -------
+        numpy array of Booleans
+            the i-th element is True if the i-th function of the block is r-resilient.
+
+        """
+        return ~np.any(self.WS[:, self.monomials_degree <= r], axis=1)
@@ -14,9 +14,11 @@ Limitation : so far, we can only work on the SANF, the two others are updated, b
 This module also allows to check its resiliency and algebraic immunity.
 """
 
-from toolbox import Truth_table_entry, bool_list_to_integer
-from RSF_toolbox import compute_representatives, representative_to_ANF, build_SANF_to_STT, build_STT_to_SWS
-from RSF_AI import Verification_AI
+from toolbox import np, bool_list_to_integer, integer_to_bool_list, popcount, timed_cached_property
+from RSF_tables import get_RSF_tables
+from RSF_AI import Verification_AI, Verification_AI_RSF, Input_order
+from annihilator import algebraic_immunity
+import time
 
 
 class RSF:
@@ -25,13 +27,12 @@ class RSF:
     SANF = []
     is_SANF_uptodate = False
     
-    STT = []
+    STT_packed = 0  #STT packed into an integer, the first element being the most significant bit
+    STT_unpacked = None #STT as a tuple of Booleans, unpacked from STT_packed on first access (see the STT property)
     is_STT_uptodate = False
-    SANF_to_STT = []
     
     SWS = []
     is_SWS_uptodate = False
-    build_STT_to_SWS = []
     
     TT = []
     is_TT_uptodate = False
@@ -39,38 +40,59 @@ class RSF:
     
     ANF = ""
     is_ANF_uptodate = False
-    SANF_to_ANF = []
     
     
     representatives = []    #representatives sorted by weight, then by increasing order
     nb_representatives = 0  #number of representatives
-    nb_representatives_by_weight = []   #number of representatives by weight
     
-    verification_AI = 0
+    tables = None   #tables of the locality, shared by the instances (see RSF_tables)
+    array_backend = False   #compute SWS and TT with numpy
+    target_AI = 0   #algebraic immunity of verification_AI and verification_AI_RSF
+    order_AI_parameters = ("lexicographic", False, None)   #strategy, adaptive and algebraic immunity of order_AI (None: target_AI), see set_order_AI
+    build_times = {}    #time taken to build each table, in seconds
     
+    #The following tables are built on first access (see toolbox.timed_cached_property):
+    #SANF_to_ANF, SANF_to_STT, SANF_to_STT_packed, STT_to_SWS, nb_representatives_by_weight,
+    #STT_to_SWS_array, representative_index_array (array backend and resilient_block only),
+    #verification_AI, verification_AI_RSF (annihilators on the representatives, checked before verification_AI, which is only used for an even locality),
+    #order_AI (order of the entries checked by verification_AI, see RSF_AI.Input_order)
     
 
-    def __init__(self, locality):
+    def __init__(self, locality, array_backend = False):
         """
-        Constructor of the class RSF (Rotational Symmetric Function).
+        Constructor of the class RSF (Rotational Symmetric Function).\n
+        Only the representatives are loaded, the conversion tables and the algebraic immunity verifications
+        are built on first access. The time taken to build each of them is recorded in build_times.
 
         Parameters
         ----------
         locality : integer
             Locality of the rotational symmetric function
+        array_backend : Boolean, optional
+            compute the SWS, the TT and the resiliency with numpy matrix products and indexing.
+            The results are the same as with the default backend (lists). The default is False.
 
         Returns
         -------
         None.
 
         """
+        if array_backend and np is None:
+            raise ImportError("the array backend of RSF requires numpy")
         self.l = locality
-        (self.representatives, self.STT_to_TT) = compute_representatives(locality)
+        self.array_backend = array_backend
+        self.build_times = {}
+        start = time.perf_counter()
+        self.tables = get_RSF_tables(locality)  #shared with the other instances of the same locality
+        self.build_times["tables"] = time.perf_counter() - start
+        self.representatives = self.tables.representatives
+        self.STT_to_TT = self.tables.STT_to_TT
         self.nb_representatives = len(self.representatives)
         
         
         self.SANF = [0]*self.nb_representatives
-        self.STT = [0]*self.nb_representatives
+        self.STT_packed = 0
+        self.STT_unpacked = None
         self.SWS = [0]*self.nb_representatives
         self.TT = [0]*(2**self.l)
         self.ANF = "0"
@@ -81,17 +103,109 @@ class RSF:
         self.is_ANF_uptodate = True
         self.is_TT_uptodate = True
         
-        self.SANF_to_ANF = ['('+representative_to_ANF(r)+')' for r in self.representatives]
-        self.SANF_to_STT = build_SANF_to_STT(self.representatives)
-        self.STT_to_SWS = build_STT_to_SWS(self.representatives)
-        
-        self.verification_AI = Verification_AI(locality, int((locality+1)/2)) #optimal AI by default
-        
-        self.nb_representatives_by_weight = [0]*(locality+1)
-        for r in self.representatives:
-            self.nb_representatives_by_weight[sum(r)] += 1
+        self.target_AI = int((locality+1)/2) #optimal AI by default
         
         return
+    
+    @property
+    def STT(self):
+        """
+        STT (Simplified Truth Table) as a tuple of Booleans, unpacked from STT_packed when it is read.
+        The tuple is read-only: the STT is modified through the setter or the SANF.
+        """
+        if self.STT_unpacked is None:
+            self.STT_unpacked = tuple(integer_to_bool_list(self.STT_packed, self.nb_representatives))
+        return self.STT_unpacked
+    
+    @STT.setter
+    def STT(self, new_STT):
+        """
+        Set a new STT, packed into STT_packed. The STT becomes the up-to-date form of the function:
+        the SANF, the ANF, the SWS and the TT are outdated (the SANF cannot be updated from the STT so far).
+        """
+        self.STT_unpacked = tuple(new_STT)
+        self.STT_packed = bool_list_to_integer(self.STT_unpacked)
+        self.is_STT_uptodate = True
+        self.is_SANF_uptodate = False
+        self.is_SWS_uptodate = False
+        self.is_ANF_uptodate = False
+        self.is_TT_uptodate = False
+    
+    @timed_cached_property
+    def SANF_to_ANF(self):
+        """
+        ANF of the orbit sum of each representative, between parentheses.
+        """
+        return ['('+a+')' for a in self.tables.ANF]
+    
+    @timed_cached_property
+    def SANF_to_STT(self):
+        """
+        Conversion matrix from SANF to STT, as read-only rows (see RSF_tables.RSF_tables).
+        """
+        return self.tables.SANF_to_STT
+    
+    @timed_cached_property
+    def SANF_to_STT_packed(self):
+        """
+        Rows of the conversion matrix from SANF to STT, packed into integers like STT_packed.
+        """
+        return self.tables.SANF_to_STT_packed
+    
+    @timed_cached_property
+    def STT_to_SWS(self):
+        """
+        Conversion matrix from STT to SWS, as read-only rows (see RSF_tables.RSF_tables).
+        """
+        return self.tables.STT_to_SWS
+    
+    @timed_cached_property
+    def STT_to_SWS_array(self):
+        """
+        Conversion matrix from STT to SWS, as a numpy matrix of int32.
+        """
+        return self.tables.STT_to_SWS_array
+    
+    @timed_cached_property
+    def representative_index_array(self):
+        """
+        Index of the representative of each input, as a numpy array.
+        """
+        return self.tables.representative_index_array
+    
+    @timed_cached_property
+    def nb_representatives_by_weight(self):
+        """
+        Number of representatives by weight.
+        """
+        nb_representatives_by_weight = [0]*(self.l+1)
+        for r in self.representatives:
+            nb_representatives_by_weight[sum(r)] += 1
+        return nb_representatives_by_weight
+    
+    @timed_cached_property
+    def verification_AI(self):
+        """
+        Verification of the algebraic immunity target_AI on the whole truth table.
+        """
+        return Verification_AI(self.l, self.target_AI)
+    
+    @timed_cached_property
+    def verification_AI_RSF(self):
+        """
+        Verification of the algebraic immunity target_AI on the representatives (complete for an odd locality).
+        """
+        return Verification_AI_RSF(self.l, self.target_AI, self.representatives)
+    
+    @timed_cached_property
+    def order_AI(self):
+        """
+        Order of the entries checked by is_algebraic_immune, lexicographic by default (see set_order_AI).
+        """
+        strategy, adaptive, algebraic_immunity = self.order_AI_parameters
+        if algebraic_immunity is None:
+            algebraic_immunity = self.target_AI
+        return Input_order(self.l, algebraic_immunity, strategy, adaptive)
         
         
     def set_SANF(self, new_SANF):
@@ -101,14 +215,14 @@ class RSF:
         Parameters
         ----------
         new_SANF : Array of Booleans
-            The new SANF of the rotational symmetric function.
+            The new SANF of the rotational symmetric function. It is copied, so that toggle_SANF does not modify it.
 
         Returns
         -------
         None.
 
         """
-        self.SANF = new_SANF
+        self.SANF = list(new_SANF)
         self.is_SANF_uptodate = True
         self.is_STT_uptodate = False
         self.is_SWS_uptodate = False
@@ -119,7 +233,8 @@ class RSF:
             
     def update_STT_from_SANF(self):
         """
-        Update the STT with the SANF.
+        Update the STT with the SANF.\n
+        The product with the conversion matrix is a XOR of the packed rows selected by the SANF.
 
         Returns
         -------
@@ -127,18 +242,48 @@ class RSF:
 
         """
         
-        #update STT
-        self.STT = [0]*self.nb_representatives
-        
         #multiply the vector SANF with the conversion matrix
+        rows = self.SANF_to_STT_packed
+        STT_packed = 0
         for i in range(self.nb_representatives):
             if self.SANF[i] == 1:
-                for j in range(self.nb_representatives):
-                    self.STT[j] ^= self.SANF_to_STT[i][j]
+                STT_packed ^= rows[i]
+        self.STT_packed = STT_packed
+        self.STT_unpacked = None
         
         self.is_STT_uptodate = self.is_SANF_uptodate
         return
     
+    def toggle_SANF(self, indexes):
+        """
+        Flips some elements of the SANF (in place).\n
+        If the STT is up-to-date, only the rows of the conversion matrix corresponding to the flipped elements are XORed into it,
+        which is faster than set_SANF when few elements change between two functions.
+
+        Parameters
+        ----------
+        indexes : iterable of integers
+            indexes of the SANF elements to flip.
+
+        Returns
+        -------
+        None.
+
+        """
+        rows = self.SANF_to_STT_packed
+        delta = 0
+        for i in indexes:
+            self.SANF[i] ^= 1
+            delta ^= rows[i]
+        
+        if self.is_STT_uptodate:
+            self.STT_packed ^= delta
+            self.STT_unpacked = None
+        self.is_SWS_uptodate = False
+        self.is_ANF_uptodate = False
+        self.is_TT_uptodate = False
+        return
+    
     def update_SWS_from_STT(self):
         """
         Update the SWS with the STT.
@@ -149,11 +294,16 @@ class RSF:
 
         """
         
+        if self.array_backend:
+            self.SWS = ((1 - 2*np.array(self.STT, dtype=np.int32)) @ self.STT_to_SWS_array).tolist()
+            self.is_SWS_uptodate = self.is_STT_uptodate
+            return
+        
         #initialisation
         self.SWS = [0]*self.nb_representatives
         
         #calcul de 1-2STT
-        tmp = [1 - 2*self.STT[i] for i in range(self.nb_representatives)]
+        tmp = [1 - 2*s for s in self.STT]
         
         #multiply the vector tmp with the conversion matrix
         for i in range(self.nb_representatives):
@@ -194,12 +344,18 @@ class RSF:
         None.
 
         """
+        if self.array_backend: #every input takes the value of its representative
+            self.TT = np.array(self.STT, dtype=np.uint8)[self.representative_index_array].tolist()
+            self.is_TT_uptodate = self.is_STT_uptodate
+            return
+        
         #initialisation
         self.TT = [0]*(2**self.l)
         
         #copy the representatives
+        STT = self.STT
         for i in range(self.nb_representatives):
-            self.TT[bool_list_to_integer(self.representatives[i])] = self.STT[i]
+            self.TT[bool_list_to_integer(self.representatives[i])] = STT[i]
             
             
         #copy the other elements
@@ -268,7 +424,13 @@ class RSF:
         """
         
         Returns True if the Boolean function is r-resilient, False otherwise.\n
-        Otimised version of the method is_resilient. However, is_resilient should be preferred if the Walsh spectrum is already updated.
+        Otimised version of the method is_resilient. However, is_resilient should be preferred if the Walsh spectrum is already updated.\n
+        The SWS of the representatives of weight at most r are computed one by one from STT_packed, and the computation stops
+        at the first nonzero one. With S the set of orbits where f is 1, the element k of the SWS is
+        SWS(0)[k] - 2 * (sum of the sizes of the orbits of S) + 4 * (sum of o(j,k) over S), o(j,k) being the number of elements
+        of the orbit j with an odd scalar product with the representative k. Both sums are computed by popcounts
+        on bit planes (see RSF_tables.get_SWS_odd_planes).
+        With the array backend, they are the product of 1-2STT with the first columns of STT_to_SWS_array.
 
         Parameters
         ----------
@@ -284,25 +446,74 @@ class RSF:
         #update STT
         self.update_STT()
         
-        #initialisation
-        partial_SWS = [0]*self.nb_representatives
-        
-        #compute 1-2STT
-        tmp = [1 - 2*self.STT[i] for i in range(self.nb_representatives)]
-        
         #number of elements of SWS to compute
         stop = sum(self.nb_representatives_by_weight[0:(resilience+1)])
+        if stop == 0:
+            return True
         
+        if self.array_backend:
+            partial_SWS = (1 - 2*np.array(self.STT, dtype=np.int32)) @ self.STT_to_SWS_array[:, :stop]
+            return not partial_SWS.any()
         
-        for i in range(stop):
-            for j in range(self.nb_representatives):
-                partial_SWS[i] += tmp[j] * self.STT_to_SWS[j][i] #multiply vector tmp by the conversion matrix
-            
-            if partial_SWS[i] != 0:  #its Walsh element must be null
+        S = self.STT_packed
+        size = 0
+        for b, plane in enumerate(self.tables.SWS_size_planes):
+            size += popcount(S & plane) << b
+        if 2**self.l - 2*size != 0:    #the SWS of the null function is 2^l for the representative 0 (of weight 0), 0 otherwise
+            return False
+        
+        odd_planes = self.tables.get_SWS_odd_planes(stop)
+        for k in range(1, stop):
+            odd = 0
+            for b, plane in enumerate(odd_planes[k]):
+                odd += popcount(S & plane) << b
+            if 4*odd != 2*size:  #its Walsh element must be null
                 return False
         
         return True
-    
+
+    def resilient_block(self, indexes, resilience):
+        """
+        Returns the r-resilient functions among a block of 2^k functions (requires numpy).\n
+        The function i of the block is the current one with the SANF elements indexes[b] flipped for each bit b set in i.
+        The STT of the block are the current STT XORed with the combinations of k rows of SANF_to_STT, built by doubling
+        (the product over GF(2) of the 2^k x k matrix of the bits of i with these rows). The SWS of the representatives
+        of weight at most r are then the product of the 2^k x n matrix 1-2STT with the first columns of STT_to_SWS.
+
+        Parameters
+        ----------
+        indexes : array of integers
+            indexes of the k SANF elements enumerated by the block.
+        resilience : integer
+            resilience to verify.
+
+        Returns
+        -------
+        array of integers
+            the numbers i of the r-resilient functions of the block, in increasing order.
+
+        """
+        if np is None:
+            raise ImportError("RSF.resilient_block requires numpy")
+
+        #update STT
+        self.update_STT()
+
+        #STT of the block
+        STT = np.empty((2**len(indexes), self.nb_representatives), dtype=np.uint8)
+        STT[0] = self.STT
+        for b, i in enumerate(indexes):
+            STT[2**b:2**(b+1)] = STT[0:2**b] ^ np.asarray(self.SANF_to_STT[i], dtype=np.uint8)
+
+        #number of elements of SWS to compute
+        stop = sum(self.nb_representatives_by_weight[0:(resilience+1)])
+        if stop == 0:
+            return list(range(len(STT)))
+
+        #the product is made with floats (BLAS), it is exact since the elements of the SWS are at most 2^l
+        SWS = (1 - 2*STT.astype(np.float64)) @ self.STT_to_SWS_array[:, 0:stop].astype(np.float64)
+        return np.flatnonzero(~SWS.any(axis = 1)).tolist()
+
 
     def is_resilient(self, resiliency):
         """
@@ -333,6 +544,9 @@ class RSF:
     def is_algebraic_immune(self, algebraic_immunity):
         """
         Returns True if the Boolean function is ai-algebraic-immune, False otherwise.\n
+        The annihilators are looked for on the representatives (see RSF_AI.Verification_AI_RSF). For an odd locality, this decides
+        the algebraic immunity. For an even locality, only the rotation symmetric annihilators are found this way,
+        and the whole truth table is then checked in the order of order_AI.
 
         Parameters
         ----------
@@ -346,18 +560,78 @@ class RSF:
 
         """
         
-        if self.verification_AI.ai != algebraic_immunity: #if parameters are different from previous call
-            self.verification_AI = Verification_AI(self.l, algebraic_immunity) #full initialisation
+        if self.target_AI != algebraic_immunity: #if parameters are different from previous call
+            self.target_AI = algebraic_immunity
+            #the verifications are rebuilt on next access
+            RSF.verification_AI.invalidate(self)
+            RSF.verification_AI_RSF.invalidate(self)
         else:
-            self.verification_AI.reset()    #partial reinitialisation
+            self.verification_AI_RSF.reset()    #partial reinitialisation
+        
+        #rotation symmetric annihilators
+        self.update_STT()
+        STT = self.STT
+        for j in range(self.nb_representatives):
+            if not self.verification_AI_RSF.check_and_add(j, STT[j]):
+                return False
+        if self.verification_AI_RSF.is_complete: #no annihilator in any eigenspace of the rotation
+            return True
+        
+        self.verification_AI.reset()
+        if self.order_AI.ai != algebraic_immunity:
+            self.set_order_AI(self.order_AI.strategy, self.order_AI.adaptive, algebraic_immunity)
         
         #update truth table
         self.update_TT()
         
-        #add every entry one by one
-        inputs = Truth_table_entry(self.l)
-        for i in range(2**self.l):
-            new_input = inputs.next_entry()
-            if not self.verification_AI.check_and_add(new_input, self.TT[i]):    #if an entry contradicts the algebraic immunity
+        #add every entry one by one, in the order of order_AI
+        for i, x in enumerate(self.order_AI.order):
+            if not self.verification_AI.check_and_add(x, self.TT[x]):    #if an entry contradicts the algebraic immunity
+                self.order_AI.record(i+1, True)
                 return False
-        return True
\ No newline at end of file
+        self.order_AI.record(2**self.l, False)
+        return True
+    
+    def set_order_AI(self, strategy, adaptive = False, algebraic_immunity = None):
+        """
+        Sets the order in which is_algebraic_immune checks the entries of the truth table (see RSF_AI.Input_order).\n
+        The statistics of the previous order are lost, they can be read in order_AI before.
+        Only the functions of even locality without rotation symmetric annihilators reach the whole truth table check and its statistics.
+
+        Parameters
+        ----------
+        strategy : string
+            "lexicographic", "weight" or "independence".
+        adaptive : Boolean, optional
+            move the inputs where the functions are rejected to the front. The default is False.
+        algebraic_immunity : integer, optional
+            algebraic immunity the order is built for (only used by "independence").
+            The default is the one of the last call to is_algebraic_immune.
+
+        Returns
+        -------
+        None.
+
+        """
+        if algebraic_immunity is None:
+            algebraic_immunity = self.target_AI
+        self.order_AI_parameters = (strategy, adaptive, algebraic_immunity)
+        RSF.order_AI.invalidate(self)   #rebuilt on next access
+        return
+    
+    def algebraic_immunity(self):
+        """
+        Returns the algebraic immunity of the rotational symmetric function, and a minimal annihilator.
+
+        Returns
+        -------
+        (integer, array of integers)
+            the algebraic immunity, and an annihilator of f (or of f+1) of this degree,
+            each integer representing a monomial.
+
+        """
+        
+        #update truth table
+        self.update_TT()
+        
+        return algebraic_immunity(self.TT, self.l)
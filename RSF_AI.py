@@ -9,15 +9,18 @@ that allows to check the algebraic immunity of function defined as a truth table
 @author:
 """
 
-from reedmuller import ReedMuller
-from toolbox import rank_increase, bool_list_to_integer
-
-reedmuller_param = (0,0)
-RM = []
+from functools import lru_cache
+from numbers import Integral
+from reedmuller import ReedMuller, get_reedmuller_matrix
+from toolbox import np, Echelon_basis, Galois_field, bool_list_to_integer, has_full_column_rank, multiplicative_order, popcount
+from RSF_toolbox import compute_orbits, integer_orbit
 
+@lru_cache(maxsize = 8)
 def get_reedmuller(r,m):
     """
-    Returns the Reed-Muller matrix RM(r,m)
+    Returns the Reed-Muller matrix RM(r,m) as a list of rows (see reedmuller.ReedMuller).\n
+    The last 8 matrices are cached, the returned matrix must not be modified.\n
+    Verification_AI uses the packed matrices of reedmuller.get_reedmuller_matrix instead.
 
     Parameters
     ----------
@@ -32,26 +35,22 @@ def get_reedmuller(r,m):
         RM(r,m).
 
     """
-    global reedmuller_param
-    global RM
-    
-    #if not the same parameters as last call
-    if reedmuller_param != (r,m):
-        RM = ReedMuller(r,m)
-        reedmuller_param = (r,m)
-    return RM
+    return ReedMuller(r,m)
 
 class Verification_AI:
     """
     The Verification_AI class allows to check the algebraic immunity of a function.\n
     The function must be defined as a truth table and the check_and_add method must be called for each element of the truth table.\n
+    The rows of RM(r,m) are packed into integers (see reedmuller.get_reedmuller_matrix), and the matrices of the inputs where f is 0 and 1
+    are kept as echelon bases (see toolbox.Echelon_basis): adding an element costs a few XORs.
     
     """
     
     l = 0
     ai = 0
-    M_AI = []
-    Mat = [[],[]]
+    M_AI = []   #packed rows of RM(ai-1,l), indexed by the input (see reedmuller.ReedMuller_matrix)
+    column_mask = 0 #mask of the columns of RM(ai-1,l) in the rows of M_AI
+    Mat = [None, None]  #echelon bases of the inputs where f is 0 and 1
     nb_remaining_elements = 0 #number of elements to add to the truth table
     rank = [0,0]
     rank_max = 0
@@ -75,21 +74,26 @@ class Verification_AI:
         
         self.l = locality
         self.ai = algebraic_immunity
-        self.Mat = [[],[]]
+        self.Mat = [Echelon_basis(), Echelon_basis()]
         self.rank = [0,0]
         self.nb_remaining_elements = 2**(self.l)
         
-        #Initialisation of RM(r,m)
-        M_AI = get_reedmuller(algebraic_immunity-1,locality)
-        M_AI_tmp = [[M_AI[i][j] for j in range(len(M_AI[i]))] for i in range(len(M_AI))]    #conversion
-        self.M_AI = M_AI_tmp
+        #Initialisation of RM(r,m), shared with the cache of reedmuller (not copied)
+        RM = get_reedmuller_matrix(algebraic_immunity-1,locality)
+        self.M_AI = RM.rows
+        self.column_mask = RM.column_mask
         
-        self.nb_monomes_AI = len(M_AI[0])
+        self.nb_monomes_AI = RM.nb_columns
         self.rank_max = self.nb_monomes_AI
         
     def corresponding_line_AI(self, l_uple):
-        i = 2**self.l - (1 + bool_list_to_integer(l_uple))
-        return self.M_AI[i][0:self.nb_monomes_AI]
+        """
+        Returns the packed row of RM(r,m) corresponding to an input, given as an array of Booleans or an integer
+        (including the integers of numpy).
+        """
+        if not isinstance(l_uple, Integral):
+            l_uple = bool_list_to_integer(l_uple)
+        return self.M_AI[l_uple] & self.column_mask
 
     def check_and_add(self, X, y):   
         """
@@ -99,7 +103,7 @@ class Verification_AI:
 
         Parameters
         ----------
-        X : array of Booleans
+        X : array of Booleans, or integer
             input X of the function.
         y : Boolean
             evaluation of f in X.
@@ -113,18 +117,11 @@ class Verification_AI:
         """
         self.nb_remaining_elements -= 1
         
-        #recover the corresponding line in RM(r,m)
-        line = self.corresponding_line_AI(X)
-        
-        #add it to the matrix
-        self.Mat[y].append(line)
-        
-        #check whether it increases the rank
-        res = rank_increase(self.Mat[y])
-        if res == True: #rank default
+        #add the corresponding line in RM(r,m) to the matrix, and check whether it increases the rank
+        if self.Mat[y].add(self.corresponding_line_AI(X)): #rank default
             self.rank[y] += 1
         
-        if sum(self.rank) + self.nb_remaining_elements < 2*self.rank_max: #there exists an annihilator of lower degree
+        if self.rank[0] + self.rank[1] + self.nb_remaining_elements < 2*self.rank_max: #there exists an annihilator of lower degree
             return False
         else:
             return True
@@ -139,7 +136,357 @@ class Verification_AI:
         None.
 
         """
-        self.Mat = [[],[]]
+        self.Mat[0].reset()
+        self.Mat[1].reset()
         self.rank = [0,0]
         self.nb_remaining_elements = 2**(self.l)
         return
+    
+    def snapshot(self):
+        """
+        Returns a token describing the current state, to come back to it with rollback.\n
+        Together with rollback, it allows a depth-first search on the truth table: the elements shared
+        by several truth tables are added once, and the search is pruned as soon as check_and_add fails.
+
+        Returns
+        -------
+        token : tuple
+            state of the verification.
+
+        """
+        return (self.Mat[0].snapshot(), self.Mat[1].snapshot(), self.nb_remaining_elements)
+    
+    def rollback(self, token):
+        """
+        Comes back to the state of a previous snapshot, removing the elements added since.
+
+        Parameters
+        ----------
+        token : tuple
+            token returned by snapshot.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.Mat[0].rollback(token[0])
+        self.Mat[1].rollback(token[1])
+        self.rank = [self.Mat[0].rank, self.Mat[1].rank]
+        self.nb_remaining_elements = token[2]
+        return
+
+
+class Verification_AI_RSF:
+    """
+    The Verification_AI_RSF class checks the algebraic immunity of a rotation symmetric function,
+    working on the representatives of the orbits instead of the whole truth table.\n
+    A rotation symmetric polynomial of degree at most ai-1 is a sum of the polynomials P_i, P_i being the sum of the monomials
+    in the orbit of the i-th representative of weight at most ai-1. Since f and the P_i are rotation symmetric,
+    such a polynomial annihilates f if and only if it vanishes on the representatives where f is 1.
+    The rank problem has one row by representative and one column by orbit of weight at most ai-1, instead of 2^l rows and
+    as many columns as monomials of degree at most ai-1.\n
+    For an odd locality, the other annihilators are found the same way over GF(2^m), m being the order of 2 modulo l:
+    the rotation r of the variables has order l, odd, so it is diagonalisable over GF(2^m), which contains the l-th roots of unity.
+    Since f is rotation symmetric, its annihilators of degree at most ai-1 form a space stable by r, the sum of its intersections with the
+    eigenspaces of r. An eigenvector g of eigenvalue w is a sum of the polynomials P_i,w = sum over k of w^k M(r^k(u_i)),
+    u_i being the i-th representative and M(u) the monomial u, for the orbits whose size s satisfies w^s = 1.
+    As g(r(x)) = w^-1 g(x), g annihilates f if and only if it vanishes on the representatives where f is 1: each eigenspace is also
+    a rank problem of the size of the representatives. The Frobenius map sends the eigenspace of w onto the eigenspace of w^2,
+    so one eigenvalue is checked by cyclotomic coset of 2 modulo l (the coset of 0 being the rotation symmetric annihilators).\n
+    If check_and_add returns False, f or f+1 has an annihilator of degree smaller than ai: f is not ai-algebraic-immune.
+    If it returns True for every representative and is_complete is True (odd locality), f is ai-algebraic-immune.
+    For an even locality, only the rotation symmetric annihilators are checked, Verification_AI must be used to conclude.
+    
+    """
+    
+    l = 0
+    ai = 0
+    rows = []   #packed rows, bit i of rows[j] is P_i evaluated in the j-th representative
+    Mat = [None, None]  #echelon bases of the representatives where f is 0 and 1
+    rank = [0,0]
+    rank_max = 0    #number of representatives of weight at most ai-1
+    nb_remaining_representatives = 0 #number of representatives to add
+    
+    is_complete = False #the eigenspaces are checked: True returned for every representative proves the algebraic immunity
+    field = None    #GF(2^m) (see toolbox.Galois_field)
+    eigenspaces = []    #[rows, nonnull, nb_rows, rank_max] by eigenvalue: rows[j] is the row of the j-th representative,
+                        #nonnull[j] is False if it is null, nb_rows[y] is the number of nonnull rows added where f is y
+    added = [[],[]] #representatives added where f is 0 and 1
+    
+    def __init__(self, locality, algebraic_immunity, representatives, complete = True):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        locality : integer
+            number of variables to consider.
+        algebraic_immunity : integer
+            algebraic immunity to check.
+        representatives : array of arrays of Booleans
+            representatives sorted by weight, then by increasing order (see RSF_toolbox.compute_representatives).
+        complete : Boolean, optional
+            check the eigenspaces of the rotation if the locality is odd. If False, only the rotation symmetric annihilators are checked.
+            The default is True.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.l = locality
+        self.ai = algebraic_immunity
+        self.Mat = [Echelon_basis(), Echelon_basis()]
+        self.rank = [0,0]
+        self.nb_remaining_representatives = len(representatives)
+        
+        orbit_index = compute_orbits(locality)[1] #index of the representative of each input
+        integers = [bool_list_to_integer(r) for r in representatives]
+        
+        #P_i(x) is the parity of the number of monomials of the orbit i included in x
+        self.rows = []
+        for x in integers:
+            row = 0
+            s = x
+            while True: #for all s included in x
+                if popcount(s) < algebraic_immunity:
+                    row ^= 1 << orbit_index[s]
+                if s == 0:
+                    break
+                s = (s-1) & x
+            self.rows.append(row)
+        self.rank_max = sum(1 for r in representatives if sum(r) < algebraic_immunity)
+        
+        self.is_complete = complete and locality % 2 == 1
+        self.eigenspaces = []
+        self.added = [[],[]]
+        if not self.is_complete:
+            return
+        
+        #the eigenvalues are the powers of w = g^step, a primitive l-th root of unity
+        self.field = Galois_field(multiplicative_order(2, locality))
+        step = (self.field.size - 1) // locality
+        orbits = [integer_orbit(x, locality) for x in integers]
+        rotation = {}   #k such that v = r^k(u), u being the representative of v
+        for orbit in orbits:
+            for k, v in enumerate(orbit):
+                rotation[v] = k
+        
+        cosets = set()
+        for e in range(1, locality):
+            coset = min((e * 2**i) % locality for i in range(multiplicative_order(2, locality)))
+            if coset in cosets:
+                continue
+            cosets.add(coset)
+            #P_i,w is null if w^s != 1, s being the size of the orbit i
+            columns = {}
+            for i, x in enumerate(integers):
+                if popcount(x) < algebraic_immunity and (e * len(orbits[i])) % locality == 0:
+                    columns[i] = len(columns)
+            if len(columns) == 0:
+                continue
+            rows = []
+            nonnull = []
+            for i, x in enumerate(integers):
+                row = [0]*len(columns)
+                nonnull.append((e * len(orbits[i])) % locality == 0)
+                if not nonnull[-1]: #g(x) = w^-s g(x), the row is null
+                    rows.append(row)
+                    continue
+                s = x
+                while True: #for all s included in x
+                    if popcount(s) < algebraic_immunity and orbit_index[s] in columns:
+                        row[columns[orbit_index[s]]] ^= self.field.exp[(step * e * rotation[s]) % (self.field.size - 1)]
+                    if s == 0:
+                        break
+                    s = (s-1) & x
+                rows.append(row)
+            if np is not None:
+                rows = np.array(rows, dtype=np.int32)
+            self.eigenspaces.append([rows, nonnull, [0,0], len(columns)])
+        self.added = [[],[]]
+    
+    def check_and_add(self, j, y):
+        """
+        Checks whether adding STT[j] = y to the current simplified truth table creates an annihilator
+        of degree smaller than ai. If not, the method returns True, otherwise it returns False.\n
+        To verify an entire simplified truth table, this method must be called for each representative (in any order).
+
+        Parameters
+        ----------
+        j : integer
+            index of the representative.
+        y : Boolean
+            evaluation of f in the representative.
+
+        Returns
+        -------
+        Boolean
+            False if f or f+1 has an annihilator of degree smaller than ai, True otherwise.
+
+        """
+        self.nb_remaining_representatives -= 1
+        if self.Mat[y].add(self.rows[j]):
+            self.rank[y] += 1
+        
+        #each matrix must reach the full rank
+        if min(self.rank) + self.nb_remaining_representatives < self.rank_max:
+            return False
+        
+        if not self.eigenspaces:
+            return True
+        
+        #the eigenspaces are checked once every representative is added, the rank of a matrix being at most its number of rows
+        self.added[y].append(j)
+        for (rows, nonnull, nb_rows, rank_max) in self.eigenspaces:
+            nb_rows[y] += nonnull[j]
+            if min(nb_rows) + self.nb_remaining_representatives < rank_max:
+                return False
+        if self.nb_remaining_representatives == 0:
+            for (rows, nonnull, nb_rows, rank_max) in self.eigenspaces:
+                for added in self.added:
+                    if np is not None:
+                        matrix = rows[added]
+                    else:
+                        matrix = [list(rows[i]) for i in added]
+                    if not has_full_column_rank(self.field, matrix):
+                        return False
+        return True
+    
+    def reset(self):
+        """
+        Reset the current simplified truth table to null.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.Mat[0].reset()
+        self.Mat[1].reset()
+        self.rank = [0,0]
+        for eigenspace in self.eigenspaces:
+            eigenspace[2] = [0,0]
+        self.added = [[],[]]
+        self.nb_remaining_representatives = len(self.rows)
+        return
+
+
+class Input_order:
+    """
+    The Input_order class gives the order in which the entries of a truth table are checked by Verification_AI.\n
+    A function without the algebraic immunity is rejected as soon as the ranks of the two matrices are too small,
+    so the order decides how many entries are consumed before the rejection. The available strategies are:\n
+    - "lexicographic": increasing inputs (the order of Truth_table_entry),\n
+    - "weight": inputs sorted by Hamming weight, then increasing,\n
+    - "independence": the inputs are split into successive maximal sets of linearly independent rows of RM(ai-1,l),
+    taken one after the other (each set is built greedily in lexicographic order).\n
+    If adaptive is True, the inputs where previous functions were rejected are moved to the front of the order
+    (sorted by decreasing number of rejections, the strategy breaking ties).\n
+    The number of checks and of entries consumed before each rejection are recorded, to compare the strategies.
+    
+    """
+    
+    strategies = ("lexicographic", "weight", "independence")
+    
+    l = 0
+    ai = 0
+    strategy = "lexicographic"
+    adaptive = False
+    order = []  #inputs, in the order they are checked
+    rejections = [] #number of rejections at each input (adaptive only)
+    nb_checks = 0   #number of functions checked
+    nb_rejections = 0   #number of functions rejected
+    nb_entries_before_rejection = 0 #total number of entries consumed by the rejected functions
+    
+    def __init__(self, locality, algebraic_immunity, strategy = "lexicographic", adaptive = False):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        locality : integer
+            number of variables to consider.
+        algebraic_immunity : integer
+            algebraic immunity to check.
+        strategy : string, optional
+            "lexicographic", "weight" or "independence". The default is "lexicographic".
+        adaptive : Boolean, optional
+            move the inputs where the functions are rejected to the front. The default is False.
+
+        Returns
+        -------
+        None.
+
+        """
+        if strategy not in self.strategies:
+            raise ValueError("unknown strategy " + repr(strategy) + ", expected one of " + repr(self.strategies))
+        self.l = locality
+        self.ai = algebraic_immunity
+        self.strategy = strategy
+        self.adaptive = adaptive
+        
+        n = 2**locality
+        if strategy == "lexicographic":
+            self.order = list(range(n))
+        elif strategy == "weight":
+            self.order = sorted(range(n), key = popcount)
+        else:
+            RM = get_reedmuller_matrix(algebraic_immunity-1, locality)
+            self.order = []
+            remaining = list(range(n))
+            while remaining: #extract a maximal set of independent rows from the remaining inputs
+                basis = Echelon_basis()
+                others = []
+                for x in remaining:
+                    if basis.add(RM.rows[x] & RM.column_mask):
+                        self.order.append(x)
+                    else:
+                        others.append(x)
+                remaining = others
+        
+        self.rejections = [0]*n
+        self.nb_checks = 0
+        self.nb_rejections = 0
+        self.nb_entries_before_rejection = 0
+        
+    def record(self, nb_entries, rejected):
+        """
+        Records the result of a check.
+
+        Parameters
+        ----------
+        nb_entries : integer
+            number of entries consumed by the check, the last one being order[nb_entries-1].
+        rejected : Boolean
+            True if the function was rejected.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.nb_checks += 1
+        if not rejected:
+            return
+        self.nb_rejections += 1
+        self.nb_entries_before_rejection += nb_entries
+        if self.adaptive:
+            #the rejecting input goes up while it has more rejections than the previous input
+            i = nb_entries - 1
+            x = self.order[i]
+            self.rejections[x] += 1
+            while i > 0 and self.rejections[self.order[i-1]] < self.rejections[x]:
+                self.order[i] = self.order[i-1]
+                i -= 1
+            self.order[i] = x
+        return
+    
+    def average_entries_before_rejection(self):
+        """
+        Returns the average number of entries consumed before a rejection (0 if no function was rejected).
+        """
+        if self.nb_rejections == 0:
+            return 0
+        return self.nb_entries_before_rejection / self.nb_rejections
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@author:
+
+This module provides the tables of the RSF class for a given locality (representatives, conversion matrices, ANF strings).
+
+The tables only depend on the locality: they are computed once, saved in the cache directory,
+and memory-mapped by the next processes. All the RSF instances of a process share the same read-only tables.
+"""
+
+import mmap, os, struct, sys, time
+from functools import cached_property
+from array import array
+from toolbox import np, integer_to_bool_list, timed_cached_property
+from RSF_toolbox import compute_orbits, representative_to_ANF, build_SANF_to_STT, build_STT_to_SWS, decimation_permutations
+
+cache_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+cache_version = 1   #to increase when the format of the file changes
+
+#magic number, version, locality, number of representatives, byte order (1 if little endian)
+header = struct.Struct("=4sIIII")
+magic = b"RSFT"
+
+RSF_tables_cache = {}   #locality -> RSF_tables
+
+
+def cache_file_name(locality):
+    """
+    Returns the name of the cache file of a locality.
+    """
+    return os.path.join(cache_directory, "rsf-tables-" + str(locality) + ".bin")
+
+def padding(size):
+    """
+    Returns the number of bytes to add after a section of a given size, so that the next one is aligned on 8 bytes.
+    """
+    return -size % 8
+
+
+class RSF_tables:
+    """
+    The RSF_tables class contains the tables of the RSF class for a given locality.\n
+    The tables are either computed, or memory-mapped from a cache file. In the latter case,
+    the arrays are memoryviews on the file (the rows of the matrices are views too).
+    The tables are therefore read-only sequences: they support indexing, slicing, len and iteration,
+    but their type (list, array.array or memoryview) depends on whether the cache file was used,
+    so they must neither be modified nor compared to lists (copy them with list() if needed).
+
+    """
+
+    l = 0   #locality
+    representatives = []    #representatives as arrays of Booleans, sorted by weight, then by increasing order
+    representatives_integers = []   #representatives as integers
+    representative_index = []   #index of the representative of each input
+    STT_to_TT = []  #index of a smaller element of the same orbit, -1 for the representatives
+    is_mapped = False   #True if the tables are views on a cache file
+    build_times = {}    #time taken to compute each table, in seconds
+    
+    #The following tables are computed on first access (see toolbox.timed_cached_property), or mapped from the cache file:
+    #SANF_to_STT (rows of 0 and 1), SANF_to_STT_packed (rows packed into integers), STT_to_SWS (rows of integers between -l and l),
+    #ANF (ANF of the orbit sum of each representative, see RSF_toolbox.representative_to_ANF),
+    #STT_to_SWS_array and representative_index_array (numpy arrays, never saved),
+    #SWS_size_planes and SWS_odd_planes (bit-sliced STT_to_SWS, never saved, see get_SWS_odd_planes),
+    #decimations (permutations of the representatives by the decimations, never saved)
+
+    def __init__(self, locality):
+        """
+        Computes the representatives of a locality, the other tables are computed on first access.
+
+        Parameters
+        ----------
+        locality : integer
+            Locality of the rotational symmetric functions.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.l = locality
+        self.build_times = {}
+        start = time.perf_counter()
+        (self.representatives_integers, self.representative_index) = compute_orbits(locality)
+        self.representatives = [integer_to_bool_list(x, locality) for x in self.representatives_integers]
+        self.STT_to_TT = array('q', [self.representatives_integers[i] for i in self.representative_index])
+        for x in self.representatives_integers:
+            self.STT_to_TT[x] = -1
+        self.build_times["representatives"] = time.perf_counter() - start
+        self.is_mapped = False
+    
+    @timed_cached_property
+    def SANF_to_STT(self):
+        """
+        Conversion matrix from SANF to STT.
+        """
+        return build_SANF_to_STT(self.representatives)
+    
+    @timed_cached_property
+    def SANF_to_STT_packed(self):
+        """
+        Rows of SANF_to_STT packed into integers, the first element being the most significant bit (see toolbox.bool_list_to_integer).
+        """
+        binary_digits = bytes.maketrans(b"\x00\x01", b"01")
+        return [int(bytes(row).translate(binary_digits), 2) for row in self.SANF_to_STT]
+    
+    @timed_cached_property
+    def STT_to_SWS(self):
+        """
+        Conversion matrix from STT to SWS.
+        """
+        return build_STT_to_SWS(self.representatives)
+    
+    @timed_cached_property
+    def STT_to_SWS_array(self):
+        """
+        STT_to_SWS as a contiguous numpy matrix of int32 (requires numpy).
+        """
+        return np.ascontiguousarray(np.asarray(self.STT_to_SWS, dtype=np.int32))
+    
+    @timed_cached_property
+    def representative_index_array(self):
+        """
+        representative_index as a numpy array, to expand an STT into a truth table by indexing (requires numpy).
+        """
+        return np.asarray(self.representative_index, dtype=np.intp)
+    
+    @timed_cached_property
+    def SWS_size_planes(self):
+        """
+        Bit planes of the orbit sizes: bit j of SWS_size_planes[b] (packed like SANF_to_STT_packed) is bit b of the size of the orbit j.
+        """
+        n = len(self.representatives)
+        sizes = [self.STT_to_SWS[j][0] for j in range(n)] #STT_to_SWS[j][0] is the size of the orbit j
+        return [sum(((sizes[j] >> b) & 1) << (n-1-j) for j in range(n)) for b in range(self.l.bit_length())]
+    
+    @cached_property
+    def SWS_odd_planes(self):
+        """
+        Bit planes of the columns of STT_to_SWS, extended by get_SWS_odd_planes.
+        """
+        return []
+    
+    def get_SWS_odd_planes(self, stop):
+        """
+        Returns the bit planes of the first stop columns of STT_to_SWS.\n
+        STT_to_SWS[j][k] is the size of the orbit j minus twice the number o(j,k) of its elements with an odd scalar product
+        with the representative k. Bit j of get_SWS_odd_planes(stop)[k][b] (packed like SANF_to_STT_packed) is bit b of o(j,k):
+        the sum of the column k over a set of orbits is a few popcounts (see RSF.is_resilient_optimised).
+
+        Parameters
+        ----------
+        stop : integer
+            number of columns.
+
+        Returns
+        -------
+        planes : array of arrays of integers
+            the planes of the columns, the array can be longer than stop.
+
+        """
+        planes = self.SWS_odd_planes
+        n = len(self.representatives)
+        for k in range(len(planes), stop):
+            odd = [(self.STT_to_SWS[j][0] - self.STT_to_SWS[j][k]) // 2 for j in range(n)]
+            planes.append([sum(((odd[j] >> b) & 1) << (n-1-j) for j in range(n)) for b in range(self.l.bit_length())])
+        return planes
+    
+    @timed_cached_property
+    def decimations(self):
+        """
+        Permutations of the representatives induced by the decimations of the variables (see RSF_toolbox.decimation_permutations).
+        """
+        return decimation_permutations(self.representatives_integers, self.representative_index, self.l)
+    
+    @timed_cached_property
+    def ANF(self):
+        """
+        ANF of the orbit sum of each representative.
+        """
+        return [representative_to_ANF(r) for r in self.representatives]
+
+    def save(self, file_name):
+        """
+        Writes the tables into a cache file, read by load_RSF_tables. The tables not computed yet are computed.\n
+        The file is written under a temporary name, then renamed, so that concurrent processes never read a partial file.
+
+        Parameters
+        ----------
+        file_name : string
+            name of the cache file.
+
+        Returns
+        -------
+        None.
+
+        """
+        n = len(self.representatives)
+        ANF = [a.encode() for a in self.ANF]
+        ANF_offsets = [0]
+        for a in ANF:
+            ANF_offsets.append(ANF_offsets[-1] + len(a))
+        sections = [array('q', self.representatives_integers).tobytes(),
+                    array('q', self.representative_index).tobytes(),
+                    array('q', self.STT_to_TT).tobytes(),
+                    b"".join(bytes(row) for row in self.SANF_to_STT),
+                    b"".join(array('b', row).tobytes() for row in self.STT_to_SWS),
+                    array('q', ANF_offsets).tobytes(),
+                    b"".join(ANF)]
+
+        temporary_name = file_name + "." + str(os.getpid()) + ".tmp"
+        try:
+            with open(temporary_name, "wb") as file:
+                file.write(header.pack(magic, cache_version, self.l, n, sys.byteorder == "little"))
+                file.write(bytes(padding(header.size)))
+                for section in sections:
+                    file.write(section)
+                    file.write(bytes(padding(len(section))))
+            os.replace(temporary_name, file_name)
+        except BaseException:
+            #the partial file is removed, the error is raised again
+            try:
+                os.remove(temporary_name)
+            except OSError:
+                pass
+            raise
+        return
+
+
+def load_RSF_tables(locality, file_name):
+    """
+    Memory-maps the tables of a locality from a cache file written by RSF_tables.save.
+
+    Parameters
+    ----------
+    locality : integer
+        Locality of the rotational symmetric functions.
+    file_name : string
+        name of the cache file.
+
+    Returns
+    -------
+    tables : RSF_tables, or None
+        the tables, or None if the file is missing, of another version, or invalid.
+
+    """
+    try:
+        with open(file_name, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    except (OSError, ValueError): #missing or empty file
+        return None
+    view = memoryview(buffer)
+    if len(view) < header.size:
+        return None
+    (file_magic, version, file_locality, n, little_endian) = header.unpack(view[0:header.size])
+    if file_magic != magic or version != cache_version or file_locality != locality or little_endian != (sys.byteorder == "little"):
+        return None
+
+    offset = header.size + padding(header.size)
+    def section(size, format):
+        nonlocal offset
+        if offset + size > len(view):
+            raise ValueError("truncated cache file")
+        result = view[offset:offset+size].cast(format)
+        offset += size + padding(size)
+        return result
+
+    tables = RSF_tables.__new__(RSF_tables)
+    tables.l = locality
+    tables.build_times = {}
+    try:
+        tables.representatives_integers = section(8*n, 'q')
+        tables.representative_index = section(8*2**locality, 'q')
+        tables.STT_to_TT = section(8*2**locality, 'q')
+        SANF_to_STT = section(n*n, 'B')
+        STT_to_SWS = section(n*n, 'b')
+        ANF_offsets = section(8*(n+1), 'q')
+        ANF = section(ANF_offsets[n], 'B')
+    except ValueError:
+        return None
+    tables.representatives = [integer_to_bool_list(x, locality) for x in tables.representatives_integers]
+    tables.SANF_to_STT = [SANF_to_STT[i*n:(i+1)*n] for i in range(n)]
+    tables.STT_to_SWS = [STT_to_SWS[i*n:(i+1)*n] for i in range(n)]
+    tables.ANF = [bytes(ANF[ANF_offsets[i]:ANF_offsets[i+1]]).decode() for i in range(n)]
+    tables.is_mapped = True
+    return tables
+
+def get_RSF_tables(locality, persistent = True):
+    """
+    Returns the tables of a locality, shared by all the RSF instances of the process.\n
+    The tables are memory-mapped from the cache directory if possible. Otherwise they are computed,
+    and saved in the cache directory if persistent is True (the failure to write the file is ignored).
+    If persistent is False, each table is only computed on first access.
+
+    Parameters
+    ----------
+    locality : integer
+        Locality of the rotational symmetric functions.
+    persistent : Boolean, optional
+        use the cache directory. The default is True.
+
+    Returns
+    -------
+    tables : RSF_tables
+        the tables of the locality, which are read-only sequences (lists, array.array or memoryviews, see RSF_tables).
+
+    """
+    if locality in RSF_tables_cache:
+        return RSF_tables_cache[locality]
+
+    tables = None
+    if persistent:
+        file_name = cache_file_name(locality)
+        tables = load_RSF_tables(locality, file_name)
+    if tables is None:
+        tables = RSF_tables(locality)
+        if persistent:
+            try:
+                tables.save(file_name)
+            except OSError: #read-only directory, full disk...
+                pass
+
+    RSF_tables_cache[locality] = tables
+    return tables
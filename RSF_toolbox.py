@@ -4,18 +4,84 @@
 @author: 
 """
 
-from toolbox import Truth_table_entry, bool_list_to_integer
+from array import array
+from math import gcd
+from toolbox import bool_list_to_integer, integer_to_bool_list, popcount
 
 """*********************************************************************
 *********************************Tool Box*******************************
 *********************************************************************"""
 
+def necklaces(locality):
+    """
+    Generates the binary necklaces of a given length in increasing order, with the FKM algorithm
+    (Fredricksen, Kessler and Maiorana).\n
+    A necklace is the smallest element of an orbit under rotation, the first bit being the most significant one:
+    the necklaces are the representatives of compute_representatives, as integers.
+    The algorithm enumerates the prenecklaces in amortized constant time each.
+
+    Parameters
+    ----------
+    locality : integer
+        number of bits.
+
+    Yields
+    ------
+    x : integer
+        the necklaces, in increasing order.
+
+    """
+    mask = 2**locality - 1
+    x = 0
+    yield x
+    while x != mask:
+        #the last 0 is set to 1, its position p (starting at 1) is the period of the new prenecklace
+        last_zero = ~x & (x+1)
+        p = locality - last_zero.bit_length() + 1
+        #the first p bits are repeated
+        prefix = (x | last_zero) >> (locality - p)
+        x = prefix
+        length = p
+        while length < locality:
+            x = (x << p) | prefix
+            length += p
+        x >>= length - locality
+        if locality % p == 0:
+            yield x
+    return
+
+def compute_orbits(locality):
+    """
+    Returns the representatives of a given locality as integers (the first bit being the most significant one),
+    sorted by weight, then by increasing order, and the index of the representative of each input.
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables to consider.
+
+    Returns
+    -------
+    (representatives, representative_index) : (array of integers, array.array of integers)
+        representative_index[x] is the index in representatives of the representative of the orbit of x.
+
+    """
+    representatives = sorted(necklaces(locality), key = popcount) #the sort is stable: increasing order by weight
+    representative_index = array('l', [0])*(2**locality)
+    mask = 2**locality - 1
+    for i, x in enumerate(representatives):
+        for rotate in range(locality):
+            representative_index[x] = i
+            x = ((x << 1) | (x >> (locality-1))) & mask
+    return (representatives, representative_index)
+
 def compute_representatives(locality):
     """
     Returns the representatives for a given locality.
     The output contains:\n
         -the representatives sorted by weight, then by lexicographic order.\n
-        -a list of indexes to find the representative of a non-representative element.
+        -a list of indexes to find the representative of a non-representative element.\n
+    The representatives are generated as necklaces (see necklaces and compute_orbits).
 
     Parameters
     ----------
@@ -24,31 +90,19 @@ def compute_representatives(locality):
 
     Returns
     -------
-    (representatives, truth_table_index) : (array of arrays of Booleans, array of integer)
+    (representatives, truth_table_index) : (array of arrays of Booleans, array.array of integer)
     The output contains:\n
         -the representatives sorted by weight, then by lexicographic order.\n
         -a list of indexes to find the representative of a non-representative element.
-        For example, if truth_table_index[6] = 3, then the representative of the 8th element is the 3rd (starting at zero).
+        For example, if truth_table_index[6] = 3, then the representative of the 7th element is the 4th element (starting at zero).
+        truth_table_index is -1 for the representatives.
 
     """
-    
-    inputs = Truth_table_entry(locality)
-    representatives = []
-    truth_table_index = [-1]*(2**locality)
-    
-    for i in range(2**locality):   #for all entries
-        new_input = [j for j in inputs.next_entry()] #local copy
-        is_representative = True
-        for rotate in range(locality-1): #all possible rotations
-            new_input.insert(0, new_input.pop())    #rotate
-            if bool_list_to_integer(new_input) < i: #it is not a representative
-                is_representative = False
-                truth_table_index[i] = bool_list_to_integer(new_input) #index to the representative
-        if is_representative:
-            new_input.insert(0, new_input.pop())    #rotate
-            representatives.append(new_input)
-    representatives.sort(key = sum) #sort by weight
-    return (representatives, truth_table_index)
+    (representatives, representative_index) = compute_orbits(locality)
+    truth_table_index = array('l', [representatives[i] for i in representative_index])
+    for x in representatives:
+        truth_table_index[x] = -1
+    return ([integer_to_bool_list(x, locality) for x in representatives], truth_table_index)
 
 def representative_to_ANF(representative):
     """
@@ -157,19 +211,37 @@ def vector_orbit(v):
     
     return orbit
     
+def integer_orbit(x, locality):
+    """
+    Compute the orbit of an integer under rotation of its locality bits, without repetition.
+    """
+    mask = 2**locality - 1
+    orbit = [x]
+    y = ((x << 1) | (x >> (locality-1))) & mask
+    while y != x:
+        orbit.append(y)
+        y = ((y << 1) | (y >> (locality-1))) & mask
+    return orbit
+
 def build_SANF_to_STT(representatives):
     """
     Conversion matrix from SANF to STT.
     """
     n = len(representatives)
+    if n == 0:
+        return []
+    l = len(representatives[0])
+    integers = [bool_list_to_integer(r) for r in representatives]
     SANF_to_STT = [[0]*n for i in range(n)] #null matrix in F2^(n*n)
     
     for i in range(n): #for each row, representatives[i]
-        orbit = vector_orbit(representatives[i])
+        orbit = integer_orbit(integers[i], l)
+        row = SANF_to_STT[i]
         for j in range(n): #for each column, representatives[j]
+            x = integers[j]
             for vector in orbit: #for each vector in the orbit of representatives[i]
-                if vector_include(representatives[j], vector):
-                    SANF_to_STT[i][j] ^= 1
+                if vector | x == x: #representatives[j] includes vector
+                    row[j] ^= 1
                     
     return SANF_to_STT
 
@@ -178,16 +250,117 @@ def build_STT_to_SWS(representatives):
     Conversion matrix from STT to SWS.
     """
     n = len(representatives)
+    if n == 0:
+        return []
+    l = len(representatives[0])
+    integers = [bool_list_to_integer(r) for r in representatives]
     STT_to_SWS = [[0]*n for i in range(n)] #null matrix in F2^(n*n)
     
     for i in range(n):  #for each row, representatives[i]
-        orbit = vector_orbit(representatives[i])
+        orbit = integer_orbit(integers[i], l)
+        row = STT_to_SWS[i]
         for j in range(n): #for each column, representatives[j]
+            x = integers[j]
+            odd = 0
             for vector in orbit:    #for each vector in the orbit of representatives[i]
-                STT_to_SWS[i][j] += (-1)**(sum([representatives[j][k] * vector[k] for k in range(len(vector))])) #(-1) ** (scalar)
-                
+                odd += popcount(x & vector) & 1 #scalar product
+            row[j] = len(orbit) - 2*odd #sum of (-1) ** (scalar)
+
     return STT_to_SWS
 
+def decimation_permutations(representatives, representative_index, locality):
+    """
+    Permutations of the representatives induced by the decimations x_i -> x_{k*i mod l}, with gcd(k,l) = 1 and k != 1.\n
+    A decimation maps the orbits onto orbits of the same weight, and the rotational symmetric functions onto rotational
+    symmetric functions with the same resiliency and algebraic immunity. The SANF (or the STT) of the image of a function
+    is its SANF permuted (see permute_SANF). The reversal of the variables is the decimation k = l-1.
+
+    Parameters
+    ----------
+    representatives : array of integers
+        representatives as integers (see compute_orbits).
+    representative_index : array of integers
+        index of the representative of each input (see compute_orbits).
+    locality : integer
+        number of variables to consider.
+
+    Returns
+    -------
+    permutations : array of arrays of integers
+        permutations[p][j] is the index of the image of the orbit j by the decimation p.
+
+    """
+    permutations = []
+    for k in range(2, locality):
+        if gcd(k, locality) != 1:
+            continue
+        permutation = []
+        for x in representatives:
+            y = 0
+            for i in range(locality):
+                if (x >> (locality-1-i)) & 1:   #x_i is set
+                    y |= 1 << (locality-1-(k*i % locality))
+            permutation.append(representative_index[y])
+        permutations.append(permutation)
+    return permutations
+
+def permute_SANF(SANF, permutation):
+    """
+    Returns the SANF of the image of a function by a decimation (see decimation_permutations).
+    """
+    image = [0]*len(SANF)
+    for j, s in enumerate(SANF):
+        if s:
+            image[permutation[j]] = 1
+    return image
+
+def decimation_tables(permutations, indexes):
+    """
+    Lookup tables computing the images by decimations of a part of a SANF packed into an integer,
+    the element indexes[i] of the SANF being the bit len(indexes)-1-i (as in toolbox.bool_list_to_integer).
+    The decimations must map the indexes onto themselves. The images are computed byte by byte (see permute_integer).
+
+    Parameters
+    ----------
+    permutations : array of arrays of integers
+        permutations of the representatives (see decimation_permutations).
+    indexes : array of integers
+        indexes of the packed part of the SANF.
+
+    Returns
+    -------
+    tables : array of arrays of arrays of integers
+        tables[p][c][v] is the image by the permutation p of the byte c (bits 8c to 8c+7) of value v.
+
+    """
+    nb_bits = len(indexes)
+    position = {j: nb_bits-1-i for (i, j) in enumerate(indexes)} #bit of each index
+    tables = []
+    for permutation in permutations:
+        bit_image = [position[permutation[indexes[nb_bits-1-b]]] for b in range(nb_bits)]
+        chunks = []
+        for c in range(0, nb_bits, 8):
+            table = [0]*256
+            for v in range(1, 256):
+                low = (v & -v).bit_length() - 1 #lowest bit set, the others are in table[v with this bit cleared]
+                if c + low < nb_bits:
+                    table[v] = table[v & (v-1)] | (1 << bit_image[c + low])
+                else:
+                    table[v] = table[v & (v-1)]
+            chunks.append(table)
+        tables.append(chunks)
+    return tables
+
+def permute_integer(x, tables):
+    """
+    Returns the image of a packed part of a SANF by a decimation, with its tables (an element of decimation_tables).
+    """
+    image = 0
+    for table in tables:
+        image |= table[x & 255]
+        x >>= 8
+    return image
+
 
 
 
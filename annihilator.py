@@ -11,7 +11,8 @@ Unlike other modules of this projet, monomials are represented by integers inste
 However, a simple binary decomposition makes the two representations equivalent.
 """
 
-from RSF_toolbox import Truth_table_entry, bool_list_to_integer
+from toolbox import popcount, Echelon_basis
+from reedmuller import get_reedmuller_matrix
 
 
 def evaluate_function(f,x):
@@ -61,11 +62,88 @@ def clean_monomials(annihilator):
             i += 1
 
 
-def get_annihilators(f, locality, deg_annihilator):
+def get_monomials(locality, degree):
+    """
+    Returns the monomials of degree smaller or equal to degree, sorted by degree, then by increasing order.\n
+    In the packed representation of a function (see get_evaluation_masks), the j-th bit is the coefficient
+    of the j-th monomial of this list. These are the columns of the packed matrix RM(degree, locality).
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables.
+    degree : integer
+        maximal degree of the monomials.
+
+    Returns
+    -------
+    array of integers
+        monomials, sorted by degree.
+
+    """
+    return get_reedmuller_matrix(degree, locality).monomials
+
+def get_evaluation_masks(locality, degree):
+    """
+    Returns the evaluation masks of the monomials of degree smaller or equal to degree.\n
+    A function of degree smaller or equal to degree is packed into an integer, its j-th bit being
+    the coefficient of the j-th monomial of get_monomials(locality, degree).
+    The x-th mask has its j-th bit set if and only if the j-th monomial evaluated in x gives 1,
+    so that a packed function g is evaluated in x with popcount(g & masks[x]) & 1.\n
+    The masks are the packed rows of RM(degree, locality) (see reedmuller.get_reedmuller_matrix).
+    They may be shared with a matrix of higher degree, and then contain bits of monomials of higher degree:
+    this does not change the evaluation of a function of degree smaller or equal to degree.
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables.
+    degree : integer
+        maximal degree of the monomials.
+
+    Returns
+    -------
+    array of integers
+        one mask per input x.
+
+    """
+    return get_reedmuller_matrix(degree, locality).rows
+
+def unpack_annihilator(g, monomials):
+    """
+    Converts a packed annihilator into an array of integers, each integer representing a monomial.
+
+    Parameters
+    ----------
+    g : integer
+        packed annihilator, see get_evaluation_masks.
+    monomials : array of integers
+        monomials corresponding to each bit, see get_monomials.
+
+    Returns
+    -------
+    array of integers
+        monomials of the annihilator, in increasing order.
+
+    """
+    annihilator = []
+    while g:
+        low_bit = g & -g
+        annihilator.append(monomials[low_bit.bit_length() - 1])
+        g ^= low_bit
+    annihilator.sort()
+    return annihilator
+
+def get_annihilators(f, locality, deg_annihilator, four_russians = False):
     """
     Computes a basis of annihilators of the function f if it exists.\n
     The degree of the returned annihilators are smaller or equal to deg_annihilator.\n
-    Each annihilator is represented as an array of integer, each integer representing a monomial.
+    Each annihilator is represented as an array of integer, each integer representing a monomial.\n
+    Internally, each candidate annihilator is packed into an integer (see get_evaluation_masks),
+    its evaluation in x is a mask AND plus a parity, and the eliminations are XORs.
+    The four_russians option computes the annihilators as the kernel of the evaluation matrix
+    with the method of the Four Russians, which is faster for large systems. The returned basis
+    spans the same space, but its elements may differ.
 
     Parameters
     ----------
@@ -75,6 +153,8 @@ def get_annihilators(f, locality, deg_annihilator):
         locality of f.
     deg_annihilator : integer
         maximal degree of the annihilators.
+    four_russians : Boolean, optional
+        use the method of the Four Russians. The default is False.
 
     Returns
     -------
@@ -82,63 +162,480 @@ def get_annihilators(f, locality, deg_annihilator):
         basis of annihilators.
 
     """
-
-    #list of monomials of weight less or equal to deg_annihilator
-    tt = Truth_table_entry(locality)
-    monomials = []
-    for i in range(2**locality):
-        if(sum(tt.next_entry()) <= deg_annihilator):
-            monomials.append(bool_list_to_integer(tt.current)) 
+    monomials = get_monomials(locality, deg_annihilator)
+    masks = get_evaluation_masks(locality, deg_annihilator)
+    support = [x for x in range(len(f)) if f[x] == 1]
     
-    #initialisation
-    S=[[0]]
-    i=0
-    if 1 in f:
-        x=f.index(1)
-    else:
-        return [[monomials[j]] for j in range (len(monomials))]
-    
-    while 1:
-        #empile?
-        while (i+1) <len(monomials) and monomials[i+1] <= x:
-            S.append([monomials[i+1]])
-            i += 1
-            
-        #depile?
-        S_index= len(S) - 1
-        while S_index>=0  and evaluate_function(S[S_index],x) != 1:
-            S_index-=1
-        if S_index>=0:
+    if four_russians:
+        column_mask = (1 << len(monomials)) - 1
+        basis = kernel_four_russians([masks[x] & column_mask for x in support], len(monomials))
+        return [unpack_annihilator(g, monomials) for g in basis]
+    
+    #candidate annihilators, one per monomial in increasing order
+    position = {monomials[j]: j for j in range(len(monomials))}
+    S = [1 << position[monomial] for monomial in sorted(monomials)]
+    
+    for x in support:
+        mask = masks[x]
+        
+        #the last candidate not cancelled in x is the pivot
+        S_index = len(S) - 1
+        while S_index >= 0 and popcount(S[S_index] & mask) & 1 == 0:
+            S_index -= 1
+        if S_index >= 0:
+            pivot = S.pop(S_index)
             for j in range(S_index):
-                if evaluate_function(S[j],x)==1:
-                    S[j] += S[S_index]
-                    clean_monomials(S[j])
-            S.pop(S_index) 
+                if popcount(S[j] & mask) & 1:
+                    S[j] ^= pivot
+    
+    return [unpack_annihilator(g, monomials) for g in S]
+
+def has_annihilator(f, locality, deg_annihilator, complement = True):
+    """
+    Checks whether the function f (or f+1 if complement is True) has a nonzero annihilator of degree
+    smaller or equal to deg_annihilator, without computing a basis of annihilators.\n
+    The truth table is processed in one pass, and the evaluations of the monomials in each input x
+    (see get_evaluation_masks) are added to the echelon basis of f or f+1 depending on f(x).
+    f has an annihilator if and only if the rank of the evaluations on its support is smaller than the number of monomials,
+    so the function stops as soon as the remaining inputs cannot fill the rank anymore (an annihilator exists),
+    or as soon as the ranks are full (no annihilator).
+
+    Parameters
+    ----------
+    f : array of Booleans, or integer
+        function to annihilate, as a truth table or packed truth table (see toolbox.pack_bits).
+    locality : integer
+        locality of f.
+    deg_annihilator : integer
+        maximal degree of the annihilators.
+    complement : Boolean, optional
+        If True (default), the annihilators of f+1 are searched too.
+
+    Returns
+    -------
+    bool
+        True if an annihilator of f (or of f+1) of degree smaller or equal to deg_annihilator exists.
+
+    """
+    nb_monomials = len(get_monomials(locality, deg_annihilator))
+    masks = get_evaluation_masks(locality, deg_annihilator)
+    column_mask = (1 << nb_monomials) - 1
+    if isinstance(f, int):
+        f = [(f >> x) & 1 for x in range(2**locality)]
+    
+    basis = [Echelon_basis(), Echelon_basis()]  #evaluations on the support of f+1 and f
+    remaining = [2**locality - sum(f), sum(f)]  #number of inputs still to process for f+1 and f
+    full = [not complement, False]  #the full rank of f+1 is not required if complement is False
+    
+    if remaining[1] < nb_monomials or (complement and remaining[0] < nb_monomials): #not enough inputs to reach the full rank
+        return True
+    
+    for x in range(2**locality):
+        y = f[x]
+        remaining[y] -= 1
+        if full[y]:
+            continue
+        basis[y].add(masks[x] & column_mask)
+        if basis[y].rank + remaining[y] < nb_monomials: #the rank cannot be full anymore
+            return True
+        if basis[y].rank == nb_monomials:
+            full[y] = True
+            if full[0] and full[1]:
+                return False
+    
+    #the rank of every considered support is full
+    return False
+
+class Annihilator_space:
+    """
+    Class Annihilator_space.\n
+    Space of the annihilators of a function of degree smaller or equal to a current degree,
+    that can be extended degree by degree without restarting the elimination.\n
+    Functions are packed into integers with the monomials sorted by degree (see get_evaluation_masks),
+    so that the monomials of degree d+1 are added after those of degree d.
+    The echelon state is kept as a basis of the whole space of functions, split in:\n
+        -annihilators: a basis of the annihilators of the function (they vanish on its support).\n
+        -pivots: for each input x of a maximal set of support inputs with independent evaluations,
+        a function c_x such that c_x(x) = 1 and c_x vanishes on the other pivot inputs.\n
+        -dependent: the other inputs of the support, whose evaluations depend on those of the pivots.\n
+    The pivots added from an annihilator (see add_point) are recorded in vanishing while their functions c_x are known
+    to vanish on every dependent input, so that removing them again does not scan the dependent inputs (see remove_point).
+    """
+    
+    l = 0   #locality
+    degree = -1 #current maximal degree of the annihilators
+    nb_monomials = 0    #number of monomials of degree smaller or equal to degree
+    masks = []  #evaluation masks, see get_evaluation_masks
+    annihilators = []   #basis of annihilators
+    pivots = {} #pivot input x -> c_x
+    dependent = {}  #dependent inputs of the support
+    vanishing = set()   #pivot inputs x whose c_x is known to vanish on every dependent input
+    
+    def __init__(self, support, locality, max_degree):
+        """
+        Constructor. The space is initialised at degree -1, i.e. without any monomial.
+
+        Parameters
+        ----------
+        support : array of integers
+            support of the function to annihilate.
+        locality : integer
+            number of variables.
+        max_degree : integer
+            maximal degree the space can be extended to.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.l = locality
+        self.degree = -1
+        self.nb_monomials = 0
+        self.masks = get_evaluation_masks(locality, max_degree)
+        self.annihilators = []
+        self.pivots = {}
+        self.dependent = dict.fromkeys(support)
+        self.vanishing = set()
+        return
+    
+    def add_monomial(self):
+        """
+        Adds the next monomial (in the order of get_monomials) to the space of functions.\n
+        The monomial is first cancelled on the pivot inputs, then either it becomes the function c_z of
+        a dependent input z that it does not cancel, or it is a new annihilator.
+
+        Returns
+        -------
+        None.
+
+        """
+        masks = self.masks
+        v = 1 << self.nb_monomials
+        self.nb_monomials += 1
         
-        #jump?
-        """if S == [] or S == [[0]]:
-            i += 1
-            if i >= len(monomials):
-                return []
-            S.append([monomials[i]])
-            x = monomials[i]"""
-            
-        #loop?
-        xp = x+1
-        while xp < len(f) and f[xp] != 1:
-            xp+=1
-        if xp == len(f):
-            x = xp
-            break
-        else:
-            x = xp
+        #cancel v on every pivot input
+        for x, c_x in self.pivots.items():
+            if popcount(v & masks[x]) & 1:
+                v ^= c_x
+        
+        #search a dependent input on which v does not vanish
+        for z in self.dependent:
+            mask = masks[z]
+            if popcount(v & mask) & 1:
+                del self.dependent[z]
+                for x in self.pivots:
+                    if popcount(self.pivots[x] & mask) & 1:
+                        self.pivots[x] ^= v
+                        self.vanishing.discard(x)
+                self.pivots[z] = v
+                return
+        
+        #v vanishes on the whole support
+        self.annihilators.append(v)
+        return
+    
+    def add_point(self, x):
+        """
+        Adds the input x to the support of the function.\n
+        If an annihilator does not vanish in x, it becomes the function c_x of the new pivot x
+        and is cancelled from the other annihilators and pivot functions: O((nb of annihilators + nb of pivots) * words) operations.
+        Otherwise x is dependent, and only the pivots recorded in vanishing are checked.
+
+        Parameters
+        ----------
+        x : integer
+            input to add to the support.
+
+        Returns
+        -------
+        None.
+
+        """
+        mask = self.masks[x]
+        pivot = 0
+        for i in range(len(self.annihilators)):
+            if popcount(self.annihilators[i] & mask) & 1:
+                pivot = self.annihilators.pop(i)
+                break
+        if pivot == 0: #every annihilator vanishes in x
+            self.dependent[x] = None
+            self.vanishing = {y for y in self.vanishing if popcount(self.pivots[y] & mask) & 1 == 0}
+            return
+        
+        for j in range(i, len(self.annihilators)): #the annihilators before i vanish in x
+            if popcount(self.annihilators[j] & mask) & 1:
+                self.annihilators[j] ^= pivot
+        for y in self.pivots:   #the annihilator vanishes on the dependent inputs, vanishing is unchanged
+            if popcount(self.pivots[y] & mask) & 1:
+                self.pivots[y] ^= pivot
+        self.pivots[x] = pivot
+        self.vanishing.add(x)
+        return
+    
+    def remove_point(self, x):
+        """
+        Removes the input x from the support of the function.\n
+        If x is a pivot, its function c_x vanishes on the other pivots: it becomes the function of a dependent
+        input on which it does not vanish, or a new annihilator if there is none.\n
+        Removing a dependent input takes a constant time. Removing a pivot scans the dependent inputs until one of them
+        is not cancelled by c_x, then updates the pivot functions: O((nb of dependent inputs scanned + nb of pivots) * words)
+        operations, where words is the number of machine words of nb_monomials bits. The scan is usually short, since c_x
+        does not vanish on about half of the dependent inputs depending on x, but it covers every dependent input when c_x
+        vanishes on all of them. This is skipped for the pivots recorded in vanishing, such as an input added by add_point
+        and removed again (a flip of the truth table undone by Annihilator_tracker.flip).
+
+        Parameters
+        ----------
+        x : integer
+            input to remove from the support.
+
+        Returns
+        -------
+        None.
+
+        """
+        if x in self.dependent:
+            del self.dependent[x]
+            return
+        
+        c_x = self.pivots.pop(x)
+        if x in self.vanishing: #c_x vanishes on the whole support
+            self.vanishing.discard(x)
+            self.annihilators.append(c_x)
+            return
+        
+        masks = self.masks
+        for z in self.dependent:
+            mask = masks[z]
+            if popcount(c_x & mask) & 1: #z replaces x as a pivot
+                del self.dependent[z]
+                for y in self.pivots:
+                    if popcount(self.pivots[y] & mask) & 1:
+                        self.pivots[y] ^= c_x
+                        self.vanishing.discard(y)
+                self.pivots[z] = c_x
+                return
+        
+        #c_x vanishes on the whole support
+        self.annihilators.append(c_x)
+        return
+    
+    def extend_degree(self):
+        """
+        Adds the monomials of degree self.degree+1 to the space of functions.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.degree += 1
+        stop = len(get_monomials(self.l, self.degree))
+        while self.nb_monomials < stop:
+            self.add_monomial()
+        return
+
+class Annihilator_tracker:
+    """
+    Class Annihilator_tracker.\n
+    Keeps track of the annihilators of f and f+1 of degree smaller or equal to a given degree,
+    while the truth table of f is modified one entry at a time (e.g. during a local search
+    or a Gray code enumeration, see BF.flip_TT).\n
+    When an input moves from the support of f to the support of f+1 (or conversely),
+    it is removed from the echelon state of one function and added to the other one
+    (see Annihilator_space), instead of recomputing both bases from scratch.
+    """
+    
+    l = 0   #locality
+    degree = 0  #maximal degree of the annihilators
+    TT = 0  #packed truth table, bit x is f(x)
+    spaces = [] #Annihilator_space of f+1 and f
+    
+    def __init__(self, f, locality, degree):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        f : array of Booleans, or integer
+            truth table of the function, or packed truth table (see toolbox.pack_bits).
+        locality : integer
+            locality of f.
+        degree : integer
+            maximal degree of the annihilators.
+
+        Returns
+        -------
+        None.
+
+        """
+        if not isinstance(f, int):
+            f = sum(1 << x for x in range(2**locality) if f[x] == 1)
+        self.l = locality
+        self.degree = degree
+        self.TT = f
+        self.spaces = [Annihilator_space([x for x in range(2**locality) if (f >> x) & 1 == y], locality, degree) for y in (0,1)]
+        for space in self.spaces:
+            while space.degree < degree:
+                space.extend_degree()
+        return
+    
+    def flip(self, x):
+        """
+        Flips the entry x of the truth table, and updates the annihilators of f and f+1.
+
+        Parameters
+        ----------
+        x : integer
+            entry of the truth table to flip.
+
+        Returns
+        -------
+        None.
+
+        """
+        y = (self.TT >> x) & 1
+        self.spaces[y].remove_point(x)
+        self.spaces[y ^ 1].add_point(x)
+        self.TT ^= 1 << x
+        return
     
-    #empile?
-    while (i+1) <len(monomials) and monomials[i+1] <= x:
-        S.append([monomials[i+1]])
-        i += 1
+    def has_annihilator(self):
+        """
+        Returns True if f or f+1 has a nonzero annihilator of degree smaller or equal to self.degree.
+        """
+        return self.spaces[0].annihilators != [] or self.spaces[1].annihilators != []
+    
+    def get_annihilators(self):
+        """
+        Returns a basis of annihilators of f and a basis of annihilators of f+1,
+        in the format of get_annihilators (each integer representing a monomial).
+
+        Returns
+        -------
+        (array, array)
+            bases of annihilators of f and f+1.
+
+        """
+        monomials = get_monomials(self.l, self.degree)
+        return ([unpack_annihilator(g, monomials) for g in self.spaces[1].annihilators],
+                [unpack_annihilator(g, monomials) for g in self.spaces[0].annihilators])
+
+def algebraic_immunity(f, locality):
+    """
+    Computes the algebraic immunity of the function f, and a minimal annihilator.\n
+    The annihilators of f and f+1 are computed degree by degree with the class Annihilator_space,
+    the elimination of degree d extending the one of degree d-1.
+
+    Parameters
+    ----------
+    f : array of Booleans
+        truth table of the function.
+    locality : integer
+        locality of f.
+
+    Returns
+    -------
+    (algebraic_immunity, annihilator) : (integer, array of integers)
+        the algebraic immunity of f, and an annihilator of this degree, of f if it exists, of f+1 otherwise.
+        The annihilator is an array of integers, each integer representing a monomial.
+
+    """
+    max_degree = (locality + 1) // 2  #the algebraic immunity is at most ceil(l/2)
+    monomials = get_monomials(locality, max_degree)
+    space_f = Annihilator_space([x for x in range(2**locality) if f[x] == 1], locality, max_degree)
+    space_fp1 = Annihilator_space([x for x in range(2**locality) if f[x] == 0], locality, max_degree)
+    
+    for degree in range(max_degree + 1):
+        space_f.extend_degree()
+        space_fp1.extend_degree()
+        for space in (space_f, space_fp1):
+            if space.annihilators != []:
+                return (degree, unpack_annihilator(space.annihilators[0], monomials))
+    
+    return (max_degree, []) #not reached
+
+def kernel_four_russians(rows, nb_columns, block_size = 8):
+    """
+    Computes a basis of the kernel of a Boolean matrix with the method of the Four Russians.\n
+    The matrix is reduced to its reduced row echelon form, block_size columns at a time:
+    the pivots of the block are searched, the combinations of the pivot rows are tabulated
+    for every value of the block, and each other row is reduced with a single lookup in this table.
+
+    Parameters
+    ----------
+    rows : array of integers
+        the matrix, each row being packed into an integer.
+    nb_columns : integer
+        number of columns of the matrix.
+    block_size : integer, optional
+        number of columns processed at once. The default is 8.
+
+    Returns
+    -------
+    array of integers
+        basis of the kernel, i.e. of the vectors v such that popcount(row & v) is even for every row.
+
+    """
+    rows = list(rows)
+    pivot_columns = [] #pivot column of each row rows[0:len(pivot_columns)]
+    
+    for block in range(0, nb_columns, block_size):
+        width = min(block_size, nb_columns - block)
+        
+        #search the pivots of the block, the scanned rows are reduced by the pivots already found
+        first = len(pivot_columns)
+        for column in range(block, block + width):
+            bit = 1 << column
+            r = len(pivot_columns)
+            while r < len(rows):
+                row = rows[r]
+                for t in range(first, len(pivot_columns)):
+                    if (row >> pivot_columns[t]) & 1:
+                        row ^= rows[t]
+                rows[r] = row
+                if row & bit:
+                    break
+                r += 1
+            if r == len(rows): #no pivot in this column
+                continue
+            rows[r], rows[len(pivot_columns)] = rows[len(pivot_columns)], rows[r]
+            pivot = rows[len(pivot_columns)]
+            for t in range(first, len(pivot_columns)): #the pivots of the block are reduced with each other
+                if rows[t] & bit:
+                    rows[t] ^= pivot
+            pivot_columns.append(column)
+        
+        if len(pivot_columns) == first:
+            continue
+        
+        #table of the combinations of pivot rows, indexed by the value of the block
+        block_pivot = [0]*width
+        for t in range(first, len(pivot_columns)):
+            block_pivot[pivot_columns[t] - block] = rows[t]
+        table = [0]*(2**width)
+        for i in range(1, len(table)):
+            low_bit = i & -i
+            table[i] = table[i ^ low_bit] ^ block_pivot[low_bit.bit_length() - 1]
+        
+        #reduce every other row with a single lookup
+        block_mask = 2**width - 1
+        for i in range(len(rows)):
+            if i < first or i >= len(pivot_columns):
+                rows[i] ^= table[(rows[i] >> block) & block_mask]
     
-    return S
+    #a kernel vector per free column
+    pivot_rows = rows[0:len(pivot_columns)]
+    free_columns = sorted(set(range(nb_columns)) - set(pivot_columns))
+    basis = []
+    for column in free_columns:
+        v = 1 << column
+        for i in range(len(pivot_rows)):
+            if (pivot_rows[i] >> column) & 1:
+                v |= 1 << pivot_columns[i]
+        basis.append(v)
+    return basis
 
 def annihilator_to_ANF(annihilator):
     """
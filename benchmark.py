@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+@author:
+
+This file benchmarks some of the modules of this repository.
+Each benchmark can be run separately, all of them are run when the file is executed.
+"""
+
+import random, time, tracemalloc
+
+from BF import BF
+from RSF import RSF
+from RSF_tables import RSF_tables_cache, get_RSF_tables
+from RSF_AI import Verification_AI, Verification_AI_RSF, Input_order, get_reedmuller
+from toolbox import rank_increase, integer_to_bool_list
+
+
+def benchmark_BF_instances(localities = range(4,13), nb_instances = 1000):
+    """
+    Measures the memory and time cost of a BF instance for several localities.\n
+    For each locality, nb_instances functions are created with a random truth table, then permuted into new objects.
+
+    Parameters
+    ----------
+    localities : iterable of integers, optional
+        localities to benchmark. The default is 4 to 12.
+    nb_instances : integer, optional
+        number of instances created for each locality. The default is 1000.
+
+    Returns
+    -------
+    None.
+
+    """
+    print("*********** BF instances ***********")
+    print("locality | memory per instance (bytes) | creation (us) | permute, new object (us)")
+    for locality in localities:
+        BF(locality) #build the shared tables before measuring
+        truth_tables = [random.getrandbits(2**locality) for i in range(nb_instances)]
+        permutation = list(range(locality))
+        random.shuffle(permutation)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        functions = []
+        for tt in truth_tables:
+            bf = BF(locality)
+            bf.set_TT_packed(tt)
+            functions.append(bf)
+        creation = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for bf in functions[0:100]:
+            bf.permute(permutation, new_object = True)
+        permutation_time = (time.perf_counter() - start) / 100
+
+        print("%8d | %27d | %13.1f | %24.1f" % (locality, memory / nb_instances, 1e6 * creation / nb_instances, 1e6 * permutation_time))
+    return
+
+
+class Verification_AI_lists:
+    """
+    Reference implementation of Verification_AI with matrices of lists and toolbox.rank_increase,
+    as it was before the echelon bases.
+    """
+    def __init__(self, locality, algebraic_immunity):
+        self.l = locality
+        self.M_AI = get_reedmuller(algebraic_immunity-1, locality)
+        self.rank_max = len(self.M_AI[0])
+        self.Mat = [[],[]]
+        self.rank = [0,0]
+        self.nb_remaining_elements = 2**locality
+
+    def check_and_add(self, x, y):
+        self.nb_remaining_elements -= 1
+        self.Mat[y].append(list(self.M_AI[2**self.l - 1 - x]))
+        if rank_increase(self.Mat[y]):
+            self.rank[y] += 1
+        return sum(self.rank) + self.nb_remaining_elements >= 2*self.rank_max
+
+
+def benchmark_Verification_AI(localities = (7,9,11), reference = True):
+    """
+    Compares Verification_AI with the reference implementation based on lists (Verification_AI_lists).\n
+    For each locality l, the majority function, which has the optimal algebraic immunity (l+1)/2,
+    is fully checked: every element of its truth table is added.
+
+    Parameters
+    ----------
+    localities : iterable of odd integers, optional
+        localities to benchmark. The default is (7, 9, 11).
+    reference : Boolean, optional
+        also time the reference implementation, which is slow for l = 11. The default is True.
+
+    Returns
+    -------
+    None.
+
+    """
+    print("*********** Verification_AI on the majority function ***********")
+    print("locality | echelon bases (s) | lists (s)")
+    for locality in localities:
+        ai = (locality+1)//2
+        majority = [1 if 2*sum(integer_to_bool_list(x, locality)) > locality else 0 for x in range(2**locality)]
+        implementations = [Verification_AI]
+        if reference:
+            implementations.append(Verification_AI_lists)
+        times = []
+        for implementation in implementations:
+            verification = implementation(locality, ai) #RM(r,m) is built before measuring
+            start = time.perf_counter()
+            for x in range(2**locality):
+                assert verification.check_and_add(x, majority[x])
+            times.append(time.perf_counter() - start)
+        print("%8d | %17.3f | %s" % (locality, times[0], "%9.3f" % times[1] if reference else "-"))
+    return
+
+
+def benchmark_AI_RSF(localities = (9,11,13), nb_functions = 100):
+    """
+    Compares the algebraic immunity checks of rotation symmetric functions on their representatives (see RSF_AI.Verification_AI_RSF).\n
+    For each odd locality l, the same nb_functions random RSF of degree at most (l+1)/2, as enumerated by find_RSF, are checked
+    for the optimal algebraic immunity (l+1)/2:\n
+    - with the eigenspaces of the rotation, which decide the algebraic immunity on the representatives,\n
+    - with the rotation symmetric annihilators only, the accepted functions being checked on the whole truth table by Verification_AI.
+
+    Parameters
+    ----------
+    localities : iterable of odd integers, optional
+        localities to benchmark. The default is (9, 11, 13).
+    nb_functions : integer, optional
+        number of random functions checked for each locality. The default is 100.
+
+    Returns
+    -------
+    None.
+
+    """
+    print("*********** algebraic immunity of RSF (ms per function) ***********")
+    print("locality | immune | eigenspaces: all | immune | rotation symmetric + truth table: all | immune")
+    for locality in localities:
+        ai = (locality+1)//2
+        rsf = RSF(locality)
+        functions = []
+        for i in range(nb_functions):
+            rsf.set_SANF([random.getrandbits(1) if sum(r) <= ai else 0 for r in rsf.representatives])
+            rsf.update_TT()
+            functions.append((rsf.STT, list(rsf.TT)))
+        
+        complete = Verification_AI_RSF(locality, ai, rsf.representatives)
+        symmetric = Verification_AI_RSF(locality, ai, rsf.representatives, complete = False)
+        full = Verification_AI(locality, ai)
+        times = [[0,0], [0,0]] #[all functions, immune functions] for both methods
+        nb_immune = 0
+        for (STT, TT) in functions:
+            start = time.perf_counter()
+            complete.reset()
+            immune = all(complete.check_and_add(j, STT[j]) for j in range(len(STT)))
+            times[0][0] += time.perf_counter() - start
+            if immune:
+                times[0][1] += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            symmetric.reset()
+            reference = all(symmetric.check_and_add(j, STT[j]) for j in range(len(STT)))
+            if reference:
+                full.reset()
+                reference = all(full.check_and_add(x, TT[x]) for x in range(2**locality))
+            times[1][0] += time.perf_counter() - start
+            if reference:
+                times[1][1] += time.perf_counter() - start
+            
+            assert immune == reference
+            nb_immune += immune
+        print("%8d | %6d | %16.2f | %6.2f | %37.2f | %6.2f" % (locality, nb_immune, 1e3 * times[0][0] / nb_functions, 1e3 * times[0][1] / max(nb_immune, 1),
+                                                             1e3 * times[1][0] / nb_functions, 1e3 * times[1][1] / max(nb_immune, 1)))
+    return
+
+
+def benchmark_AI_orders(localities = (7,9,11), nb_functions = 200):
+    """
+    Compares the orders of RSF.is_algebraic_immune (see RSF_AI.Input_order) on random RSF.\n
+    For each locality l, the same nb_functions random SANF are checked for the optimal algebraic immunity (l+1)/2
+    with every strategy, with and without adaptation.
+
+    Parameters
+    ----------
+    localities : iterable of integers, optional
+        localities to benchmark. The default is (7, 9, 11).
+    nb_functions : integer, optional
+        number of random functions checked for each locality. The default is 200.
+
+    Returns
+    -------
+    None.
+
+    """
+    print("*********** orders of RSF.is_algebraic_immune ***********")
+    print("locality | strategy      | adaptive | rejections | entries before rejection | time (s)")
+    for locality in localities:
+        ai = (locality+1)//2
+        rsf = RSF(locality)
+        functions = [[random.getrandbits(1) for i in range(rsf.nb_representatives)] for j in range(nb_functions)]
+        for strategy in Input_order.strategies:
+            for adaptive in (False, True):
+                rsf.set_order_AI(strategy, adaptive, ai)
+                start = time.perf_counter()
+                for sanf in functions:
+                    rsf.set_SANF(sanf)
+                    rsf.is_algebraic_immune(ai)
+                duration = time.perf_counter() - start
+                order = rsf.order_AI
+                print("%8d | %-13s | %8s | %10d | %23.1f | %8.3f" % (locality, strategy, adaptive, order.nb_rejections, order.average_entries_before_rejection(), duration))
+    return
+
+
+def benchmark_RSF_startup(localities = (7,9,11,13), persistent = True):
+    """
+    Measures the time taken to build each table of the RSF class (see RSF.build_times).\n
+    For each locality, the shared tables are dropped from memory, an RSF instance is created, then each of its lazy tables is accessed.
+    With persistent = True, the tables are memory-mapped from the cache directory if they were saved by a previous run.
+
+    Parameters
+    ----------
+    localities : iterable of integers, optional
+        localities to benchmark. The default is (7, 9, 11, 13).
+    persistent : Boolean, optional
+        use the cache directory of RSF_tables. The default is True.
+
+    Returns
+    -------
+    None.
+
+    """
+    print("*********** RSF startup (ms) ***********")
+    names = ["tables", "SANF_to_ANF", "SANF_to_STT", "STT_to_SWS", "nb_representatives_by_weight", "verification_AI", "verification_AI_RSF", "order_AI"]
+    print("locality | mapped | " + " | ".join(names))
+    for locality in localities:
+        RSF_tables_cache.pop(locality, None)
+        if not persistent:
+            RSF_tables_cache[locality] = get_RSF_tables(locality, persistent = False)
+        rsf = RSF(locality)
+        for name in names[1:]:
+            getattr(rsf, name)
+        times = ["%*.1f" % (len(name), 1e3 * rsf.build_times[name]) for name in names]
+        print("%8d | %6s | %s" % (locality, rsf.tables.is_mapped, " | ".join(times)))
+    return
+
+
+def benchmark_resilient_block(localities = (7,9,11), block_bits = 12):
+    """
+    Compares RSF.is_resilient_optimised, called on each function, with RSF.resilient_block (requires numpy).\n
+    For each locality l, the 2^block_bits functions obtained by flipping the last SANF elements of lower degree than (l+1)/2
+    of a random SANF are checked for the resiliency (l-1)/2 - 1, as in find_RSF.
+
+    Parameters
+    ----------
+    localities : iterable of integers, optional
+        localities to benchmark. The default is (7, 9, 11).
+    block_bits : integer, optional
+        number of SANF elements flipped. The default is 12.
+
+    Returns
+    -------
+    None.
+
+    """
+    print("*********** resiliency of a block of %d functions ***********" % 2**block_bits)
+    print("locality | one by one (us per function) | block (us per function) | resilient")
+    for locality in localities:
+        resiliency = (locality-1)//2 - 1
+        rsf = RSF(locality)
+        nb_low_degree = sum(rsf.nb_representatives_by_weight[0:(locality+1)//2])
+        indexes = [nb_low_degree - 1 - b for b in range(block_bits)]
+        rsf.set_SANF([random.getrandbits(1) for i in range(nb_low_degree)] + [0]*(rsf.nb_representatives - nb_low_degree))
+        rsf.resilient_block(indexes, resiliency) #build the tables before measuring
+        
+        start = time.perf_counter()
+        resilient = []
+        previous = 0
+        for number in range(2**block_bits):
+            rsf.toggle_SANF([indexes[b] for b in range(block_bits) if ((number ^ previous) >> b) & 1])
+            previous = number
+            if rsf.is_resilient_optimised(resiliency):
+                resilient.append(number)
+        one_by_one = (time.perf_counter() - start) / 2**block_bits
+        rsf.toggle_SANF([indexes[b] for b in range(block_bits) if (previous >> b) & 1])
+        
+        start = time.perf_counter()
+        assert rsf.resilient_block(indexes, resiliency) == resilient
+        block = (time.perf_counter() - start) / 2**block_bits
+        print("%8d | %28.2f | %23.2f | %9d" % (locality, 1e6 * one_by_one, 1e6 * block, len(resilient)))
+    return
+
+
+if __name__ == "__main__":
+    benchmark_BF_instances()
+    benchmark_Verification_AI()
+    benchmark_AI_RSF()
+    benchmark_AI_orders()
+    benchmark_RSF_startup()
+    benchmark_resilient_block()
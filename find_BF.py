@@ -4,14 +4,17 @@
 @author: 
 """
 
-from BF import BF
-from toolbox import Truth_table_entry
+from BF import BF, BF_block
+from RSF_AI import Verification_AI
+from toolbox import np, packed_entries, gray_flips
 
 
-def find_BF_naive(locality, resiliency, algebraic_immunity):
+def find_BF_naive(locality, resiliency, algebraic_immunity, block = False):
     """
     Naive approach to find Boolean functions of a specified locality, resiliency and algebraic immunity.
-    The given resiliency and algebraic immunity are not strict but lower bounds.
+    The given resiliency and algebraic immunity are not strict but lower bounds.\n
+    With block = True, the truth tables are enumerated by blocks with numpy (see find_BF_naive_block):
+    the same functions are printed in the same order, faster but with a block of Walsh spectra in memory.
 
     Parameters
     ----------
@@ -21,6 +24,8 @@ def find_BF_naive(locality, resiliency, algebraic_immunity):
         minimal resiliency.
     algebraic_immunity : integer
         minimal algebraic immunity.
+    block : Boolean, optional
+        enumerate the truth tables by blocks (requires numpy). The default is False.
 
     Returns
     -------
@@ -28,15 +33,146 @@ def find_BF_naive(locality, resiliency, algebraic_immunity):
         number of functions satisfying the criteria.
 
     """
+    if block:
+        return find_BF_naive_block(locality, resiliency, algebraic_immunity)
+    
     bf = BF(locality)
-    tt = Truth_table_entry(2**locality)
     found = 0
-    for i in range(2**(2**locality)):
-        bf.set_TT(tt.next_entry())
+    for tt in packed_entries(2**locality):
+        bf.set_TT_packed(tt)
         bf.update_WS()
         if (resiliency==-1 or bf.is_resilient(resiliency)) and bf.is_algebraic_immune(algebraic_immunity):
             bf.update_TT()
             found += 1
-            print(bf.TT)
+            print(bf.get_TT())
        
-    return found
\ No newline at end of file
+    return found
+
+def find_BF_naive_block(locality, resiliency, algebraic_immunity, block_size = 4096):
+    """
+    Same as find_BF_naive, but the truth tables are enumerated by blocks (see the BF_block class).\n
+    The resiliency of a whole block is checked at once, and the algebraic immunity is only checked
+    for the resilient functions. The functions are enumerated in the same order as find_BF_naive.
+    This function requires numpy.
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables to consider.
+    resilience : integer
+        minimal resiliency.
+    algebraic_immunity : integer
+        minimal algebraic immunity.
+    block_size : integer, optional
+        number of truth tables per block. The default is 4096.
+
+    Returns
+    -------
+    found : integer
+        number of functions satisfying the criteria.
+
+    """
+    if np is None:
+        raise ImportError("find_BF_naive_block requires numpy")
+    bf = BF(locality)
+    n = 2**locality
+    shifts = np.arange(n-1, -1, -1, dtype=np.uint64) #the first entry of the truth table is the most significant bit
+    found = 0
+    for start in range(0, 2**n, block_size):
+        counters = np.arange(start, min(start + block_size, 2**n), dtype=np.uint64)
+        block = BF_block(locality, (counters[:,None] >> shifts) & 1)
+        if resiliency == -1:
+            candidates = block.TT
+        else:
+            block.update_WS()
+            candidates = block.TT[block.is_resilient(resiliency)]
+        for tt in candidates:
+            bf.set_TT(tt)
+            if bf.is_algebraic_immune(algebraic_immunity):
+                found += 1
+                print(bf.get_TT())
+       
+    return found
+
+def find_BF_gray(locality, resiliency, algebraic_immunity):
+    """
+    Same as find_BF_naive, but the truth tables are enumerated in Gray code order.\n
+    Two consecutive truth tables differ by a single entry, so the ANF and the Walsh spectrum
+    are updated incrementally with BF.flip_TT, and the resiliency is checked in O(1).
+    The functions found are the same as find_BF_naive, in a different order.
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables to consider.
+    resilience : integer
+        minimal resiliency.
+    algebraic_immunity : integer
+        minimal algebraic immunity.
+
+    Returns
+    -------
+    found : integer
+        number of functions satisfying the criteria.
+
+    """
+    bf = BF(locality)
+    bf.update_WS()
+    bf.track_resiliency(resiliency)
+    found = 0
+    if (resiliency==-1 or bf.is_resilient(resiliency)) and bf.is_algebraic_immune(algebraic_immunity): #null function
+        found += 1
+        print(bf.get_TT())
+    for x in gray_flips(2**locality):
+        bf.flip_TT(x)
+        if (resiliency==-1 or bf.is_resilient(resiliency)) and bf.is_algebraic_immune(algebraic_immunity):
+            found += 1
+            print(bf.get_TT())
+       
+    return found
+
+def find_BF_dfs(locality, resiliency, algebraic_immunity):
+    """
+    Same as find_BF_naive, but the truth tables are built by a depth-first search, one entry at a time.\n
+    The algebraic immunity is checked while the truth table is built (see Verification_AI.snapshot and rollback):
+    a partial truth table is abandoned as soon as no completion can reach the algebraic immunity.
+    The resiliency is checked on the complete truth tables. The functions are found in the same order as find_BF_naive.
+
+    Parameters
+    ----------
+    locality : integer
+        number of variables to consider.
+    resilience : integer
+        minimal resiliency.
+    algebraic_immunity : integer
+        minimal algebraic immunity.
+
+    Returns
+    -------
+    found : integer
+        number of functions satisfying the criteria.
+
+    """
+    bf = BF(locality)
+    verification = Verification_AI(locality, algebraic_immunity)
+    n = 2**locality
+    found = 0
+    
+    def search(x, tt):
+        nonlocal found
+        if x == n:
+            bf.set_TT_packed(tt)
+            bf.update_WS()
+            if resiliency==-1 or bf.is_resilient(resiliency):
+                found += 1
+                print(bf.get_TT())
+            return
+        token = verification.snapshot()
+        for y in (0,1):
+            if verification.check_and_add(x, y):
+                search(x+1, tt | (y << x))
+            verification.rollback(token)
+        return
+    
+    search(0, 0)
+    return found
@@ -5,9 +5,102 @@
 """
 
 from RSF import RSF
-from RSF_toolbox import Truth_table_entry, bool_list_to_integer, representative_cover
+from RSF_toolbox import representative_cover, permute_SANF, decimation_tables, permute_integer
+from toolbox import bool_list_to_integer, integer_to_bool_list, binary_entries, gray_rank
 import time, os
 
+def changed_indexes(changed, nb_bits):
+    """
+    Returns the indexes of the bits set in changed, in the array of nb_bits Booleans of integer_to_bool_list
+    (the most significant bit first).
+    """
+    indexes = []
+    while changed:
+        bit = (changed & -changed).bit_length() - 1
+        indexes.append(nb_bits - 1 - bit)
+        changed &= changed - 1
+    return indexes
+
+class Decimation_classes:
+    """
+    Class Decimation_classes.\n
+    Classes of the searched SANF of an exhaustive search under its decimations (see RSF_toolbox.decimation_permutations).
+    The functions of a class have the same resiliency and algebraic immunity, so only the first SANF of each class visited
+    by the search is converted into a STT and checked: the result of the others is the result of their class.
+    The images of each searched SANF are computed from its rank with lookup tables, before building the STT.
+    """
+    
+    tables = [] #lookup tables of the decimations (see RSF_toolbox.decimation_tables)
+    gray = False    #the SANF are enumerated in Gray code order
+    start_rank = 0  #rank of the first SANF visited by this search, the previous ones were visited before a backup
+    found = set()   #first visited SANF of the classes found
+    orbit_sizes = {}    #size of the orbit -> number of classes found
+    images = set()  #images of the last SANF given to first_visited
+    
+    def __init__(self, permutations, indexes, gray, start_rank):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        permutations : array of arrays of integers
+            decimations of the search, except the identity (see RSF_toolbox.decimation_permutations).
+        indexes : array of integers
+            indexes of the searched SANF elements, the first one being the most significant bit of the searched SANF.
+        gray : Boolean
+            the SANF are enumerated in Gray code order.
+        start_rank : integer
+            rank of the first SANF visited.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.tables = decimation_tables(permutations, indexes)
+        self.gray = gray
+        self.start_rank = start_rank
+        self.found = set()
+        self.orbit_sizes = {}
+        self.images = set()
+    
+    def first_visited(self, searched_SANF, rank):
+        """
+        Returns the first SANF of the class of searched_SANF visited by this search (itself if it must be checked).
+
+        Parameters
+        ----------
+        searched_SANF : integer
+            searched part of the SANF.
+        rank : integer
+            rank of the SANF in the enumeration.
+
+        Returns
+        -------
+        first : integer
+            first SANF of the class visited since start_rank.
+
+        """
+        self.images = {permute_integer(searched_SANF, tables) for tables in self.tables}
+        first = searched_SANF
+        first_rank = rank
+        for image in self.images:
+            image_rank = gray_rank(image) if self.gray else image
+            if self.start_rank <= image_rank < first_rank:
+                first = image
+                first_rank = image_rank
+        return first
+    
+    def add(self, searched_SANF):
+        """
+        Records that the class of searched_SANF, given to the last call to first_visited, has been found.
+        """
+        self.found.add(searched_SANF)
+        size = len(self.images | {searched_SANF})
+        self.orbit_sizes[size] = self.orbit_sizes.get(size, 0) + 1
+        return
+
+
 def find_RSF_from_SANF_naive(locality, resiliency, algebraic_immunity):
     """
     Naive exhaustive approach to find RSF with specified locality, resiliency and algebraic immunity.
@@ -28,11 +121,13 @@ def find_RSF_from_SANF_naive(locality, resiliency, algebraic_immunity):
 
     """
     rsf = RSF(locality)
-    tt = Truth_table_entry(rsf.nb_representatives)
     found = 0
     start = time.time()
-    for i in range(2**rsf.nb_representatives):
-        rsf.set_SANF(tt.next_entry())
+    rsf.set_SANF([0]*rsf.nb_representatives)
+    previous_sanf = 0
+    for sanf in binary_entries(rsf.nb_representatives):
+        rsf.toggle_SANF(changed_indexes(sanf ^ previous_sanf, rsf.nb_representatives)) #only the changed bits are flipped
+        previous_sanf = sanf
         if (resiliency==-1 or rsf.is_resilient_optimised(resiliency)) and rsf.is_algebraic_immune(algebraic_immunity):
             found += 1
             rsf.update_TT()
@@ -44,7 +139,7 @@ def find_RSF_from_SANF_naive(locality, resiliency, algebraic_immunity):
     
 
    
-def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min_degree_SANF = [0]):
+def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min_degree_SANF = [0], gray = False, block_bits = 0, symmetric = False):
     """
     Exhaustive approach optimised for dahus.\n
     Resiliency and algebraic immunity must still be specified.\n
@@ -62,7 +157,22 @@ def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min
     This function creates a backup file in the backup directory, it is updated every 30 minutes.\n
     In case the function is aborted, a second call to the function will resume at the last backup.\n
     Because of this mechanism, it might be possible that a function appears twice in the result file.\n
-    If the function finishes normally, an "End" tag ends to the result file.
+    If the function finishes normally, an "End" tag ends to the result file.\n
+    With gray = True, the SANF are enumerated in Gray code order: consecutive SANF differ by one representative,
+    so the STT is updated with a single row of the conversion matrix (see RSF.toggle_SANF). The same functions are found in another order,
+    the filename is of the form "rsf-g-<locality>-<resiliency>-<AI>.txt".\n
+    With block_bits = k > 0 (requires numpy), the SANF are enumerated by blocks of 2^k sharing the same higher bits:
+    the resiliency of a whole block is verified with two matrix products (see RSF.resilient_block), and only the resilient functions
+    are checked for algebraic immunity, one by one. The SANF are enumerated in the binary order, so the result file is the same.
+    The backup is only updated between two blocks.\n
+    With symmetric = True, only the first visited function of each class under the decimations of the variables which leave the searched SANF
+    unchanged (see RSF_toolbox.decimation_permutations) is converted into a STT and checked. The other functions of the class have the same
+    resiliency and algebraic immunity, and are written in the result file if the class was found (see Decimation_classes).
+    The result file is the same, the number of classes found and their orbit sizes are printed at the end.
+    Every SANF is still enumerated: the remaining cost of a skipped SANF is the computation of its images, a few table lookups by decimation.
+    A class is identified by its first visited SANF rather than by a canonical form (the smallest image): the first visited SANF
+    depends on the enumeration order (binary or Gray code) and on the backup the search was resumed from, and it is known without
+    computing every image of the SANF being checked.
     
 
     Parameters
@@ -77,10 +187,20 @@ def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min
         SANF of maximal degree. Empty by default.
     min_degree_SANF : array of Booleans, optional
         SANF of small degrees, the array can contain any number of elements. The default is [0].
+    gray : Boolean, optional
+        enumerate the SANF in Gray code order. The default is False.
+    block_bits : integer, optional
+        number k of SANF bits enumerated by blocks of 2^k functions, 0 to check the functions one by one.
+        It is incompatible with gray. The default is 0.
+    symmetric : Boolean, optional
+        only check one function by class of decimations. The default is False.
 
 
     """
     
+    if gray and block_bits:
+        raise ValueError("the blocks are enumerated in binary order, block_bits requires gray = False")
+    
     rsf = RSF(locality)
     
     #maximal degree of the dahu
@@ -113,11 +233,12 @@ def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min
         print("No representative of maximal degree is given or misformed: exhaustive search.")
     
     #exhaustive search on SANF of lower degrees, except those already fixed by user
-    low_degree_SANF = Truth_table_entry(nb_low_degree_representatives - len(min_degree_SANF))
+    nb_low_degree_bits = nb_low_degree_representatives - len(min_degree_SANF)
+    start_rank = 0
     
     #result and backupo files
-    fichier_resultat = open("result/rsf-"+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt","a")
-    fichier_backup_name = "backup/rsf-"+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt"
+    fichier_resultat = open("result/rsf-"+("g-" if gray else "")+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt","a")
+    fichier_backup_name = "backup/rsf-"+("g-" if gray else "")+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt"
     
     #search and load backup
     try:
@@ -129,9 +250,9 @@ def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min
         if backup == 'End': #if the backup says the computation has ended
             print("Backup found.\nAll results are already computed!\nSee the result directory.")
             return 0
-        low_degree_SANF.current = backup
+        start_rank = (gray_rank(bool_list_to_integer(backup)) if gray else bool_list_to_integer(backup)) + 1 #resume after the last backed up SANF
         print("Backup found.")
-        print("Backup: "+ str(low_degree_SANF.current))
+        print("Backup: "+ str(backup))
         
     except IOError:
         print("No backup found.")
@@ -139,34 +260,96 @@ def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min
     
     fichier_backup = open(fichier_backup_name,"w")
     
-    #compute how many SANF are still to be checked
-    if 0 not in low_degree_SANF.current: #no backup
-        stop = 2**(low_degree_SANF.locality)
-    else: #backup
-        stop = 2**(low_degree_SANF.locality) - bool_list_to_integer(low_degree_SANF.current)
-    
     found = 0
     start = time.time()
     interval = time.time() -3600 #force backup at the very beginning
     
-    for i in range(stop):
+    #build SANF by concetenating every part, the exhaustive search is made on low_degree_SANF
+    rsf.set_SANF(min_degree_SANF + [0]*nb_low_degree_bits + max_degree_SANF + high_degree_SANF)
+    previous_SANF = 0 #the low degree SANF currently held by rsf
+    
+    #decimations leaving the searched SANF unchanged: the SANF of lower degree are only permuted between themselves
+    classes = None
+    if symmetric:
+        low_degree_indexes = list(range(len(min_degree_SANF), len(min_degree_SANF) + nb_low_degree_bits))
+        symmetries = [p for p in rsf.tables.decimations if {p[i] for i in low_degree_indexes} == set(low_degree_indexes) and permute_SANF(rsf.SANF, p) == rsf.SANF]
+        print("Nb of decimations of the search: " + str(len(symmetries) + 1))
+        classes = Decimation_classes(symmetries, low_degree_indexes, gray, start_rank)
+    
+    def move_to(low_degree_SANF):
+        """
+        Sets the low degree SANF of rsf, only the bits changed since the previous one are flipped.
+        """
+        nonlocal previous_SANF
+        rsf.toggle_SANF([len(min_degree_SANF) + i for i in changed_indexes(low_degree_SANF ^ previous_SANF, nb_low_degree_bits)])
+        previous_SANF = low_degree_SANF
+    
+    def write_result(low_degree_SANF):
+        """
+        Writes the function of the given low degree SANF in the result file.
+        """
+        move_to(low_degree_SANF)
+        rsf.update_ANF_from_SANF()
+        fichier_resultat.write(str(rsf.SANF) + "\n")
+        fichier_resultat.write(str(rsf.ANF) + "\n")
+        fichier_resultat.flush()
+    
+    #block mode: the lowest block_bits bits of the low degree SANF are enumerated by RSF.resilient_block
+    block_bits = min(block_bits, nb_low_degree_bits)
+    block_indexes = [len(min_degree_SANF) + nb_low_degree_bits - 1 - b for b in range(block_bits)]
+    for block in range(start_rank >> block_bits, 2**(nb_low_degree_bits - block_bits)) if block_bits > 0 else []:
         
-        #build SANF by concetenating every part, the exhaustive search is made on low_degree_SANF
-        rsf.set_SANF(min_degree_SANF + low_degree_SANF.next_entry() + max_degree_SANF + high_degree_SANF)
+        #move to the first SANF of the block
+        first = block << block_bits
+        move_to(first)
         
-        #verify resiliency and AI
-        if rsf.is_resilient_optimised(resiliency) and rsf.is_algebraic_immune(algebraic_immunity):
+        #verify the AI of the resilient functions of the block
+        for number in rsf.resilient_block(block_indexes, resiliency):
+            low_degree_SANF = first | number
+            if low_degree_SANF < start_rank: #already computed before the backup
+                continue
+            first_visited = classes.first_visited(low_degree_SANF, low_degree_SANF) if classes else low_degree_SANF
+            if first_visited != low_degree_SANF: #result of its class
+                is_found = first_visited in classes.found
+            else:
+                move_to(low_degree_SANF)
+                is_found = rsf.is_algebraic_immune(algebraic_immunity)
+                if is_found and classes:
+                    classes.add(low_degree_SANF)
+            if is_found:
+                found += 1
+                write_result(low_degree_SANF)
+        
+        #backup after the last SANF of the block
+        if time.time() - interval > 1800:
+            interval = time.time()
+            fichier_backup.write("backup=" + str(integer_to_bool_list(first + 2**block_bits - 1, nb_low_degree_bits)) + "\n")
+            fichier_backup.flush()
+    
+    for rank in binary_entries(nb_low_degree_bits, start_rank) if block_bits == 0 else []:
+        
+        #verify resiliency and AI, the STT is only built for the first SANF of each class
+        low_degree_SANF = rank ^ (rank >> 1) if gray else rank
+        first_visited = classes.first_visited(low_degree_SANF, rank) if classes else low_degree_SANF
+        if first_visited != low_degree_SANF: #result of its class
+            is_found = first_visited in classes.found
+        else:
+            move_to(low_degree_SANF)
+            is_found = rsf.is_resilient_optimised(resiliency) and rsf.is_algebraic_immune(algebraic_immunity)
+            if is_found and classes:
+                classes.add(low_degree_SANF)
+        if is_found:
             found += 1
-            rsf.update_ANF_from_SANF()
-            fichier_resultat.write(str(rsf.SANF) + "\n")
-            fichier_resultat.write(str(rsf.ANF) + "\n")
-            fichier_resultat.flush()
+            write_result(low_degree_SANF)
             
         #backup
         if time.time() - interval > 1800:
             interval = time.time()
-            fichier_backup.write("backup=" + str(low_degree_SANF.current) + "\n")
+            fichier_backup.write("backup=" + str(integer_to_bool_list(low_degree_SANF, nb_low_degree_bits)) + "\n")
             fichier_backup.flush()
+    
+    if classes:
+        print("Nb of classes found: " + str(len(classes.found)) + ", orbit sizes (size: nb of classes): " + str(classes.orbit_sizes))
             
     #fermeture
     end = time.time()
@@ -179,7 +362,7 @@ def find_RSF(locality, resiliency, algebraic_immunity, max_degree_SANF = [], min
     
     return found
 
-def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_SANF, min_degree_SANF = [0], out=print):
+def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_SANF, min_degree_SANF = [0], out=print, gray = False, symmetric = False):
     """
     Exhaustive approach optimised for dahus.\n
     Resiliency and algebraic immunity must still be specified.\n
@@ -201,7 +384,11 @@ def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_
     This function creates a backup file in the backup directory, it is updated every 30 minutes.\n
     In case the function is aborted, a second call to the function will resume at the last backup.\n
     Because of this mechanism, it might be possible that a function appears twice in the result file.\n
-    If the function finishes normally, an "End" tag ends to the result file.
+    If the function finishes normally, an "End" tag ends to the result file.\n
+    With gray = True, the covered SANF are enumerated in Gray code order (see find_RSF),
+    the filename is of the form "rsf-c-g-<locality>-<resiliency>-<AI>.txt".\n
+    With symmetric = True, only the first visited function of each class under the decimations which leave the searched SANF unchanged
+    is checked (see find_RSF). Every covered SANF is still enumerated, the remaining cost of a skipped one is the computation of its images.
     
     Limitations
     -----------
@@ -221,6 +408,10 @@ def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_
         SANF of small degrees, the array can contain any number of elements. The default is [0].
     out : function, optional
         display function, print by default.
+    gray : Boolean, optional
+        enumerate the covered SANF in Gray code order. The default is False.
+    symmetric : Boolean, optional
+        only check one function by class of decimations. The default is False.
 
 
     """
@@ -275,7 +466,8 @@ def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_
     out("Nb of covered representatives: ", len(covered_representatives))
     
     #SANF of covered representatives
-    covered_SANF = Truth_table_entry(len(covered_representatives) - len(min_degree_SANF))
+    nb_covered_bits = len(covered_representatives) - len(min_degree_SANF)
+    start_rank = 0
     
     #initial SANF
     SANF = ([0]*nb_low_degree_representatives) + max_degree_SANF + high_degree_SANF
@@ -285,8 +477,8 @@ def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_
     
     
     #result and backup files
-    fichier_resultat = open("result/rsf-c-"+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt","a")
-    fichier_backup_name = "backup/rsf-c-"+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt"
+    fichier_resultat = open("result/rsf-c-"+("g-" if gray else "")+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt","a")
+    fichier_backup_name = "backup/rsf-c-"+("g-" if gray else "")+str(locality)+"-"+str(resiliency)+"-"+str(algebraic_immunity)+"-"+''.join([str(i) for i in max_degree_SANF])+"-"+''.join([str(i) for i in min_degree_SANF])+".txt"
     
     #search and load an existing backup
     try:
@@ -298,9 +490,9 @@ def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_
         if backup == 'End':
             print("Backup found.\nAll results are already computed!\nSee the result directory.")
             return 0
-        covered_SANF.current = backup
+        start_rank = (gray_rank(bool_list_to_integer(backup)) if gray else bool_list_to_integer(backup)) + 1 #resume after the last backed up SANF
         out("Backup found.")
-        out("Backup: "+ str(covered_SANF.current))
+        out("Backup: "+ str(backup))
         
     except IOError:
         out("No Backup found.")
@@ -308,28 +500,42 @@ def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_
     
     fichier_backup = open(fichier_backup_name,"w")
     
-    #compute how many SANF are still to be checked
-    if 0 not in covered_SANF.current: #backup
-        stop = 2**(covered_SANF.locality)
-    else: #no backup
-        stop = 2**(covered_SANF.locality) - bool_list_to_integer(covered_SANF.current)
-    
     found = 0
     interval = time.time() -7200 #force a backup at the very beginning
-    
-    for i in range(stop):
-        
-        #combine SANF
-        covered_SANF.next_entry()
-        for i in range(covered_SANF.locality):
-            SANF[covered_representatives[i + offset_index_coverage]] = covered_SANF.current[i]
+    previous_SANF = 0 #the covered SANF currently held by rsf
+    rsf.set_SANF(SANF)
+    
+    #decimations leaving the searched SANF unchanged: the covered SANF are only permuted between themselves
+    classes = None
+    if symmetric:
+        covered_indexes = covered_representatives[offset_index_coverage:]
+        symmetries = [p for p in rsf.tables.decimations if {p[i] for i in covered_indexes} == set(covered_indexes) and permute_SANF(SANF, p) == SANF]
+        out("Nb of decimations of the search: " + str(len(symmetries) + 1))
+        classes = Decimation_classes(symmetries, covered_indexes, gray, start_rank)
+    
+    def move_to(covered_SANF):
+        """
+        Sets the covered SANF of rsf, only the bits changed since the previous one are flipped.
+        """
+        nonlocal previous_SANF
+        rsf.toggle_SANF([covered_representatives[offset_index_coverage + i] for i in changed_indexes(covered_SANF ^ previous_SANF, nb_covered_bits)])
+        previous_SANF = covered_SANF
+    
+    for rank in binary_entries(nb_covered_bits, start_rank):
         
-        #set SANF
-        rsf.set_SANF(SANF)
-        
-        #check resiliency and AI
-        if rsf.is_resilient_optimised(resiliency) and rsf.is_algebraic_immune(algebraic_immunity):
+        #check resiliency and AI, the STT is only built for the first SANF of each class
+        covered_SANF = rank ^ (rank >> 1) if gray else rank
+        first_visited = classes.first_visited(covered_SANF, rank) if classes else covered_SANF
+        if first_visited != covered_SANF: #result of its class
+            is_found = first_visited in classes.found
+        else:
+            move_to(covered_SANF)
+            is_found = rsf.is_resilient_optimised(resiliency) and rsf.is_algebraic_immune(algebraic_immunity)
+            if is_found and classes:
+                classes.add(covered_SANF)
+        if is_found:
             found += 1
+            move_to(covered_SANF)
             rsf.update_ANF_from_SANF()
             fichier_resultat.write(str(rsf.SANF) + "\n")
             fichier_resultat.write(str(rsf.ANF) + "\n")
@@ -338,8 +544,11 @@ def find_RSF_with_coverage(locality, resiliency, algebraic_immunity, max_degree_
         #backup
         if time.time() - interval > 1800:
             interval = time.time()
-            fichier_backup.write("backup=" + str(covered_SANF.current) + "\n")
+            fichier_backup.write("backup=" + str(integer_to_bool_list(covered_SANF, nb_covered_bits)) + "\n")
             fichier_backup.flush()
+    
+    if classes:
+        out("Nb of classes found: " + str(len(classes.found)) + ", orbit sizes (size: nb of classes): " + str(classes.orbit_sizes))
             
     end = time.time()
     fichier_resultat.write("End")
@@ -1,37 +1,172 @@
-
-
 """
 Created on Thu Mar 28 15:00:00 2019
 
-This module allows to build a Reed-Muller matrix.
+This module allows to build a Reed-Muller matrix,
+either as a list of rows (ReedMuller) or packed, with columns sorted by degree (get_reedmuller_matrix).
 
 @author:
 """
 
 import itertools
-from toolbox import Truth_table_entry
+from collections import OrderedDict
+from toolbox import np, popcount
 
 def ReedMuller(r,m):
     n = 2**m
     monomials = []
     RM = []
     
-    #Initialising monomials
+    #Initialising monomials, as masks of their variables (variable 0 is the most significant bit of an entry)
     for i in range(r+1):
         for monomial in itertools.combinations(range(m),i):
-            monomials.append(monomial)
-                
-    #Row computation
-    entry = Truth_table_entry(m)
-    for i in range(n):
-        row = []
-        for monomial in monomials:
-            check = 1
+            mask = 0
             for variable in monomial:
-                if entry.current[variable] == 0:
-                    check = 0
-            row.append(check)
-        entry.previous_entry()
-        RM.append(row)
+                mask |= 1 << (m-1-variable)
+            monomials.append(mask)
+                
+    #Row computation, from the entry 11...1 down to 00...0
+    for x in range(n-1, -1, -1):
+        RM.append([1 if (x & mask) == mask else 0 for mask in monomials])
     
     return RM
+
+
+"""*********************************************************************
+    Packed Reed-Muller matrices
+*********************************************************************"""
+class ReedMuller_matrix:
+    """
+    Class ReedMuller_matrix.\n
+    Reed-Muller matrix RM(r,m) whose columns are the monomials of degree smaller or equal to r,
+    sorted by degree, then by increasing order. The columns of RM(r-1,m) are therefore a prefix of those of RM(r,m).\n
+    The row of the input x is packed into an integer, its j-th bit being 1 if and only if the j-th monomial is included in x.
+    A matrix can be a prefix view of a larger one (see prefix): it then shares the rows of the larger matrix,
+    which may contain bits beyond nb_columns. The exact row is rows[x] & column_mask.
+    """
+    
+    r = 0   #order
+    m = 0   #number of variables
+    monomials = []  #monomials of the columns
+    nb_columns = 0
+    column_mask = 0 #mask of the nb_columns first bits
+    rows = []   #packed rows, indexed by the input, possibly shared with a larger matrix
+    parent = None   #larger matrix whose rows are shared, None if the rows are owned
+    numpy_array = None  #numpy version of the matrix, computed on demand
+    
+    def __init__(self, r, m, parent = None):
+        """
+        Constructor. Computes RM(r,m), or builds a prefix view of parent if specified.
+
+        Parameters
+        ----------
+        r : integer
+            order.
+        m : integer
+            number of variables.
+        parent : ReedMuller_matrix, optional
+            matrix RM(r',m) with r' >= r whose rows are shared. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.r = r
+        self.m = m
+        self.parent = parent
+        if parent is not None:
+            self.monomials = parent.monomials[0:sum(1 for u in parent.monomials if popcount(u) <= r)]
+            self.rows = parent.rows
+        else:
+            monomials = [u for u in range(2**m) if popcount(u) <= r]
+            monomials.sort(key = popcount)
+            self.monomials = monomials
+            
+            #set the bit of each monomial in the row of every input containing it
+            full = 2**m - 1
+            rows = [0]*(2**m)
+            for j, monomial in enumerate(monomials):
+                bit = 1 << j
+                complement = full ^ monomial
+                s = complement
+                while True:
+                    rows[monomial | s] |= bit
+                    if s == 0:
+                        break
+                    s = (s - 1) & complement
+            self.rows = rows
+        self.nb_columns = len(self.monomials)
+        self.column_mask = (1 << self.nb_columns) - 1
+        self.numpy_array = None
+        return
+    
+    def prefix(self, r):
+        """
+        Returns RM(r,m) as a prefix view of this matrix, without copying the rows.
+
+        Parameters
+        ----------
+        r : integer
+            order, smaller or equal to self.r.
+
+        Returns
+        -------
+        ReedMuller_matrix
+
+        """
+        return ReedMuller_matrix(r, self.m, self.parent if self.parent is not None else self)
+    
+    def array(self):
+        """
+        Returns the matrix as a numpy array of Booleans, of shape (2^m, nb_columns), the x-th row corresponding to the input x.\n
+        The array is computed once for the matrix owning the rows; the array of a prefix view is a view of it.
+
+        Returns
+        -------
+        numpy array of Booleans
+
+        """
+        if self.parent is not None:
+            return self.parent.array()[:, 0:self.nb_columns]
+        if self.numpy_array is None:
+            inputs = np.arange(2**self.m)[:, None]
+            monomials = np.array(self.monomials, dtype=np.int64)[None, :]
+            self.numpy_array = ((inputs & monomials) == monomials).astype(np.uint8)
+        return self.numpy_array
+
+
+reedmuller_cache = OrderedDict()    #(r,m) -> ReedMuller_matrix, least recently used first
+reedmuller_cache_size = 8
+
+def get_reedmuller_matrix(r, m):
+    """
+    Returns the packed Reed-Muller matrix RM(r,m) (see ReedMuller_matrix).\n
+    The last reedmuller_cache_size matrices are kept in a cache. If a matrix RM(r',m) with r' >= r
+    is in the cache, RM(r,m) is a prefix view of it and is not computed.
+
+    Parameters
+    ----------
+    r : integer
+        order.
+    m : integer
+        number of variables.
+
+    Returns
+    -------
+    ReedMuller_matrix
+
+    """
+    if (r, m) in reedmuller_cache:
+        reedmuller_cache.move_to_end((r, m))
+        return reedmuller_cache[(r, m)]
+    
+    larger = [matrix for (r2, m2), matrix in reedmuller_cache.items() if m2 == m and r2 > r]
+    if larger != []:
+        matrix = larger[0].prefix(r)
+    else:
+        matrix = ReedMuller_matrix(r, m)
+    
+    reedmuller_cache[(r, m)] = matrix
+    if len(reedmuller_cache) > reedmuller_cache_size:
+        reedmuller_cache.popitem(last = False)
+    return matrix
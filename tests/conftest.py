@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuration of the tests: the modules of the repository are imported from its root directory.\n
+The backend fixture runs a test twice, with numpy and with the pure Python code paths
+(np is set to None in every module of the repository, and their caches are emptied).
+"""
+
+import os, sys
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+import RSF_tables
+
+
+def repository_modules():
+    """
+    Modules of the repository imported so far.
+    """
+    return [module for module in list(sys.modules.values())
+            if os.path.dirname(os.path.abspath(getattr(module, "__file__", None) or "/")) == root]
+
+@pytest.fixture(autouse=True, scope="session")
+def cache_directory(tmp_path_factory):
+    """
+    The RSF tables are cached in a temporary directory instead of the cache directory of the repository.
+    """
+    RSF_tables.cache_directory = str(tmp_path_factory.mktemp("cache"))
+    return RSF_tables.cache_directory
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """
+    Runs the test with numpy, then without numpy.
+    """
+    import toolbox
+    if request.param == "numpy":
+        if toolbox.np is None:
+            pytest.skip("numpy is not installed")
+        return request.param
+    for module in repository_modules():
+        for name, value in list(vars(module).items()):
+            if name == "np":
+                monkeypatch.setattr(module, name, None)
+            elif isinstance(value, dict) and (name.endswith("_cache") or name.endswith("_tables")):
+                monkeypatch.setattr(module, name, type(value)())
+    return request.param
+
+@pytest.fixture
+def search_directory(tmp_path, monkeypatch):
+    """
+    Runs the test in a temporary directory with the result and backup directories of the searches.
+    """
+    (tmp_path / "result").mkdir()
+    (tmp_path / "backup").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reference implementations of the baseline behaviour, written directly from the definitions,
+without any of the optimisations of the repository. They are only meant for small localities.
+"""
+
+import itertools, random
+
+
+def random_TT(locality, rng = random):
+    """
+    Random truth table.
+    """
+    return [rng.getrandbits(1) for x in range(2**locality)]
+
+def walsh(f, locality):
+    """
+    Walsh transform of sign(f) (0 -> -1, 1 -> 1), as toolbox.Walsh_transform(toolbox.sign(f)).
+    """
+    return [sum((2*f[x] - 1) * (-1)**bin(a & x).count("1") for x in range(2**locality)) for a in range(2**locality)]
+
+def moebius(f, locality):
+    """
+    Moebius transform: the element x of the result is the XOR of the elements u of f with u included in x.
+    """
+    return [sum(f[u] for u in range(2**locality) if u & x == u) & 1 for x in range(2**locality)]
+
+def rank(rows):
+    """
+    Rank over GF(2) of a matrix whose rows are packed into integers.
+    """
+    rows = list(rows)
+    rank = 0
+    while rows:
+        pivot = rows.pop()
+        if pivot == 0:
+            continue
+        rank += 1
+        high = 1 << (pivot.bit_length() - 1)
+        rows = [row ^ pivot if row & high else row for row in rows]
+    return rank
+
+def monomials(locality, degree):
+    """
+    Monomials of degree smaller or equal to degree, in increasing order.
+    """
+    return [u for u in range(2**locality) if bin(u).count("1") <= degree]
+
+def evaluate(g, x):
+    """
+    Evaluates in x a function given as a list of monomials.
+    """
+    return sum(1 for u in g if x & u == u) & 1
+
+def nb_annihilators(f, locality, degree):
+    """
+    Dimension of the space of annihilators of f of degree smaller or equal to degree.
+    """
+    columns = monomials(locality, degree)
+    rows = [sum(1 << j for (j, u) in enumerate(columns) if x & u == u) for x in range(2**locality) if f[x]]
+    return len(columns) - rank(rows)
+
+def same_span(basis1, basis2):
+    """
+    Checks that two lists of functions (lists of monomials) span the same space.
+    """
+    pack = lambda g: sum(1 << u for u in g)
+    packed1 = [pack(g) for g in basis1]
+    packed2 = [pack(g) for g in basis2]
+    return rank(packed1) == rank(packed2) == rank(packed1 + packed2)
+
+def get_annihilators(f, locality, degree):
+    """
+    Basis of annihilators of the baseline annihilator.get_annihilators: the candidates are the monomials in increasing order,
+    and for each input x of the support of f, the last candidate not vanishing in x is the pivot, XORed into the previous
+    candidates not vanishing in x, then removed.
+    """
+    S = [{u} for u in monomials(locality, degree)]
+    for x in range(2**locality):
+        if not f[x]:
+            continue
+        values = [evaluate(g, x) for g in S]
+        if 1 not in values:
+            continue
+        index = len(S) - 1 - values[::-1].index(1)
+        pivot = S.pop(index)
+        for j in range(index):
+            if values[j]:
+                S[j] = S[j] ^ pivot
+    return [sorted(g) for g in S]
+
+def algebraic_immunity(f, locality):
+    """
+    Algebraic immunity: the smallest degree of a nonzero annihilator of f or f+1.
+    """
+    complement = [1 - y for y in f]
+    degree = 0
+    while nb_annihilators(f, locality, degree) == 0 and nb_annihilators(complement, locality, degree) == 0:
+        degree += 1
+    return degree
+
+def is_resilient(f, locality, r):
+    """
+    Checks that the Walsh coefficients of weight at most r are null.
+    """
+    W = walsh(f, locality)
+    return all(W[a] == 0 for a in range(2**locality) if bin(a).count("1") <= r)
+
+def rotate(x, locality):
+    """
+    Rotation of the bits of x, the first bit (most significant) becoming the second one.
+    """
+    return (x >> 1) | ((x & 1) << (locality-1))
+
+def orbit(x, locality):
+    """
+    Orbit of x under rotation.
+    """
+    orbit = {x}
+    y = rotate(x, locality)
+    while y != x:
+        orbit.add(y)
+        y = rotate(y, locality)
+    return orbit
+
+def representatives(locality):
+    """
+    Representatives of the baseline RSF_toolbox.compute_representatives as integers (the first bit being the most significant one):
+    the smallest element of each orbit, sorted by weight, then by increasing order.
+    """
+    return sorted({min(orbit(x, locality)) for x in range(2**locality)}, key = lambda x: (bin(x).count("1"), x))
+
+def RSF_from_SANF(SANF, locality):
+    """
+    Truth table of the rotation symmetric function of a SANF: the coefficient of a monomial u in the ANF
+    is the coefficient of its orbit in the SANF.
+    """
+    reps = representatives(locality)
+    index = {y: i for (i, x) in enumerate(reps) for y in orbit(x, locality)}
+    return moebius([SANF[index[u]] for u in range(2**locality)], locality)
+
+def ReedMuller(r, m):
+    """
+    Baseline reedmuller.ReedMuller: the columns are the monomials given by itertools.combinations, degree by degree,
+    and the rows are the inputs from 11...1 down to 00...0, the variable 0 being the first (most significant) bit.
+    """
+    columns = [monomial for i in range(r+1) for monomial in itertools.combinations(range(m), i)]
+    rows = []
+    for x in range(2**m - 1, -1, -1):
+        entry = [(x >> (m-1-i)) & 1 for i in range(m)]
+        rows.append([1 if all(entry[variable] for variable in monomial) else 0 for monomial in columns])
+    return rows
+
+def gf_multiply(a, b, modulus):
+    """
+    Product in GF(2^m) = GF(2)[X]/(modulus), the elements being polynomials packed into integers.
+    """
+    m = modulus.bit_length() - 1
+    product = 0
+    while b:
+        if b & 1:
+            product ^= a
+        b >>= 1
+        a <<= 1
+        if a >> m:
+            a ^= modulus
+    return product
+
+def gf_rank(matrix, modulus):
+    """
+    Rank of a matrix over GF(2^m) = GF(2)[X]/(modulus), by Gaussian elimination.
+    """
+    size = 2**(modulus.bit_length() - 1)
+    rows = [list(row) for row in matrix]
+    rank = 0
+    for c in range(len(rows[0]) if rows else 0):
+        pivot = next((i for i in range(rank, len(rows)) if rows[i][c]), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        inverse = next(b for b in range(1, size) if gf_multiply(rows[rank][c], b, modulus) == 1)
+        rows[rank] = [gf_multiply(inverse, x, modulus) for x in rows[rank]]
+        for i in range(len(rows)):
+            if i != rank and rows[i][c]:
+                factor = rows[i][c]
+                rows[i] = [x ^ gf_multiply(factor, y, modulus) for x, y in zip(rows[i], rows[rank])]
+        rank += 1
+    return rank
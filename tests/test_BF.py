@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the BF class against the reference implementations.
+"""
+
+import random
+import pytest
+
+from BF import BF
+from toolbox import pack_bits
+import reference
+
+
+@pytest.mark.parametrize("locality", range(2, 8))
+def test_representations(backend, locality):
+    rng = random.Random(locality)
+    for i in range(5):
+        f = reference.random_TT(locality, rng)
+        ANF = reference.moebius(f, locality)
+        
+        bf = BF(locality)
+        bf.set_TT(f)
+        bf.update_ANF()
+        bf.update_WS()
+        assert bf.TT == bf.get_TT() == f
+        assert bf.ANF == bf.get_ANF() == ANF
+        assert bf.get_WalshSpectrum() == reference.walsh(f, locality)
+        assert (bf.TT_packed, bf.ANF_packed) == (pack_bits(f), pack_bits(ANF))
+        
+        bf = BF(locality)
+        bf.ANF = ANF
+        bf.update_TT()
+        assert bf.TT == f
+        assert bf.get_ANF(1, 2) == [ANF[u] for u in range(2**locality) if 1 <= bin(u).count("1") <= 2]
+        TT = bf.TT
+        TT[0] ^= 1 #a copy, the function is not modified
+        assert bf.TT == bf.get_TT() == f
+        ANF_read = bf.ANF
+        ANF_read[0] ^= 1
+        assert bf.ANF == bf.get_ANF() == ANF
+
+@pytest.mark.parametrize("resiliency", [-1, 0, 1, 2])
+def test_flip_TT(backend, resiliency):
+    locality = 5
+    rng = random.Random(resiliency)
+    f = reference.random_TT(locality, rng)
+    bf = BF(locality)
+    bf.set_TT(f)
+    bf.update_ANF()
+    bf.update_WS()
+    bf.track_resiliency(resiliency)
+    for i in range(60):
+        x = rng.randrange(2**locality)
+        f[x] ^= 1
+        bf.flip_TT(x)
+        W = reference.walsh(f, locality)
+        assert bf.get_TT() == f
+        assert bf.get_ANF() == reference.moebius(f, locality)
+        assert bf.get_WalshSpectrum() == W
+        if resiliency >= 0:
+            assert bf.nb_nonzero_low_weight == sum(1 for a in range(2**locality) if bin(a).count("1") <= resiliency and W[a] != 0)
+            assert bf.is_resilient(resiliency) == reference.is_resilient(f, locality, resiliency)
+
+def test_shared_tables(backend):
+    bf1 = BF(4)
+    bf2 = BF(4)
+    assert not hasattr(bf1, "__dict__")
+    assert bf1.monomials_degree is bf2.monomials_degree
+    assert list(bf1.monomials_degree) == [bin(x).count("1") for x in range(16)]
+
+@pytest.mark.parametrize("locality", [3, 5])
+def test_permute_translate(backend, locality):
+    rng = random.Random(locality)
+    f = reference.random_TT(locality, rng)
+    permutation = list(range(locality))
+    rng.shuffle(permutation)
+    translation = [rng.getrandbits(1) for i in range(locality)]
+    mask = int("".join(str(t) for t in translation), 2)
+    #the bit l-1-i of the permuted input is the bit l-1-permutation[i] of the input
+    def permute(x):
+        return sum(((x >> (locality-1-permutation[i])) & 1) << (locality-1-i) for i in range(locality))
+    
+    bf = BF(locality)
+    bf.set_TT(f)
+    assert bf.permute(permutation, new_object = True).get_TT() == [f[permute(x)] for x in range(2**locality)]
+    assert bf.translate(translation, new_object = True).get_TT() == [f[x ^ mask] for x in range(2**locality)]
+    bf.translate(translation)
+    assert bf.get_TT() == [f[x ^ mask] for x in range(2**locality)]
+
+@pytest.mark.parametrize("locality", range(2, 7))
+def test_update_paths(backend, locality):
+    rng = random.Random(locality)
+    for i in range(3):
+        f = reference.random_TT(locality, rng)
+        bf = BF(locality)
+        bf.set_WS(reference.walsh(f, locality))
+        bf.update_ANF()
+        assert bf.get_TT() == f
+        assert bf.get_ANF() == reference.moebius(f, locality)
+        
+        bf = BF(locality)
+        bf.set_ANF(reference.moebius(f, locality))
+        bf.update_WS()
+        assert bf.get_WalshSpectrum() == reference.walsh(f, locality)
+        assert bf.get_WalshSpectrum(1, 1) == [reference.walsh(f, locality)[1 << k] for k in range(locality)]
+        assert bf.weight() == sum(f)
+        assert bf.is_balanced() == (2*sum(f) == 2**locality)
+
+@pytest.mark.parametrize("locality, degree", [(3, 1), (4, 2), (5, 2), (6, 3)])
+def test_annihilators(backend, locality, degree):
+    rng = random.Random(locality)
+    f = reference.random_TT(locality, rng)
+    bf = BF(locality)
+    bf.set_TT(f)
+    bf.update_annihilators(degree)
+    expected = [reference.get_annihilators(f, locality, degree), reference.get_annihilators([1 - y for y in f], locality, degree)]
+    dense = [[[1 if u in g else 0 for u in range(2**locality)] for g in basis] for basis in expected]
+    assert [list(basis) for basis in bf.get_annihilators()] == dense
+    assert [list(basis) for basis in bf.get_annihilators(0, locality)] == dense
+    selection = [u for u in range(2**locality) if 1 <= bin(u).count("1") <= 2]
+    assert [list(basis) for basis in bf.get_annihilators(1, 2)] == [[[g[u] for u in selection] for g in basis] for basis in dense]
+    assert [list(basis) for basis in bf.get_annihilators(dense = False)] == [[sum(1 << u for u in g) for g in basis] for basis in expected]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the RSF class against the reference implementations.
+"""
+
+import random
+import pytest
+
+from RSF import RSF
+from toolbox import bool_list_to_integer, integer_to_bool_list
+import reference
+
+
+def test_lazy_RSF():
+    rsf = RSF(6)
+    for name in ("SANF_to_STT", "STT_to_SWS", "verification_AI", "verification_AI_RSF", "order_AI"):
+        assert name not in vars(rsf)
+    rsf.set_SANF([0]*rsf.nb_representatives)
+    rsf.update_SWS()
+    assert "STT_to_SWS" in vars(rsf) and "verification_AI" not in vars(rsf)
+    rsf.is_algebraic_immune(3)
+    assert {"verification_AI_RSF", "STT_to_SWS"} <= set(rsf.build_times)
+    verification = rsf.verification_AI_RSF
+    rsf.is_algebraic_immune(2) #rebuilt for the new algebraic immunity
+    assert rsf.verification_AI_RSF is not verification and rsf.verification_AI_RSF.ai == 2
+    rsf.set_order_AI("weight")
+    assert "order_AI" not in vars(rsf) and "order_AI" not in rsf.build_times
+    assert (rsf.order_AI.strategy, rsf.order_AI.ai) == ("weight", 2) and "order_AI" in rsf.build_times
+
+def check_RSF(rsf, SANF):
+    """
+    Compares the STT, SWS, TT and ANF of rsf with the definitions for the given SANF.
+    """
+    locality = rsf.l
+    f = reference.RSF_from_SANF(SANF, locality)
+    W = reference.walsh(f, locality) #Walsh transform of sign(f), the SWS is the transform of (-1)^f
+    representatives = reference.representatives(locality)
+    rsf.update_STT()
+    rsf.update_SWS()
+    rsf.update_TT()
+    rsf.update_ANF_from_SANF()
+    assert list(rsf.STT) == [f[x] for x in representatives]
+    assert list(rsf.SWS) == [-W[x] for x in representatives]
+    assert list(rsf.TT) == f
+    assert rsf.ANF == " + ".join(rsf.SANF_to_ANF[i] for i in range(len(SANF)) if SANF[i])
+
+@pytest.mark.parametrize("locality", range(3, 9))
+def test_SANF_STT_SWS(locality):
+    rng = random.Random(locality)
+    rsf = RSF(locality)
+    for i in range(5):
+        SANF = [rng.getrandbits(1) for r in rsf.representatives]
+        rsf.set_SANF(SANF)
+        check_RSF(rsf, SANF)
+
+@pytest.mark.parametrize("locality", [5, 7])
+def test_toggle_SANF(locality):
+    rng = random.Random(locality)
+    rsf = RSF(locality)
+    given = [0]*rsf.nb_representatives
+    rsf.set_SANF(given)
+    SANF = list(given)
+    rsf.update_STT()
+    for i in range(20):
+        indexes = rng.sample(range(rsf.nb_representatives), rng.randrange(1, 4))
+        rsf.toggle_SANF(indexes)
+        for j in indexes:
+            SANF[j] ^= 1
+        assert rsf.SANF == SANF
+        check_RSF(rsf, SANF)
+    assert given == [0]*rsf.nb_representatives #set_SANF copies its argument
+
+@pytest.mark.parametrize("locality", [4, 5, 7])
+def test_array_backend(backend, locality):
+    if backend == "python":
+        with pytest.raises(ImportError):
+            RSF(locality, array_backend = True)
+        return
+    rng = random.Random(locality)
+    rsf = RSF(locality, array_backend = True)
+    for i in range(10):
+        SANF = [rng.getrandbits(1) if sum(r) <= (locality+1)//2 else 0 for r in rsf.representatives]
+        rsf.set_SANF(SANF)
+        check_RSF(rsf, SANF)
+        f = reference.RSF_from_SANF(SANF, locality)
+        for r in range(3):
+            assert rsf.is_resilient_optimised(r) == rsf.is_resilient(r) == reference.is_resilient(f, locality, r)
+
+@pytest.mark.parametrize("locality", range(3, 8))
+def test_is_resilient_optimised(locality):
+    rng = random.Random(locality)
+    rsf = RSF(locality)
+    max_degree = (locality+1)//2
+    nb_low_degree = sum(1 for r in rsf.representatives if sum(r) <= max_degree)
+    numbers = range(2**nb_low_degree) if nb_low_degree <= 8 else [rng.getrandbits(nb_low_degree) for i in range(20)]
+    for n in numbers:
+        SANF = integer_to_bool_list(n, nb_low_degree) + [0]*(rsf.nb_representatives - nb_low_degree)
+        rsf.set_SANF(SANF)
+        f = reference.RSF_from_SANF(SANF, locality)
+        for r in range(3):
+            assert rsf.is_resilient_optimised(r) == reference.is_resilient(f, locality, r)
+
+@pytest.mark.parametrize("locality", [5, 6, 7])
+def test_STT_setter(locality):
+    rng = random.Random(locality)
+    rsf = RSF(locality)
+    rsf.set_SANF([1]*rsf.nb_representatives)
+    rsf.update_STT()
+    for i in range(5):
+        given = [rng.getrandbits(1) for r in rsf.representatives]
+        STT = list(given)
+        rsf.STT = given
+        given[0] ^= 1 #the setter copies its argument
+        assert list(rsf.STT) == STT
+        with pytest.raises(TypeError):
+            rsf.STT[0] ^= 1 #read-only, the STT is modified through the setter
+        assert list(rsf.STT) == STT and rsf.STT_packed == bool_list_to_integer(STT)
+        assert rsf.is_STT_uptodate and not (rsf.is_SANF_uptodate or rsf.is_SWS_uptodate or rsf.is_TT_uptodate)
+        f = [0]*2**locality
+        for i, x in enumerate(reference.representatives(locality)):
+            for y in reference.orbit(x, locality):
+                f[y] = STT[i]
+        rsf.update_TT()
+        rsf.update_SWS()
+        assert list(rsf.TT) == f
+        assert list(rsf.SWS) == [-reference.walsh(f, locality)[x] for x in reference.representatives(locality)]
+        for r in range(3):
+            assert rsf.is_resilient_optimised(r) == reference.is_resilient(f, locality, r)
+
+@pytest.mark.parametrize("locality", [5, 7])
+def test_resilient_block(backend, locality):
+    rng = random.Random(locality)
+    rsf = RSF(locality)
+    indexes = rng.sample(range(1, rsf.nb_representatives), 4)
+    if backend == "python":
+        with pytest.raises(ImportError):
+            rsf.resilient_block(indexes, 1)
+        return
+    for i in range(3):
+        SANF = [rng.getrandbits(1) if sum(r) <= (locality+1)//2 else 0 for r in rsf.representatives]
+        rsf.set_SANF(SANF)
+        for r in range(3):
+            expected = []
+            for number in range(2**len(indexes)):
+                block_SANF = list(SANF)
+                for b, j in enumerate(indexes):
+                    block_SANF[j] ^= (number >> b) & 1
+                if reference.is_resilient(reference.RSF_from_SANF(block_SANF, locality), locality, r):
+                    expected.append(number)
+            assert rsf.resilient_block(indexes, r) == expected
+            assert rsf.SANF == SANF
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the algebraic immunity checks of the RSF_AI module against the reference implementations.
+"""
+
+import random
+import pytest
+
+from RSF import RSF
+from RSF_AI import Verification_AI, Verification_AI_RSF, Input_order
+from toolbox import np, integer_to_bool_list, popcount
+import reference
+
+
+def check(verification, f, order):
+    """
+    Feeds a truth table to a verification in the given order, and returns the results of check_and_add.
+    """
+    return [verification.check_and_add(x, f[x]) for x in order]
+
+@pytest.mark.parametrize("locality", range(3, 8))
+def test_verification_AI(locality):
+    rng = random.Random(locality)
+    for ai in range(1, (locality+1)//2 + 1):
+        verification = Verification_AI(locality, ai)
+        for i in range(6):
+            f = reference.random_TT(locality, rng)
+            immune = reference.algebraic_immunity(f, locality) >= ai
+            order = list(range(2**locality))
+            rng.shuffle(order)
+            verification.reset()
+            results = check(verification, f, order)
+            assert results[-1] == immune
+            assert results == sorted(results, reverse = True) #a rejection is final
+            if np is not None:
+                verification.reset()
+                assert check(verification, f, np.array(order)) == results #inputs given as numpy.int64
+            verification.reset()
+            assert all(verification.check_and_add(integer_to_bool_list(x, locality), f[x]) for x in range(2**locality)) == immune
+
+@pytest.mark.parametrize("locality, ai", [(4, 2), (5, 3), (6, 3)])
+def test_verification_AI_rollback(locality, ai):
+    rng = random.Random(locality)
+    split = 2**locality // 3
+    verification = Verification_AI(locality, ai)
+    prefix = reference.random_TT(locality, rng)[0:split]
+    check(verification, prefix, range(split))
+    token = verification.snapshot()
+    for i in range(8):
+        f = prefix + reference.random_TT(locality, rng)[split:]
+        verification.rollback(token)
+        results = [verification.check_and_add(x, f[x]) for x in range(split, 2**locality)]
+        fresh = Verification_AI(locality, ai)
+        assert results == check(fresh, f, range(2**locality))[split:]
+        assert results[-1] == (reference.algebraic_immunity(f, locality) >= ai)
+
+@pytest.mark.parametrize("strategy", Input_order.strategies)
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_input_order(strategy, adaptive):
+    locality, ai = 6, 3
+    rng = random.Random(0)
+    order = Input_order(locality, ai, strategy, adaptive)
+    assert sorted(order.order) == list(range(2**locality))
+    if strategy == "weight":
+        assert [popcount(x) for x in order.order] == sorted(popcount(x) for x in range(2**locality))
+    if strategy == "independence": #the first inputs give independent rows of RM(ai-1, l)
+        nb_monomials = len(reference.monomials(locality, ai-1))
+        rows = [sum(1 << j for (j, u) in enumerate(reference.monomials(locality, ai-1)) if x & u == u) for x in order.order[0:nb_monomials]]
+        assert reference.rank(rows) == nb_monomials
+    
+    verification = Verification_AI(locality, ai)
+    nb_rejections = 0
+    for i in range(20):
+        f = reference.random_TT(locality, rng)
+        verification.reset()
+        results = check(verification, f, list(order.order))
+        assert results[-1] == (reference.algebraic_immunity(f, locality) >= ai)
+        rejected = False in results
+        order.record(results.index(False) + 1 if rejected else 2**locality, rejected)
+        nb_rejections += rejected
+        assert sorted(order.order) == list(range(2**locality))
+    assert (order.nb_checks, order.nb_rejections) == (20, nb_rejections)
+
+@pytest.mark.parametrize("strategy", Input_order.strategies)
+def test_RSF_input_order(strategy):
+    locality, ai = 6, 3
+    rng = random.Random(1)
+    rsf = RSF(locality)
+    rsf.set_order_AI(strategy, adaptive = True, algebraic_immunity = ai)
+    for i in range(20):
+        SANF = [rng.getrandbits(1) if sum(r) <= ai else 0 for r in rsf.representatives]
+        rsf.set_SANF(SANF)
+        f = reference.RSF_from_SANF(SANF, locality)
+        assert rsf.is_algebraic_immune(ai) == (reference.algebraic_immunity(f, locality) >= ai)
+
+def random_RSF(rsf, degree, rng):
+    """
+    Random SANF of degree at most degree, and the truth table of its function.
+    """
+    SANF = [rng.getrandbits(1) if sum(r) <= degree else 0 for r in rsf.representatives]
+    return (SANF, reference.RSF_from_SANF(SANF, rsf.l))
+
+@pytest.mark.parametrize("locality", range(3, 10))
+def test_verification_AI_RSF(backend, locality):
+    rng = random.Random(locality)
+    rsf = RSF(locality)
+    representatives = reference.representatives(locality)
+    #random functions, the majority function (of optimal algebraic immunity) and some of its neighbours
+    functions = [random_RSF(rsf, (locality+1)//2, rng)[1] for i in range(30 if locality < 8 else 4)]
+    majority = [1 if 2*popcount(x) > locality else 0 for x in range(2**locality)]
+    functions.append(majority)
+    for i in range(3):
+        x = rng.choice(representatives)
+        functions.append([y ^ (x in reference.orbit(z, locality)) for (z, y) in enumerate(majority)])
+    
+    for f in functions:
+        STT = [f[x] for x in representatives]
+        ANF = reference.moebius(f, locality)
+        rsf.set_SANF([ANF[x] for x in representatives])
+        ai_f = reference.algebraic_immunity(f, locality)
+        for ai in range(1, (locality+1)//2 + 1):
+            complete = Verification_AI_RSF(locality, ai, rsf.representatives)
+            symmetric = Verification_AI_RSF(locality, ai, rsf.representatives, complete = False)
+            assert complete.is_complete == (locality % 2 == 1)
+            for verification in (complete, symmetric):
+                accepted = all(verification.check_and_add(j, STT[j]) for j in range(len(STT)))
+                if verification.is_complete:
+                    assert accepted == (ai_f >= ai)
+                else: #only the rotation symmetric annihilators are found
+                    assert accepted or ai_f < ai
+            assert rsf.is_algebraic_immune(ai) == (ai_f >= ai)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the RSF_tables module: the tables are compared with their definitions, computed or memory-mapped from a cache file.
+"""
+
+import os
+import pytest
+
+import RSF_tables
+from RSF_tables import RSF_tables as Tables, load_RSF_tables, get_RSF_tables
+from RSF_toolbox import representative_to_ANF
+from toolbox import integer_to_bool_list
+import reference
+
+
+def check_tables(tables, locality):
+    """
+    Compares the tables with their definitions.
+    """
+    representatives = reference.representatives(locality)
+    orbits = [reference.orbit(x, locality) for x in representatives]
+    assert list(tables.representatives_integers) == representatives
+    assert tables.representatives == [integer_to_bool_list(x, locality) for x in representatives]
+    assert [representatives[tables.representative_index[x]] for x in range(2**locality)] == [min(reference.orbit(x, locality)) for x in range(2**locality)]
+    for x in range(2**locality):
+        assert (tables.STT_to_TT[x] == -1) if x in representatives else (tables.STT_to_TT[x] in reference.orbit(x, locality))
+    for (i, orbit) in enumerate(orbits):
+        assert list(tables.SANF_to_STT[i]) == [sum(1 for u in orbit if u & y == u) & 1 for y in representatives]
+        assert list(tables.STT_to_SWS[i]) == [sum((-1)**bin(u & a).count("1") for u in orbit) for a in representatives]
+        assert tables.SANF_to_STT_packed[i] == int("".join(str(b) for b in tables.SANF_to_STT[i]), 2)
+    assert list(tables.ANF) == [representative_to_ANF(integer_to_bool_list(x, locality)) for x in representatives]
+
+@pytest.mark.parametrize("locality", range(2, 9))
+def test_cache_file(tmp_path, locality):
+    tables = Tables(locality)
+    check_tables(tables, locality)
+    assert not tables.is_mapped
+    
+    file_name = str(tmp_path / "tables.bin")
+    tables.save(file_name)
+    assert os.listdir(tmp_path) == ["tables.bin"]
+    mapped = load_RSF_tables(locality, file_name)
+    assert mapped.is_mapped
+    check_tables(mapped, locality)
+
+def test_invalid_cache_file(tmp_path):
+    file_name = str(tmp_path / "tables.bin")
+    assert load_RSF_tables(5, file_name) is None #missing
+    Tables(5).save(file_name)
+    assert load_RSF_tables(6, file_name) is None #other locality
+    with open(file_name, "rb") as file:
+        content = file.read()
+    for truncated in (content[0:10], content[0:len(content)//2]):
+        with open(file_name, "wb") as file:
+            file.write(truncated)
+        assert load_RSF_tables(5, file_name) is None
+    open(file_name, "wb").close() #empty
+    assert load_RSF_tables(5, file_name) is None
+
+def test_save_error(tmp_path, monkeypatch):
+    def replace(source, destination):
+        raise OSError("disk full")
+    monkeypatch.setattr(RSF_tables.os, "replace", replace)
+    with pytest.raises(OSError):
+        Tables(5).save(str(tmp_path / "tables.bin"))
+    assert os.listdir(tmp_path) == [] #the temporary file is removed
+
+def test_get_RSF_tables(tmp_path, monkeypatch):
+    monkeypatch.setattr(RSF_tables, "cache_directory", str(tmp_path))
+    monkeypatch.setattr(RSF_tables, "RSF_tables_cache", {})
+    tables = get_RSF_tables(6)
+    assert not tables.is_mapped and get_RSF_tables(6) is tables
+    assert os.path.exists(RSF_tables.cache_file_name(6))
+    monkeypatch.setattr(RSF_tables, "RSF_tables_cache", {}) #another process
+    mapped = get_RSF_tables(6)
+    assert mapped.is_mapped
+    check_tables(mapped, 6)
+    assert get_RSF_tables(7, persistent = False).is_mapped == False
+    assert not os.path.exists(RSF_tables.cache_file_name(7))
+
+def test_lazy_tables():
+    tables = Tables(7)
+    assert list(tables.build_times) == ["representatives"]
+    for name in ("SANF_to_STT", "STT_to_SWS", "ANF", "decimations"):
+        assert name not in vars(tables)
+    tables.SANF_to_STT_packed #built with SANF_to_STT
+    assert set(tables.build_times) == {"representatives", "SANF_to_STT", "SANF_to_STT_packed"}
+    assert "STT_to_SWS" not in vars(tables)
+    check_tables(tables, 7)
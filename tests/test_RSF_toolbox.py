@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the RSF_toolbox module against the reference implementations.
+"""
+
+import random
+from math import gcd
+import pytest
+
+import RSF_toolbox
+from toolbox import bool_list_to_integer, integer_to_bool_list
+import reference
+
+
+@pytest.mark.parametrize("locality", range(1, 11))
+def test_necklaces(locality):
+    expected = sorted({min(reference.orbit(x, locality)) for x in range(2**locality)})
+    assert list(RSF_toolbox.necklaces(locality)) == expected
+
+@pytest.mark.parametrize("locality", range(1, 11))
+def test_representatives(locality):
+    expected = reference.representatives(locality)
+    (representatives, representative_index) = RSF_toolbox.compute_orbits(locality)
+    assert list(representatives) == expected
+    assert [expected[representative_index[x]] for x in range(2**locality)] == [min(reference.orbit(x, locality)) for x in range(2**locality)]
+    
+    (representatives, truth_table_index) = RSF_toolbox.compute_representatives(locality)
+    assert representatives == [integer_to_bool_list(x, locality) for x in expected]
+    for x in range(2**locality): #-1 for the representatives, a smaller element of the orbit otherwise
+        if x in expected:
+            assert truth_table_index[x] == -1
+        else:
+            assert truth_table_index[x] < x and truth_table_index[x] in reference.orbit(x, locality)
+
+@pytest.mark.parametrize("locality", range(1, 8))
+def test_integer_orbit(locality):
+    for x in range(2**locality):
+        orbit = RSF_toolbox.integer_orbit(x, locality)
+        assert len(orbit) == len(set(orbit)) and set(orbit) == reference.orbit(x, locality)
+        assert sorted(map(bool_list_to_integer, RSF_toolbox.vector_orbit(integer_to_bool_list(x, locality)))) == sorted(orbit)
+
+def decimate(u, k, locality):
+    """
+    Image of the monomial u by the decimation x_i -> x_{k*i mod l}, the variable x_0 being the most significant bit.
+    """
+    return sum(1 << (locality-1-(k*i % locality)) for i in range(locality) if (u >> (locality-1-i)) & 1)
+
+@pytest.mark.parametrize("locality", range(3, 10))
+def test_decimation_permutations(locality):
+    rng = random.Random(locality)
+    (representatives, representative_index) = RSF_toolbox.compute_orbits(locality)
+    permutations = RSF_toolbox.decimation_permutations(representatives, representative_index, locality)
+    decimations = [k for k in range(2, locality) if gcd(k, locality) == 1]
+    assert len(permutations) == len(decimations)
+    for (k, permutation) in zip(decimations, permutations):
+        assert sorted(permutation) == list(range(len(representatives)))
+        for i in range(3):
+            SANF = [rng.getrandbits(1) for x in representatives]
+            f = reference.RSF_from_SANF(SANF, locality)
+            g = reference.RSF_from_SANF(RSF_toolbox.permute_SANF(SANF, permutation), locality)
+            ANF_f = reference.moebius(f, locality)
+            ANF_g = reference.moebius(g, locality)
+            assert all(ANF_g[decimate(u, k, locality)] == ANF_f[u] for u in range(2**locality))
+            if locality <= 7: #same resiliency and algebraic immunity
+                assert reference.algebraic_immunity(f, locality) == reference.algebraic_immunity(g, locality)
+                assert sorted(map(abs, reference.walsh(f, locality))) == sorted(map(abs, reference.walsh(g, locality)))
+
+@pytest.mark.parametrize("locality", [5, 7, 9])
+def test_decimation_tables(locality):
+    rng = random.Random(locality)
+    (representatives, representative_index) = RSF_toolbox.compute_orbits(locality)
+    permutations = RSF_toolbox.decimation_permutations(representatives, representative_index, locality)
+    weights = [bin(x).count("1") for x in representatives]
+    for (low, high) in [(0, (locality+1)//2), (2, locality-2)]: #the decimations preserve the weight
+        indexes = [j for j in range(len(representatives)) if low <= weights[j] <= high]
+        tables = RSF_toolbox.decimation_tables(permutations, indexes)
+        for i in range(20):
+            x = rng.getrandbits(len(indexes))
+            SANF = [0]*len(representatives)
+            for (j, bit) in zip(indexes, integer_to_bool_list(x, len(indexes))):
+                SANF[j] = bit
+            for (permutation, table) in zip(permutations, tables):
+                image = RSF_toolbox.permute_SANF(SANF, permutation)
+                assert RSF_toolbox.permute_integer(x, table) == bool_list_to_integer([image[j] for j in indexes])
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the annihilator module against the reference implementations.
+"""
+
+import random
+import pytest
+
+import annihilator
+from toolbox import popcount
+import reference
+
+
+def functions(locality, rng):
+    """
+    Random functions, with the null and constant functions, and some of low weight.
+    """
+    yield [0]*2**locality
+    yield [1]*2**locality
+    for i in range(4):
+        yield reference.random_TT(locality, rng)
+    for i in range(2):
+        yield [1 if rng.random() < 0.1 else 0 for x in range(2**locality)]
+
+def check_vanishing(tracker):
+    """
+    Checks that the functions of the pivots recorded in vanishing vanish on every dependent input.
+    """
+    for space in tracker.spaces:
+        assert space.vanishing <= set(space.pivots)
+        for x in space.vanishing:
+            assert all(popcount(space.pivots[x] & space.masks[z]) & 1 == 0 for z in space.dependent)
+
+@pytest.mark.parametrize("locality", range(1, 7))
+def test_get_annihilators(locality):
+    rng = random.Random(locality)
+    for f in functions(locality, rng):
+        for degree in range(0, min(locality, 3) + 1):
+            basis = annihilator.get_annihilators(f, locality, degree)
+            assert basis == reference.get_annihilators(f, locality, degree)
+            
+            basis = annihilator.get_annihilators(f, locality, degree, four_russians = True)
+            assert len(basis) == reference.nb_annihilators(f, locality, degree)
+            assert reference.same_span(basis, reference.get_annihilators(f, locality, degree))
+            assert all(reference.evaluate(g, x) == 0 for g in basis for x in range(2**locality) if f[x])
+
+@pytest.mark.parametrize("block_size", [1, 3, 8])
+def test_kernel_four_russians(block_size):
+    rng = random.Random(block_size)
+    for i in range(20):
+        nb_columns = rng.randrange(1, 30)
+        rows = [rng.getrandbits(nb_columns) & rng.getrandbits(nb_columns) for j in range(rng.randrange(0, 40))]
+        basis = annihilator.kernel_four_russians(rows, nb_columns, block_size)
+        assert len(basis) == nb_columns - reference.rank(rows)
+        assert reference.rank(basis) == len(basis)
+        assert all(popcount(row & v) % 2 == 0 for row in rows for v in basis)
+
+@pytest.mark.parametrize("locality", range(1, 7))
+def test_has_annihilator(locality):
+    rng = random.Random(locality)
+    for f in functions(locality, rng):
+        complement = [1 - y for y in f]
+        packed = sum(f[x] << x for x in range(2**locality))
+        for degree in range(0, min(locality, 3) + 1):
+            of_f = reference.nb_annihilators(f, locality, degree) > 0
+            of_complement = reference.nb_annihilators(complement, locality, degree) > 0
+            assert annihilator.has_annihilator(f, locality, degree) == (of_f or of_complement)
+            assert annihilator.has_annihilator(packed, locality, degree) == (of_f or of_complement)
+            assert annihilator.has_annihilator(f, locality, degree, complement = False) == of_f
+
+@pytest.mark.parametrize("locality", range(1, 8))
+def test_algebraic_immunity(locality):
+    rng = random.Random(locality)
+    for f in functions(locality, rng):
+        ai, g = annihilator.algebraic_immunity(f, locality)
+        assert ai == reference.algebraic_immunity(f, locality)
+        assert g != [] and max(bin(u).count("1") for u in g) == ai
+        #g annihilates f, or f+1 if f has no annihilator of this degree
+        annihilated = 1 if all(reference.evaluate(g, x) == 0 for x in range(2**locality) if f[x]) else 0
+        assert all(reference.evaluate(g, x) == 0 for x in range(2**locality) if f[x] == annihilated)
+        assert annihilated == 1 or reference.nb_annihilators(f, locality, ai) == 0
+
+@pytest.mark.parametrize("locality, degree", [(3, 1), (4, 1), (4, 2), (5, 2), (6, 2)])
+def test_annihilator_tracker(locality, degree):
+    rng = random.Random(locality * degree)
+    f = reference.random_TT(locality, rng)
+    tracker = annihilator.Annihilator_tracker(f, locality, degree)
+    for i in range(80):
+        x = rng.randrange(2**locality)
+        f[x] ^= 1
+        tracker.flip(x)
+        complement = [1 - y for y in f]
+        (basis_f, basis_complement) = tracker.get_annihilators()
+        assert reference.same_span(basis_f, reference.get_annihilators(f, locality, degree))
+        assert reference.same_span(basis_complement, reference.get_annihilators(complement, locality, degree))
+        assert len(basis_f) == reference.nb_annihilators(f, locality, degree)
+        assert len(basis_complement) == reference.nb_annihilators(complement, locality, degree)
+        assert tracker.has_annihilator() == (basis_f != [] or basis_complement != [])
+        check_vanishing(tracker)
+
+@pytest.mark.parametrize("locality, degree", [(4, 1), (5, 2), (6, 2), (6, 3)])
+def test_annihilator_tracker_undo(locality, degree):
+    #flips undone as in a local search: the pivots they added are removed again without scanning the dependent inputs
+    rng = random.Random(locality * degree)
+    f = [1 if rng.random() < 0.2 else 0 for x in range(2**locality)] #of low weight, with annihilators
+    tracker = annihilator.Annihilator_tracker(f, locality, degree)
+    expected = [reference.get_annihilators(f, locality, degree), reference.get_annihilators([1 - y for y in f], locality, degree)]
+    recorded = False
+    for i in range(40):
+        flips = [rng.randrange(2**locality) for j in range(rng.randrange(1, 4))]
+        for x in flips:
+            tracker.flip(x)
+        recorded |= any(space.vanishing for space in tracker.spaces)
+        check_vanishing(tracker)
+        for x in reversed(flips):
+            tracker.flip(x)
+        check_vanishing(tracker)
+        for (basis, reference_basis) in zip(tracker.get_annihilators(), expected):
+            assert reference.same_span(basis, reference_basis) and len(basis) == len(reference_basis)
+    assert recorded
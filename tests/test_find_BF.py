@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the searches of the find_BF module against an exhaustive search on the reference implementations.
+"""
+
+import pytest
+
+import find_BF
+import reference
+
+parameters = [(3, -1, 1), (3, 0, 1), (3, 0, 2), (3, 1, 1), (3, 1, 2)]
+
+def reference_search(locality, resiliency, algebraic_immunity):
+    """
+    Functions found by the baseline find_BF_naive, in its order: the first entry of the truth table is the most significant bit.
+    """
+    found = []
+    for n in range(2**2**locality):
+        f = [(n >> (2**locality-1-x)) & 1 for x in range(2**locality)]
+        if (resiliency == -1 or reference.is_resilient(f, locality, resiliency)) and reference.algebraic_immunity(f, locality) >= algebraic_immunity:
+            found.append(f)
+    return found
+
+def printed_functions(capsys):
+    return [eval(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize("locality, resiliency, algebraic_immunity", parameters)
+def test_find_BF_naive(backend, capsys, locality, resiliency, algebraic_immunity):
+    expected = reference_search(locality, resiliency, algebraic_immunity)
+    assert find_BF.find_BF_naive(locality, resiliency, algebraic_immunity) == len(expected)
+    assert printed_functions(capsys) == expected
+    if backend == "numpy":
+        assert find_BF.find_BF_naive(locality, resiliency, algebraic_immunity, block = True) == len(expected)
+        assert printed_functions(capsys) == expected
+    else:
+        with pytest.raises(ImportError):
+            find_BF.find_BF_naive(locality, resiliency, algebraic_immunity, block = True)
+
+def test_find_BF_naive_block_is_opt_in(monkeypatch, capsys):
+    def block(*arguments):
+        raise AssertionError("the block enumeration must be requested")
+    monkeypatch.setattr(find_BF, "find_BF_naive_block", block)
+    assert find_BF.find_BF_naive(3, 1, 1) == len(reference_search(3, 1, 1))
+
+@pytest.mark.parametrize("locality, resiliency, algebraic_immunity", parameters)
+def test_find_BF_gray(backend, capsys, locality, resiliency, algebraic_immunity):
+    expected = reference_search(locality, resiliency, algebraic_immunity)
+    assert find_BF.find_BF_gray(locality, resiliency, algebraic_immunity) == len(expected)
+    assert sorted(printed_functions(capsys)) == sorted(expected)
+
+@pytest.mark.parametrize("locality, resiliency, algebraic_immunity", parameters)
+def test_find_BF_dfs(capsys, locality, resiliency, algebraic_immunity):
+    expected = reference_search(locality, resiliency, algebraic_immunity)
+    assert find_BF.find_BF_dfs(locality, resiliency, algebraic_immunity) == len(expected)
+    assert printed_functions(capsys) == expected
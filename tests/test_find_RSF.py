@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the searches of the find_RSF module against an exhaustive search on the reference implementations.
+The searches run in a temporary directory (see the search_directory fixture).
+"""
+
+import hashlib
+import pytest
+
+import find_RSF
+import toolbox
+from toolbox import integer_to_bool_list
+import reference
+
+parameters = [(5, 0, 3), (5, 1, 2), (5, 1, 3), (5, 2, 1)]
+baseline_dahus = "f8ed5f2306c78173612b44818ef47a31" #MD5 of the result file of find_RSF(7, 2, 4, min_degree_SANF = []) before the optimisations
+
+def reference_search(locality, resiliency, algebraic_immunity):
+    """
+    SANF found by the baseline find_RSF with min_degree_SANF = [], in its order: every SANF of the representatives
+    of degree at most (l+1)/2, the first one being the most significant bit.
+    """
+    nb_representatives = len(reference.representatives(locality))
+    nb_low_degree = sum(1 for x in reference.representatives(locality) if bin(x).count("1") <= (locality+1)//2)
+    found = []
+    for n in range(2**nb_low_degree):
+        SANF = integer_to_bool_list(n, nb_low_degree) + [0]*(nb_representatives - nb_low_degree)
+        f = reference.RSF_from_SANF(SANF, locality)
+        if reference.is_resilient(f, locality, resiliency) and reference.algebraic_immunity(f, locality) >= algebraic_immunity:
+            found.append(SANF)
+    return found
+
+def clear_search(search_directory):
+    """
+    Removes the result and backup files, so that a new search does not resume an ended one.
+    """
+    for path in list((search_directory / "result").iterdir()) + list((search_directory / "backup").iterdir()):
+        path.unlink()
+
+def orbit_sizes(capsys):
+    """
+    Orbit sizes of the classes found printed by a symmetric search.
+    """
+    line = [line for line in capsys.readouterr().out.splitlines() if line.startswith("Nb of classes found: ")][-1]
+    return eval(line.split("): ")[-1])
+
+def result_functions(filename):
+    """
+    SANF of a result file, made of a SANF line and an ANF line by function and ended by "End".
+    """
+    lines = open("result/" + filename).read().split("\n")
+    assert lines[-1] == "End"
+    return [eval(line) for line in lines[0:-1:2]]
+
+
+@pytest.mark.parametrize("locality, resiliency, algebraic_immunity", parameters)
+def test_find_RSF(search_directory, locality, resiliency, algebraic_immunity):
+    expected = reference_search(locality, resiliency, algebraic_immunity)
+    assert find_RSF.find_RSF(locality, resiliency, algebraic_immunity, min_degree_SANF = []) == len(expected)
+    assert result_functions("rsf-%d-%d-%d--.txt" % (locality, resiliency, algebraic_immunity)) == expected
+    assert find_RSF.find_RSF(locality, resiliency, algebraic_immunity, min_degree_SANF = [], gray = True) == len(expected)
+    assert sorted(result_functions("rsf-g-%d-%d-%d--.txt" % (locality, resiliency, algebraic_immunity))) == sorted(expected)
+
+@pytest.mark.parametrize("locality, resiliency, algebraic_immunity", parameters)
+@pytest.mark.parametrize("block_bits", [1, 4, 10])
+def test_find_RSF_block(search_directory, locality, resiliency, algebraic_immunity, block_bits):
+    if toolbox.np is None:
+        pytest.skip("the block enumeration requires numpy")
+    expected = reference_search(locality, resiliency, algebraic_immunity)
+    assert find_RSF.find_RSF(locality, resiliency, algebraic_immunity, min_degree_SANF = [], block_bits = block_bits) == len(expected)
+    assert result_functions("rsf-%d-%d-%d--.txt" % (locality, resiliency, algebraic_immunity)) == expected
+
+def test_find_RSF_block_gray():
+    with pytest.raises(ValueError):
+        find_RSF.find_RSF(5, 1, 3, gray = True, block_bits = 2)
+
+def test_find_RSF_dahus(search_directory):
+    #the 132 dahus of 7 variables, the result file is the one of the baseline
+    assert find_RSF.find_RSF(7, 2, 4, min_degree_SANF = []) == 132
+    assert hashlib.md5(open("result/rsf-7-2-4--.txt", "rb").read()).hexdigest() == baseline_dahus
+    found = result_functions("rsf-7-2-4--.txt")
+    assert len(set(map(tuple, found))) == 132
+    for SANF in found[::11]:
+        f = reference.RSF_from_SANF(SANF, 7)
+        assert reference.is_resilient(f, 7, 2) and reference.algebraic_immunity(f, 7) == 4
+    assert find_RSF.find_RSF(7, 2, 4, min_degree_SANF = [], gray = True) == 132
+    assert sorted(result_functions("rsf-g-7-2-4--.txt")) == sorted(found)
+    if toolbox.np is not None:
+        (search_directory / "backup" / "rsf-7-2-4--.txt").unlink()
+        (search_directory / "result" / "rsf-7-2-4--.txt").unlink()
+        assert find_RSF.find_RSF(7, 2, 4, min_degree_SANF = [], block_bits = 6) == 132
+        assert hashlib.md5(open("result/rsf-7-2-4--.txt", "rb").read()).hexdigest() == baseline_dahus
+
+@pytest.mark.parametrize("locality, resiliency, algebraic_immunity", parameters)
+def test_find_RSF_symmetric(search_directory, locality, resiliency, algebraic_immunity):
+    expected = reference_search(locality, resiliency, algebraic_immunity)
+    for gray in (False, True):
+        assert find_RSF.find_RSF(locality, resiliency, algebraic_immunity, min_degree_SANF = [], gray = gray, symmetric = True) == len(expected)
+        found = result_functions("rsf-%s%d-%d-%d--.txt" % ("g-" if gray else "", locality, resiliency, algebraic_immunity))
+        assert (sorted(found) if gray else found) == (sorted(expected) if gray else expected)
+
+@pytest.mark.parametrize("gray, block_bits", [(False, 0), (True, 0), (False, 6)])
+def test_find_RSF_dahus_symmetric(search_directory, capsys, gray, block_bits):
+    if block_bits and toolbox.np is None:
+        pytest.skip("the block enumeration requires numpy")
+    filename = "result/rsf-%s7-2-4--.txt" % ("g-" if gray else "")
+    assert find_RSF.find_RSF(7, 2, 4, min_degree_SANF = [], gray = gray) == 132
+    expected = open(filename).read()
+    clear_search(search_directory)
+    assert find_RSF.find_RSF(7, 2, 4, min_degree_SANF = [], gray = gray, block_bits = block_bits, symmetric = True) == 132
+    assert open(filename).read() == expected
+    sizes = orbit_sizes(capsys)
+    assert sum(size*nb for (size, nb) in sizes.items()) == 132
+
+@pytest.mark.parametrize("gray", [False, True])
+def test_find_RSF_symmetric_resume(search_directory, gray):
+    #the search is resumed after a backup: the classes are made of the SANF visited after the backup
+    assert find_RSF.find_RSF(7, 2, 4, min_degree_SANF = [], gray = gray) == 132
+    filename = "rsf-%s7-2-4--.txt" % ("g-" if gray else "")
+    lines = open("result/" + filename).read().split("\n")
+    expected = "\n".join(lines)
+    rank = lambda SANF: (toolbox.gray_rank if gray else int)(toolbox.bool_list_to_integer(SANF[0:15]))
+    backup_rank = rank(eval(lines[2*66]))
+    clear_search(search_directory)
+    with open("result/" + filename, "w") as result:
+        result.write("".join(lines[i] + "\n" + lines[i+1] + "\n" for i in range(0, len(lines)-1, 2) if rank(eval(lines[i])) <= backup_rank))
+    with open("backup/" + filename, "w") as backup:
+        backup.write("backup=" + str(toolbox.integer_to_bool_list(backup_rank ^ (backup_rank >> 1) if gray else backup_rank, 15)) + "\n")
+    find_RSF.find_RSF(7, 2, 4, min_degree_SANF = [], gray = gray, symmetric = True)
+    assert open("result/" + filename).read() == expected
+
+def test_find_RSF_with_coverage(search_directory):
+    out = lambda *arguments: None
+    assert find_RSF.find_RSF_with_coverage(7, 2, 4, [1, 0, 0, 0, 0], [], out = out) == 12
+    found = result_functions("rsf-c-7-2-4-10000-.txt")
+    for SANF in found:
+        f = reference.RSF_from_SANF(SANF, 7)
+        assert SANF[10:15] == [1, 0, 0, 0, 0] #the representatives of degree 4
+        assert reference.is_resilient(f, 7, 2) and reference.algebraic_immunity(f, 7) == 4
+    expected = open("result/rsf-c-7-2-4-10000-.txt").read()
+    clear_search(search_directory)
+    assert find_RSF.find_RSF_with_coverage(7, 2, 4, [1, 0, 0, 0, 0], [], out = out, symmetric = True) == 12
+    assert open("result/rsf-c-7-2-4-10000-.txt").read() == expected
+    assert find_RSF.find_RSF_with_coverage(7, 2, 4, [1, 0, 0, 0, 0], [], out = out, gray = True, symmetric = True) == 12
+    assert sorted(result_functions("rsf-c-g-7-2-4-10000-.txt")) == sorted(found)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the reedmuller module against the reference implementations.
+"""
+
+import pytest
+
+import reedmuller
+from reedmuller import ReedMuller, ReedMuller_matrix, get_reedmuller_matrix
+import reference
+
+
+@pytest.mark.parametrize("m", range(1, 7))
+def test_ReedMuller(m):
+    for r in range(m+1):
+        assert ReedMuller(r, m) == reference.ReedMuller(r, m)
+
+@pytest.mark.parametrize("m", range(1, 7))
+def test_packed_matrix(m):
+    for r in range(m+1):
+        matrix = ReedMuller_matrix(r, m)
+        assert matrix.monomials == sorted(reference.monomials(m, r), key = lambda u: (bin(u).count("1"), u))
+        for x in range(2**m):
+            assert matrix.rows[x] & matrix.column_mask == sum(1 << j for (j, u) in enumerate(matrix.monomials) if x & u == u)
+        for r2 in range(r+1):
+            prefix = matrix.prefix(r2)
+            fresh = ReedMuller_matrix(r2, m)
+            assert prefix.monomials == fresh.monomials
+            assert [row & prefix.column_mask for row in prefix.rows] == fresh.rows
+            if reedmuller.np is not None:
+                assert prefix.array().tolist() == fresh.array().tolist()
+
+def test_cache(monkeypatch):
+    monkeypatch.setattr(reedmuller, "reedmuller_cache", type(reedmuller.reedmuller_cache)())
+    large = get_reedmuller_matrix(3, 6)
+    assert get_reedmuller_matrix(3, 6) is large
+    small = get_reedmuller_matrix(1, 6)
+    assert small.rows is large.rows #prefix view of the cached matrix
+    assert [row & small.column_mask for row in small.rows] == ReedMuller_matrix(1, 6).rows
+    for m in range(1, reedmuller.reedmuller_cache_size + 2):
+        get_reedmuller_matrix(0, m)
+    assert len(reedmuller.reedmuller_cache) == reedmuller.reedmuller_cache_size
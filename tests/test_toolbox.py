@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the toolbox module against the reference implementations.
+"""
+
+import random
+import pytest
+
+import toolbox
+from toolbox import sign, Walsh_transform, Moebius_transform, sign_Walsh_transform, Moebius_transform_array, to_list
+import reference
+
+
+@pytest.mark.parametrize("locality", range(1, 8))
+def test_transforms(backend, locality):
+    rng = random.Random(locality)
+    for i in range(5):
+        f = reference.random_TT(locality, rng)
+        assert Walsh_transform(sign(f), locality) == reference.walsh(f, locality)
+        assert to_list(sign_Walsh_transform(f, locality)) == reference.walsh(f, locality)
+        assert Moebius_transform(f, locality) == reference.moebius(f, locality)
+        assert to_list(Moebius_transform_array(f, locality)) == reference.moebius(f, locality)
+        assert Moebius_transform(Moebius_transform(f, locality), locality) == f
+
+def test_transforms_inplace_block():
+    if toolbox.np is None:
+        pytest.skip("numpy is not installed")
+    np = toolbox.np
+    rng = random.Random(0)
+    block = [reference.random_TT(5, rng) for i in range(4)]
+    W = 2*np.array(block, dtype=np.int64) - 1
+    toolbox.Walsh_transform_inplace(W, 5)
+    A = np.array(block, dtype=np.uint8)
+    toolbox.Moebius_transform_inplace(A, 5)
+    for i, f in enumerate(block):
+        assert W[i].tolist() == reference.walsh(f, 5)
+        assert A[i].tolist() == reference.moebius(f, 5)
+
+@pytest.mark.parametrize("locality", range(1, 8))
+def test_packed_transform(backend, locality):
+    rng = random.Random(locality)
+    for i in range(5):
+        f = reference.random_TT(locality, rng)
+        word = toolbox.pack_bits(f)
+        assert word == sum(f[x] << x for x in range(2**locality))
+        assert to_list(toolbox.unpack_bits(word, 2**locality)) == f
+        assert toolbox.Moebius_transform_packed(word, locality) == toolbox.pack_bits(reference.moebius(f, locality))
+
+@pytest.mark.parametrize("nb_bits", [0, 1, 7, 8, 9, 16, 21])
+def test_bit_reverse(nb_bits):
+    for x in {x % 2**nb_bits for x in [0, 1, 2**nb_bits - 1, 0x15A3E7, 2**nb_bits >> 1]}:
+        assert toolbox.bit_reverse(x, nb_bits) == int(format(x, "0%db" % nb_bits)[::-1] or "0", 2)
+
+@pytest.mark.parametrize("nb_bits", range(1, 7))
+def test_enumerators(nb_bits):
+    entries = toolbox.Truth_table_entry(nb_bits)
+    expected = [list(entries.next_entry()) for i in range(2**nb_bits)]
+    assert [toolbox.integer_to_bool_list(x, nb_bits) for x in toolbox.binary_entries(nb_bits)] == expected
+    assert [to_list(toolbox.unpack_bits(x, nb_bits)) for x in toolbox.packed_entries(nb_bits)] == expected
+    assert [toolbox.bool_list_to_integer(e) for e in expected] == list(range(2**nb_bits))
+    assert list(toolbox.binary_entries(nb_bits, 1, 2)) == [1]
+    packed = list(toolbox.packed_entries(nb_bits))
+    for (start, stop) in [(0, 1), (1, 2**nb_bits), (2**nb_bits - 1, 2**nb_bits), (1, 1)]:
+        assert list(toolbox.packed_entries(nb_bits, start, stop)) == packed[start:stop]
+    
+    codes = list(toolbox.gray_entries(nb_bits))
+    assert sorted(codes) == list(range(2**nb_bits))
+    assert [toolbox.gray_rank(code) for code in codes] == list(range(2**nb_bits))
+    code = codes[0]
+    for (i, bit) in enumerate(toolbox.gray_flips(nb_bits)):
+        code ^= 1 << bit
+        assert code == codes[i+1]
+    assert list(toolbox.gray_entries(nb_bits, 1, 2)) == codes[1:2]
+
+def test_echelon_basis():
+    rng = random.Random(0)
+    basis = toolbox.Echelon_basis()
+    vectors = []
+    for i in range(60):
+        v = rng.getrandbits(20) & rng.getrandbits(20)
+        increases = reference.rank(vectors + [v]) > reference.rank(vectors)
+        vectors.append(v)
+        assert basis.add(v) == increases
+        assert basis.rank == reference.rank(vectors)
+    basis.reset()
+    assert basis.rank == 0 and basis.add(1)
+
+def test_echelon_basis_rollback():
+    rng = random.Random(1)
+    basis = toolbox.Echelon_basis()
+    prefix = [rng.getrandbits(12) for i in range(5)]
+    for v in prefix:
+        basis.add(v)
+    token = basis.snapshot()
+    for i in range(10):
+        for v in [rng.getrandbits(12) for j in range(rng.randrange(10))]:
+            basis.add(v)
+        basis.rollback(token)
+        assert basis.rank == reference.rank(prefix)
+        fresh = toolbox.Echelon_basis()
+        for v in prefix:
+            fresh.add(v)
+        for v in [rng.getrandbits(12) for j in range(8)]:
+            assert basis.add(v) == fresh.add(v)
+        basis.rollback(token)
+
+@pytest.mark.parametrize("m", range(1, 7))
+def test_galois_field(backend, m):
+    field = toolbox.Galois_field(m)
+    size = 2**m
+    assert field.modulus.bit_length() == m + 1
+    assert sorted(field.exp[0:size-1]) == list(range(1, size)) #X is primitive
+    elements = list(range(size))
+    for a in elements:
+        products = field.multiply(toolbox.to_array([a]*size, "int32"), toolbox.to_array(elements, "int32"))
+        assert to_list(products) == [reference.gf_multiply(a, b, field.modulus) for b in elements]
+        assert to_list(field.scale(a, toolbox.to_array(elements, "int32"))) == to_list(products)
+        if a:
+            assert reference.gf_multiply(a, field.inverse(a), field.modulus) == 1
+        assert field.power(a, 3) == reference.gf_multiply(a, reference.gf_multiply(a, a, field.modulus), field.modulus)
+
+@pytest.mark.parametrize("m", [1, 2, 4])
+def test_has_full_column_rank(backend, m):
+    rng = random.Random(m)
+    field = toolbox.Galois_field(m)
+    for i in range(40):
+        nb_rows = rng.randrange(1, 7)
+        nb_columns = rng.randrange(1, 6)
+        density = rng.random()
+        matrix = [[rng.randrange(1, 2**m) if rng.random() < density else 0 for c in range(nb_columns)] for r in range(nb_rows)]
+        expected = reference.gf_rank(matrix, field.modulus) == nb_columns
+        assert toolbox.has_full_column_rank(field, toolbox.to_array(matrix, "int32")) == expected
+
+def test_multiplicative_order():
+    for n in range(2, 40, 2):
+        n += 1
+        k = toolbox.multiplicative_order(2, n)
+        assert pow(2, k, n) == 1 and all(pow(2, j, n) != 1 for j in range(1, k))
+
+def test_timed_cached_property():
+    class Tables:
+        def __init__(self):
+            self.build_times = {}
+            self.nb_builds = 0
+        
+        @toolbox.timed_cached_property
+        def table(self):
+            """Table."""
+            self.nb_builds += 1
+            return [self.nb_builds]
+    
+    tables = Tables()
+    assert tables.table == [1] and tables.table is tables.table and list(tables.build_times) == ["table"]
+    Tables.table.invalidate(tables)
+    assert tables.build_times == {} and "table" not in vars(tables)
+    Tables.table.invalidate(tables) #nothing cached
+    assert tables.table == [2] and "table" in tables.build_times
+    assert Tables.table.__doc__ == "Table."
@@ -11,6 +11,13 @@ Created on Mon Apr  1 16:15:43 2019
 *********************************************************************"""
 
 from copy import deepcopy, copy
+from functools import cached_property, wraps
+import time
+
+try:
+    import numpy as np
+except ImportError: #numpy is optional, the pure Python transforms are used instead
+    np = None
 
 class Truth_table_entry:
     """
@@ -94,6 +101,404 @@ def bool_list_to_integer(bool_list):
     return ret
 
 
+def integer_to_bool_list(x, nb_bits):
+    """
+    Converts an integer into an array of nb_bits Booleans, inverse of bool_list_to_integer.
+
+    Parameters
+    ----------
+    x : integer
+    nb_bits : integer
+        length of the output.
+
+    Returns
+    -------
+    array of Booleans
+        the most significant bit first.
+
+    """
+    if nb_bits == 0:
+        return []
+    return [int(b) for b in format(x, "0" + str(nb_bits) + "b")]
+
+byte_reverse_table = [0]*256 #byte_reverse_table[b] is the byte b with its 8 bits in the reverse order
+for b in range(1, 256):
+    byte_reverse_table[b] = (byte_reverse_table[b >> 1] >> 1) | ((b & 1) << 7)
+
+def bit_reverse(x, nb_bits):
+    """
+    Reverses the order of the nb_bits least significant bits of x, byte by byte with byte_reverse_table.
+    """
+    x &= (1 << nb_bits) - 1
+    reversed_x = 0
+    for i in range(0, nb_bits, 8):
+        reversed_x = (reversed_x << 8) | byte_reverse_table[x & 255]
+        x >>= 8
+    return reversed_x >> (-nb_bits % 8)    #the nb_bits bits were reversed as a multiple of 8 bits
+
+"""
+Integer enumerators.\n
+The following generators enumerate the same entries as Truth_table_entry.next_entry(), in the same order,
+but without building a list at each step. The entry of rank i is the list integer_to_bool_list(i, nb_bits).
+The start and stop parameters are ranks: an enumeration can be resumed or split into ranges in O(1).
+"""
+
+def binary_entries(nb_bits, start=0, stop=None):
+    """
+    Enumerates the entries of ranks start to stop-1 as integers (see bool_list_to_integer).
+
+    Parameters
+    ----------
+    nb_bits : integer
+        number of bits of an entry.
+    start : integer, optional
+        rank of the first entry. The default is 0.
+    stop : integer, optional
+        rank after the last entry. The default is 2**nb_bits.
+
+    Returns
+    -------
+    generator of integers
+
+    """
+    if stop is None:
+        stop = 2**nb_bits
+    return iter(range(start, stop))
+
+def packed_entries(nb_bits, start=0, stop=None):
+    """
+    Enumerates the entries of ranks start to stop-1 as packed bit vectors (see pack_bits),
+    i.e. the first element of the entry is the least significant bit.
+
+    Parameters
+    ----------
+    nb_bits : integer
+        number of bits of an entry.
+    start : integer, optional
+        rank of the first entry. The default is 0.
+    stop : integer, optional
+        rank after the last entry. The default is 2**nb_bits.
+
+    Returns
+    -------
+    generator of integers
+
+    """
+    if stop is None:
+        stop = 2**nb_bits
+    if start >= stop:
+        return
+    x = bit_reverse(start, nb_bits)
+    top = (1 << nb_bits) >> 1   #first element of the entry, the least significant bit of the rank
+    for i in range(start, stop - 1):
+        yield x
+        #add 1 to the rank on the reversed bits: the carry propagates from the most significant bit down
+        h = top
+        while x & h:
+            x ^= h
+            h >>= 1
+        x |= h
+    yield x
+
+def gray_entries(nb_bits, start=0, stop=None):
+    """
+    Enumerates the Gray codes of ranks start to stop-1 as integers.\n
+    Two consecutive Gray codes differ by a single bit.
+
+    Parameters
+    ----------
+    nb_bits : integer
+        number of bits of an entry.
+    start : integer, optional
+        rank of the first entry. The default is 0.
+    stop : integer, optional
+        rank after the last entry. The default is 2**nb_bits.
+
+    Returns
+    -------
+    generator of integers
+
+    """
+    if stop is None:
+        stop = 2**nb_bits
+    for i in range(start, stop):
+        yield i ^ (i >> 1)
+
+def gray_flips(nb_bits, start=0, stop=None):
+    """
+    Enumerates the bits to flip to go from the Gray code of rank i-1 to the Gray code of rank i,
+    for i from start+1 to stop-1.\n
+    The bit flipped at rank i is the number of trailing zeros of i.
+
+    Parameters
+    ----------
+    nb_bits : integer
+        number of bits of an entry.
+    start : integer, optional
+        rank of the Gray code before the first flip. The default is 0.
+    stop : integer, optional
+        rank after the last Gray code. The default is 2**nb_bits.
+
+    Returns
+    -------
+    generator of integers
+        indexes of the bits to flip, 0 being the least significant bit.
+
+    """
+    if stop is None:
+        stop = 2**nb_bits
+    for i in range(start+1, stop):
+        yield (i & -i).bit_length() - 1
+
+def gray_rank(code):
+    """
+    Returns the rank of a Gray code, inverse of i -> i ^ (i >> 1) (see gray_entries).
+    """
+    rank = code
+    shift = 1
+    while rank >> shift:    #prefix XOR of the bits, by doubling shifts
+        rank ^= rank >> shift
+        shift <<= 1
+    return rank
+
+class Echelon_basis:
+    """
+    Class Echelon_basis.\n
+    Basis of a Boolean vector space, each vector being packed into an integer.\n
+    The vectors of the basis have distinct leading bits (pivots), so that adding a vector
+    costs a few XORs and bit_length lookups.
+    """
+    
+    pivots = {} #leading bit -> vector of the basis
+    rank = 0
+    history = []    #leading bits of the vectors, in their order of insertion (undo log)
+    
+    def __init__(self):
+        """
+        Constructor, the basis is empty.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.pivots = {}
+        self.rank = 0
+        self.history = []
+    
+    def add(self, v):
+        """
+        Adds a vector to the basis if it increases the rank.
+
+        Parameters
+        ----------
+        v : integer
+            packed vector.
+
+        Returns
+        -------
+        bool
+            True if the vector increases the rank by one, False otherwise.
+
+        """
+        pivots = self.pivots
+        while v:
+            leading_bit = v.bit_length() - 1
+            row = pivots.get(leading_bit)
+            if row is None:
+                pivots[leading_bit] = v
+                self.history.append(leading_bit)
+                self.rank += 1
+                return True
+            v ^= row
+        return False
+    
+    def reset(self):
+        """
+        Empties the basis.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.pivots = {}
+        self.rank = 0
+        self.history = []
+        return
+    
+    def snapshot(self):
+        """
+        Returns a token to come back to the current basis with rollback.
+        """
+        return len(self.history)
+    
+    def rollback(self, token):
+        """
+        Removes the vectors added since the snapshot that returned token.\n
+        The vectors of the basis are never modified once added, so the basis is exactly the one of the snapshot.
+
+        Parameters
+        ----------
+        token : integer
+            token returned by snapshot.
+
+        Returns
+        -------
+        None.
+
+        """
+        while len(self.history) > token:
+            del self.pivots[self.history.pop()]
+            self.rank -= 1
+        return
+
+class Galois_field:
+    """
+    Class Galois_field.\n
+    Arithmetic of the finite field GF(2^m), with tables of exponentials and logarithms of a primitive element g.
+    The elements are integers smaller than 2^m, bit i being the coefficient of X^i (polynomials modulo a primitive polynomial).
+    The vector operations (multiply, scale) apply to numpy arrays if numpy is available, to arrays of integers otherwise.
+    """
+
+    m = 0   #degree of the extension
+    size = 0    #number of elements, 2^m
+    modulus = 0 #primitive polynomial of degree m, bit i being the coefficient of X^i
+    exp = []    #exp[i] = g^i for 0 <= i < 2*(size-1)
+    log = []    #log[a] for a != 0, log[0] is 0 but must not be used
+    exp_array = None    #exp and log as numpy arrays of int32, log_array[0] being 2*(size-1) and exp_array being 0 after 2*(size-1):
+    log_array = None    #the products with 0 need no test
+
+    def __init__(self, m):
+        """
+        Constructor: looks for the smallest primitive polynomial of degree m, g being X.
+
+        Parameters
+        ----------
+        m : integer
+            degree of the extension, at least 1.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.m = m
+        self.size = 2**m
+        for modulus in range(2**m + 1, 2**(m+1), 2): #the constant coefficient of an irreducible polynomial is 1
+            exp = [1]
+            a = 1
+            for i in range(1, self.size - 1):
+                a <<= 1
+                if a >> m:
+                    a ^= modulus
+                if a == 1: #X is not of order 2^m - 1
+                    break
+                exp.append(a)
+            if len(exp) == self.size - 1:
+                break
+        self.modulus = modulus
+        self.exp = exp + exp
+        self.log = [0]*self.size
+        for i, a in enumerate(exp):
+            self.log[a] = i
+        if np is not None:
+            self.exp_array = np.array(self.exp + [0]*(2*self.size - 1), dtype=np.int32)
+            self.log_array = np.array(self.log, dtype=np.int32)
+            self.log_array[0] = 2*(self.size - 1)
+
+    def power(self, a, n):
+        """
+        Returns a^n (n >= 0).
+        """
+        if a == 0:
+            return 1 if n == 0 else 0
+        return self.exp[(self.log[a] * n) % (self.size - 1)]
+
+    def inverse(self, a):
+        """
+        Returns the inverse of a nonzero element.
+        """
+        return self.exp[(self.size - 1 - self.log[a]) % (self.size - 1)]
+
+    def multiply(self, a, b):
+        """
+        Returns the products of the elements of a and b, two arrays of the same shape or broadcastable numpy arrays.
+        """
+        if np is not None:
+            return self.exp_array[self.log_array[a] + self.log_array[b]]
+        return [self.exp[self.log[x] + self.log[y]] if x and y else 0 for x, y in zip(a, b)]
+
+    def scale(self, c, v):
+        """
+        Returns the vector v multiplied by the element c.
+        """
+        if c == 0:
+            return v ^ v if np is not None else [0]*len(v)
+        if np is not None:
+            return self.exp_array[self.log_array[v] + self.log[c]]
+        log_c = self.log[c]
+        return [self.exp[self.log[x] + log_c] if x else 0 for x in v]
+
+def has_full_column_rank(field, matrix):
+    """
+    Checks whether a matrix over GF(2^m) has full column rank, by Gaussian elimination.\n
+    With numpy, each step is a product of the pivot column by the pivot row, computed with the tables of the field
+    (see Galois_field): the cost is a few numpy operations by column. The elimination stops at the first column without pivot.
+
+    Parameters
+    ----------
+    field : Galois_field
+        field of the coefficients.
+    matrix : 2D numpy array, or array of arrays of integers
+        the matrix, one row by element of the list. It is modified.
+
+    Returns
+    -------
+    bool
+        True if the rank of the matrix is its number of columns.
+
+    """
+    nb_rows = len(matrix)
+    nb_columns = len(matrix[0]) if nb_rows else 0
+    if nb_rows < nb_columns:
+        return False
+    r = 0
+    for c in range(nb_columns):
+        if np is not None:
+            nonzero = np.flatnonzero(matrix[r:, c])
+            if len(nonzero) == 0:
+                return False
+            p = r + int(nonzero[0])
+            if p != r:
+                matrix[[r, p]] = matrix[[p, r]]
+            pivot_row = field.scale(field.inverse(int(matrix[r, c])), matrix[r, c:])
+            below = r + 1 + np.flatnonzero(matrix[r+1:, c])
+            if len(below):
+                matrix[below, c:] ^= field.multiply(matrix[below, c, None], pivot_row[None, :])
+        else:
+            p = next((i for i in range(r, nb_rows) if matrix[i][c]), None)
+            if p is None:
+                return False
+            matrix[r], matrix[p] = matrix[p], matrix[r]
+            pivot_row = field.scale(field.inverse(matrix[r][c]), matrix[r])
+            for i in range(r+1, nb_rows):
+                if matrix[i][c]:
+                    matrix[i] = [x ^ y for x, y in zip(matrix[i], field.scale(matrix[i][c], pivot_row))]
+        r += 1
+    return True
+
+def multiplicative_order(a, n):
+    """
+    Returns the smallest k > 0 such that a^k = 1 modulo n, a and n being coprime.
+    """
+    k = 1
+    x = a % n
+    while x != 1 % n:
+        x = (x * a) % n
+        k += 1
+    return k
+
 def rank_increase(matrix):
     """
     Checks whether the last column of the given Boolean matrix increases the rank.\n 
@@ -177,21 +582,26 @@ def sign(f):
 
 def Walsh_transform(f,locality):
     """
-    Walsh transform of a function.
+    Walsh transform of a function.\n
+    Thin wrapper around Walsh_transform_inplace when numpy is available.
 
     Parameters
     ----------
-    f : TYPE
-        DESCRIPTION.
-    locality : TYPE
-        DESCRIPTION.
+    f : array of integers
+        function to transform, usually sign(truth table).
+    locality : integer
+        locality
 
     Returns
     -------
-    F : TYPE
-        DESCRIPTION.
+    F : array of integers
+        Walsh transform of f.
 
     """
+    if np is not None:
+        F = np.array(f, dtype=np.int64)
+        Walsh_transform_inplace(F, locality)
+        return F.tolist()
     
     F = copy(f)
     divide = (2**locality)>>1
@@ -207,7 +617,8 @@ def Walsh_transform(f,locality):
 
 def Moebius_transform(f,locality):
     """
-    Moebius transform to convert ANF into truth table and vice-versa.
+    Moebius transform to convert ANF into truth table and vice-versa.\n
+    Thin wrapper around Moebius_transform_inplace when numpy is available.
 
     Parameters
     ----------
@@ -222,6 +633,11 @@ def Moebius_transform(f,locality):
         ANF (or equivalently truth table).
 
     """
+    if np is not None:
+        F = np.array(f, dtype=np.uint8)
+        Moebius_transform_inplace(F, locality)
+        return F.tolist()
+    
     F = copy(f)
     divide = (2**locality)>>1
     while divide != 0:
@@ -232,6 +648,264 @@ def Moebius_transform(f,locality):
         divide = divide >>1
     return F
 
+def Walsh_transform_inplace(F, locality):
+    """
+    In place Walsh transform of a numpy integer array whose last axis has length 2**locality.\n
+    Each level of the butterfly is computed on a (..., blocks, 2, offset) view of the array.
+    A 2D array is transformed row by row, which allows to transform a block of functions at once.
+
+    Parameters
+    ----------
+    F : numpy array of integers
+        function (or block of functions) to transform, modified by this function.
+    locality : integer
+        locality
+
+    Returns
+    -------
+    F : numpy array of integers
+        the input array, transformed.
+
+    """
+    divide = (2**locality)>>1
+    while divide != 0:
+        view = F.reshape(F.shape[:-1] + (-1, 2, divide))
+        low = view[...,0,:]
+        high = view[...,1,:]
+        low += high     #a+b
+        high *= -2
+        high += low     #(a+b)-2b = a-b
+        divide = divide >>1
+    return F
+
+def Moebius_transform_inplace(F, locality):
+    """
+    In place Moebius transform of a numpy array whose last axis has length 2**locality.\n
+    Each level of the butterfly is computed on a (..., blocks, 2, offset) view of the array.
+    A 2D array is transformed row by row, which allows to transform a block of functions at once.
+
+    Parameters
+    ----------
+    F : numpy array of Booleans
+        truth table (or equivalently ANF), or block of truth tables, modified by this function.
+    locality : integer
+        locality
+
+    Returns
+    -------
+    F : numpy array of Booleans
+        the input array, transformed.
+
+    """
+    divide = (2**locality)>>1
+    while divide != 0:
+        view = F.reshape(F.shape[:-1] + (-1, 2, divide))
+        view[...,1,:] ^= view[...,0,:]
+        divide = divide >>1
+    return F
+
+def sign_Walsh_transform(f, locality):
+    """
+    Walsh spectrum of a truth table, i.e. Walsh_transform(sign(f)), with the sign fused in the transform.\n
+    If numpy is available, a numpy array is returned, otherwise a list.
+
+    Parameters
+    ----------
+    f : array of Booleans
+        truth table of the function.
+    locality : integer
+        locality
+
+    Returns
+    -------
+    F : array of integers
+        Walsh spectrum of f.
+
+    """
+    if np is None:
+        return Walsh_transform(sign(f), locality)
+    F = np.array(f, dtype=np.int64)
+    F *= 2
+    F -= 1
+    return Walsh_transform_inplace(F, locality)
+
+def Moebius_transform_array(f, locality):
+    """
+    Moebius transform of a truth table (or an ANF) into a new array.\n
+    If numpy is available, a numpy array is returned, otherwise a list.
+
+    Parameters
+    ----------
+    f : array of Booleans
+        truth table (or equivalently ANF).
+    locality : integer
+        locality
+
+    Returns
+    -------
+    F : array of Booleans
+        ANF (or equivalently truth table).
+
+    """
+    if np is None:
+        return Moebius_transform(f, locality)
+    F = np.array(f, dtype=np.uint8)
+    return Moebius_transform_inplace(F, locality)
+
+def to_array(f, dtype):
+    """
+    Copies f into a numpy array of the given dtype, or into a list if numpy is not available.
+
+    Parameters
+    ----------
+    f : array of integers
+        vector to copy.
+    dtype : string
+        numpy dtype of the copy, e.g. "uint8" or "int64".
+
+    Returns
+    -------
+    numpy array or array of integers
+
+    """
+    if np is None:
+        return list(f)
+    return np.array(f, dtype=dtype)
+
+def to_list(f):
+    """
+    Converts a numpy array (or any iterable) into a list of Python integers.
+    """
+    if np is not None and isinstance(f, np.ndarray):
+        return f.tolist()
+    return list(f)
+
+class timed_cached_property(cached_property):
+    """
+    Decorator: same as functools.cached_property, the value being computed on first access,
+    but the time taken to compute it is also recorded in the build_times dictionary of the instance,
+    with the name of the property as key.
+    """
+    def __init__(self, function):
+        @wraps(function)
+        def timed(instance):
+            start = time.perf_counter()
+            value = function(instance)
+            instance.build_times[function.__name__] = time.perf_counter() - start
+            return value
+        super().__init__(timed)
+    
+    def invalidate(self, instance):
+        """
+        Drops the value cached in instance and its build time, the value is computed again on next access.
+
+        The property is reached through the class, e.g. type(self).name.invalidate(self).
+        """
+        instance.__dict__.pop(self.attrname, None)
+        instance.build_times.pop(self.attrname, None)
+
+def popcount(x):
+    """
+    Number of bits set to 1 in the non-negative integer x.
+    """
+    return bin(x).count("1")
+
+if hasattr(int, "bit_count"):  #Python 3.10+
+    popcount = int.bit_count
+
+def pack_bits(f):
+    """
+    Packs an array of Booleans into an integer, the i-th element of f being the i-th bit of the integer.\n
+    Unlike bool_list_to_integer, the first element is the least significant bit.
+
+    Parameters
+    ----------
+    f : array of Booleans
+        truth table (or ANF) to pack.
+
+    Returns
+    -------
+    integer
+
+    """
+    if np is not None and isinstance(f, np.ndarray):
+        return int.from_bytes(np.packbits(f.astype(np.uint8), bitorder="little").tobytes(), "little")
+    return int("0" + "".join(str(b) for b in reversed(f)), 2)
+
+def unpack_bits(word, length):
+    """
+    Unpacks an integer into an array of length Booleans, the i-th bit of the integer being the i-th element.\n
+    If numpy is available, a numpy array is returned, otherwise a list.
+
+    Parameters
+    ----------
+    word : integer
+        packed truth table (or ANF).
+    length : integer
+        number of bits to unpack.
+
+    Returns
+    -------
+    array of Booleans
+
+    """
+    if np is None:
+        return [(word >> i) & 1 for i in range(length)]
+    raw = np.frombuffer(word.to_bytes((length+7)//8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, count=length, bitorder="little")
+
+moebius_masks_cache = {}
+
+def moebius_masks(locality):
+    """
+    Masks used by Moebius_transform_packed.\n
+    The k-th mask selects the bits whose index has its k-th bit equal to 0.
+    The masks are computed once per locality.
+
+    Parameters
+    ----------
+    locality : integer
+        locality
+
+    Returns
+    -------
+    array of integers
+        one mask per level.
+
+    """
+    if locality not in moebius_masks_cache:
+        n = 2**locality
+        masks = []
+        for k in range(locality):
+            d = 1 << k
+            #d bits to 1 followed by d bits to 0, repeated
+            masks.append(((1 << d) - 1) * (((1 << n) - 1) // ((1 << (2*d)) - 1)))
+        moebius_masks_cache[locality] = masks
+    return moebius_masks_cache[locality]
+
+def Moebius_transform_packed(word, locality):
+    """
+    Moebius transform of a packed truth table (or ANF), see pack_bits.\n
+    Each level is a single shift-and-mask step on the whole word.
+
+    Parameters
+    ----------
+    word : integer
+        packed truth table (or equivalently ANF).
+    locality : integer
+        locality
+
+    Returns
+    -------
+    integer
+        packed ANF (or equivalently truth table).
+
+    """
+    masks = moebius_masks(locality)
+    for k in range(locality):
+        word ^= (word & masks[k]) << (1 << k)
+    return word
+
 def truncate_degree(f, deg_min, deg_max):
     """
     Truncates the specified degree (resp. weight) of a specified ANF (resp. Walsh spectrum).